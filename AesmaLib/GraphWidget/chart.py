@@ -7,7 +7,6 @@
 from typing import List
 import math
 import numpy as np
-from scipy.interpolate import make_interp_spline
 from PyQt5.QtGui import QPen, QColor
 from PyQt5.QtCore import Qt
 from AesmaLib.GraphWidget.axis import Axis
@@ -58,7 +57,8 @@ class Chart(ChartMeta):
         self._options = options
         self._ptype = np.dtype([('x', 'f4'),('y', 'f4')])
         self._points = self.createEmptyPoints()
-        self._spline = None
+        self._version = 0   # версия набора точек
+        self._cache = {}    # кэш расчётов для текущей версии точек
         if points:
             self.setPoints(points, do_regenerate_axises=False)
             self._regenerateAxies()
@@ -84,31 +84,36 @@ class Chart(ChartMeta):
         """ задание точек """
         self._points = self.transposePoints(points)
         self._points.sort()
+        self._updateVersion()
         if do_regenerate_axises:
             self._regenerateAxies()
 
     def getPoints(self, name: str = ''):
         """ получение списка точек """
-        result = np.sort(self._points)
+        result = self._getSortedPoints()
         if name in ('x', 'y'):
             return result[name]
         result = result.T
         return result.tolist()
 
+    def getVersion(self):
+        """ получение версии набора точек (меняется при изменении точек) """
+        return self._version
+
     def addPoint(self, x: float, y: float, do_regenerate_axes: bool = False):
         """ добавление точки """
         point = np.array([(x, y)], dtype=self._ptype)
         self._points = np.concatenate((self._points, point))
+        self._updateVersion()
         if do_regenerate_axes:
             self._regenerateAxies()
-        if self._points.size > 2:
-            self._regenerateSpline()
 
     def removePoint(self, index: int = -1, do_regenerate_axies: bool = False):
         """ удаление точки по индексу (по умолчанию последней)"""
         count = self._points.size
         if count and ((-1 * count) <= index < count):
             self._points = np.delete(self._points, index)
+            self._updateVersion()
             if do_regenerate_axies:
                 self._regenerateAxies()
         else:
@@ -117,6 +122,7 @@ class Chart(ChartMeta):
     def clearPoints(self):
         """ удаление всех точек """
         self._points = self.createEmptyPoints()
+        self._updateVersion()
 
     def createEmptyPoints(self):
         """ создание пустого массива точек """
@@ -124,20 +130,36 @@ class Chart(ChartMeta):
 
     def getSpline(self):
         """ получение функции кривой """
-        return self._spline
-
-    def getTranslatedPoints(self, sz_canvas: List[float], for_curve=False):
-        """ получение точек транслированных в коорд. пикселей """
-        if for_curve and len(self._points['x']) > 2:
-            points = self.regenerateCurve()
+        return self._getCached(('spline',), self._createSpline)
+
+    def getMaximum(self):
+        """ максимум кривой в пределах точек -> (x, y) или None
+            (кэшируется до изменения точек) """
+        return self._getCached(('maximum',), self._findMaximum)
+
+    def getTranslatedPoints(self, sz_canvas: List[float], for_curve=False,
+                            samples=100):
+        """ получение точек транслированных в коорд. пикселей
+            (кэшируется только для последних размера холста и осей) """
+        for_curve = for_curve and self._points.size > 2
+        key = ('translated', for_curve, samples)
+        params = (tuple(sz_canvas[:2]), self._getAxesKey())
+        cached = self._cache.get(key)
+        if cached is None or cached[0] != params:
+            result = self._translatePoints(sz_canvas, for_curve, samples)
+            result.flags.writeable = False
+            self._cache[key] = cached = (params, result)
+        return cached[1]
+
+    def _translatePoints(self, sz_canvas: List[float], for_curve, samples):
+        """ трансляция точек (или точек кривой) в коорд. пикселей """
+        if for_curve:
+            points = self.regenerateCurve(samples=samples).copy()
         else:
-            points = np.sort(self._points)
+            points = self._getSortedPoints().copy()
         if points.size:
-            coeff = 1
-            func = lambda v: v * coeff
             for i, n in enumerate(('x', 'y')):
-                coeff = sz_canvas[i] / self._axes[n].getLength()
-                points[n] = list(map(func, points[n]))
+                points[n] *= sz_canvas[i] / self._axes[n].getLength()
         return points
 
     def translateCoordinate(self, name, value, length, to_pixel=True):
@@ -163,27 +185,76 @@ class Chart(ChartMeta):
                 min_, max_, _ = Chart._calculateAxies(min_, max_)
                 axis = Axis(min_ * 1.0, max_ * 1.0)
                 self._axes.update({name: axis})
-        self._regenerateSpline()
 
-    def _regenerateSpline(self):
-        """ перерасчёт функции кривой """
+    def _createSpline(self):
+        """ расчёт функции кривой (scipy загружается при первом расчёте) """
         if self._points.size > 2:
-            points = np.sort(self._points)
-            self._spline = make_interp_spline(points['x'], points['y'], k=2)
-        else:
-            self._spline = None
+            from scipy.interpolate import make_interp_spline
+            points = self._getSortedPoints()
+            return make_interp_spline(points['x'], points['y'], k=2)
+        return None
+
+    def _findMaximum(self):
+        """ поиск максимума сплайна: значения на краях и в корнях
+            производной (для кусочного полинома находятся аналитически) """
+        spline = self.getSpline()
+        if spline is None:
+            return None
+        from scipy.interpolate import PPoly
+        points = self._getSortedPoints()
+        x_min, x_max = points['x'][0], points['x'][-1]
+        roots = PPoly.from_spline(spline.derivative()).roots(extrapolate=False)
+        roots = roots[(roots >= x_min) & (roots <= x_max)]
+        result_x = np.concatenate(([x_min, x_max], roots))
+        result_y = spline(result_x)
+        index = np.argmax(result_y)
+        return float(result_x[index]), float(result_y[index])
 
     def regenerateCurve(self, points=None, samples=100):
         """ перерасчёт точек кривой """
-        if points is None and self._points.size > 2:
-            return self.regenerateCurve(self._points)
-        if self._spline:
+        if points is None:
+            if self._points.size > 2:
+                return self._getCached(('curve', samples), self._createCurve,
+                                       self._points, samples)
+            return self.createEmptyPoints()
+        return self._createCurve(points, samples)
+
+    def _createCurve(self, points, samples):
+        """ расчёт точек кривой по функции сплайна """
+        spline = self.getSpline()
+        if spline:
             result_x = np.linspace(min(points['x']), max(points['x']), samples)
-            result_y = self._spline(result_x)
+            result_y = spline(result_x)
             result = self.transposePoints([result_x, result_y])
             return result
         return self.createEmptyPoints()
 
+    def _getSortedPoints(self):
+        """ получение отсортированных точек (кэшируется до изменения точек) """
+        return self._getCached(('sorted',), np.sort, self._points)
+
+    def _getCached(self, key: tuple, func, *args):
+        """ получение результата расчёта из кэша текущей версии точек,
+            при отсутствии - расчёт и сохранение в кэш """
+        if key not in self._cache:
+            result = func(*args)
+            if isinstance(result, np.ndarray):
+                result.flags.writeable = False
+            self._cache[key] = result
+        return self._cache[key]
+
+    def _getAxesKey(self):
+        """ ключ текущих пределов осей для кэша трансляции """
+        return tuple(
+            (axis.getMinimum(), axis.getMaximum())
+            for axis in (self._axes.get(n) for n in ('x', 'y')) if axis
+        )
+
+    def _updateVersion(self):
+        """ смена версии набора точек и сброс кэша """
+        self._version += 1
+        self._cache.clear()
+
     def transposePoints(self, points: list):
         """ транспонирование точек """
         if len(points) == 2 and len(points[0]):
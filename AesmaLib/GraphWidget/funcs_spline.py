@@ -1,11 +1,10 @@
 """
     Модуль содержит функции для расчёта интерполируемого
     кубического сплайна
+    (scipy и matplotlib загружаются при первом вызове функций)
 """
 import math
 import numpy as np
-from scipy.interpolate import make_interp_spline, splrep, splev
-import matplotlib.pyplot as plt
 
 
 def binomial(i, n):
@@ -38,6 +37,7 @@ def bezierCurveRange(n, points):
 
 def getCurvePoints(x, y, is_bezier=False):
     """ получение точек кривой """
+    from scipy.interpolate import splrep, splev
     tck = splrep(x, y)
     x2 = np.linspace(0, max(x), 200)
     y2 = splev(x2, tck)
@@ -52,7 +52,9 @@ def getCurvePoints(x, y, is_bezier=False):
 
 
 def plotSplinePoints(points_x, points_y):
-    """ построение графика по точкам """
+    """ построение графика по точкам (для отладки) """
+    import matplotlib.pyplot as plt
+    from scipy.interpolate import splrep, splev
     tck = splrep(points_x, points_y)
     x2 = np.linspace(0, max(points_x), 200)
     y2 = splev(x2, tck)
@@ -67,6 +69,7 @@ def plotSplinePoints(points_x, points_y):
 
 def getBSplinePoints(points_x, points_y):
     """ получение сплайна из точек """
+    from scipy.interpolate import make_interp_spline
     np_x = np.array(points_x)
     np_y = np.array(points_y)
     new_x = np.linspace(np_x.min(), np_x.max(), 100)
@@ -11,7 +11,7 @@ from AesmaLib.GraphWidget.chart import Chart
 from AesmaLib.GraphWidget import funcs_spline as SplineFuncs
 from AesmaLib.journal import Journal
 
-is_logged = True
+_LOG = Journal.getLogger(__name__)
 is_updated = False
 
 
@@ -40,8 +40,7 @@ class Graph(QWidget):
         if len(margins) == 4:
             self._margins = margins
         else:
-            if is_logged:
-                Journal.log(__name__, '\tError:: margins len incorrect')
+            _LOG.error("margins len incorrect")
 
     def getMargins(self):
         """ получение ссылки на список отступов """
@@ -55,16 +54,14 @@ class Graph(QWidget):
 
     def addChart(self, chart: Chart, name: str):
         """ добавление кривой по имени """
-        if is_logged:
-            Journal.log(__name__, "\tadding chart", name)
+        _LOG.debug("adding chart %s", name)
         self._charts.update({name: chart})
         self._updateBaseChart(chart, name)
 
     def removeChart(self, name: str):
         """ удаление кривой по имени """
         if name in self._charts.keys():
-            if is_logged:
-                Journal.log(__name__, "\tremoving chart", name)
+            _LOG.debug("removing chart %s", name)
             del self._charts[name]
             if self._base_chart == name:
                 self._updateBaseChart(None, 'none')
@@ -72,23 +69,20 @@ class Graph(QWidget):
     def replaceChart(self, chart: Chart, name: str):
         """ замена кривой по имени """
         if name in self._charts.keys():
-            if is_logged:
-                Journal.log(__name__, "\treplacing chart", name)
+            _LOG.debug("replacing chart %s", name)
             self._charts.update({name: chart})
             if self._base_chart == name:
                 self._updateBaseChart(chart, name)
 
     def clearCharts(self):
         """ удаление всех кривых """
-        if is_logged:
-            Journal.log(__name__, "\tclearing charts")
+        _LOG.debug("clearing charts")
         self._charts.clear()
         self._updateBaseChart(None, 'none')
 
     def paintEvent(self, _event):
         """ событие перерисовки компонента """
-        if is_logged:
-            Journal.log(__name__, "\tpaintEvent -> begin *************")
+        _LOG.debug("paintEvent -> begin *************")
         painter = QPainter()
         painter.begin(self)
         painter.setRenderHints(QPainter.Antialiasing, True)
@@ -96,14 +90,12 @@ class Graph(QWidget):
         self._drawCharts(painter)
         self._drawBorder(painter)
         painter.end()
-        if is_logged:
-            Journal.log(__name__, "\tpaintEvent -> end *************")
+        _LOG.debug("paintEvent -> end *************")
 
     def _drawGrid(self, painter: QPainter):
         """ отрисовка сетки графика """
         if len(self._charts):
-            if is_logged:
-                Journal.log(__name__, "\tdrawGrid ->")
+            _LOG.debug("drawGrid ->")
             step_x, step_y = self._getSteps()
             pen = painter.pen()
             painter.setPen(self._style['grid']['pen'])
@@ -116,8 +108,7 @@ class Graph(QWidget):
 
     def _drawGridBackground(self, painter: QPainter):
         """ отрисовка подложки сетки графика """
-        if is_logged:
-            Journal.log(__name__, "\tdrawing grid background")
+        _LOG.debug("drawing grid background")
         x, y = self._margins[0], self._margins[1]
         painter.fillRect(QRectF(QPointF(0, 0),
                                 QSizeF(self.width(),
@@ -130,8 +121,7 @@ class Graph(QWidget):
 
     def _drawGridLines_x(self, painter: QPainter, step):
         """ отрисовка линий сетки для оси X """
-        if is_logged:
-            Journal.log(__name__, "\tdrawing grid lines X")
+        _LOG.debug("drawing grid lines X")
         axis: Axis = self._charts[self._base_chart].getAxis('x')
         for i, div in axis.generateDivSteps():
             if i == 0 or i == self._divs_x or div == 0.0:
@@ -147,8 +137,7 @@ class Graph(QWidget):
 
     def _drawGridLines_y(self, painter: QPainter, step: float):
         """ отрисовка линий сетки для оси Y """
-        if is_logged:
-            Journal.log(__name__, "\tdrawing grid lines Y")
+        _LOG.debug("drawing grid lines Y")
         axis: Axis = self._charts[self._base_chart].getAxis('y')
         for i, div in axis.generateDivSteps():
             if i == 0 or i == self._divs_y or div == 0.0:
@@ -165,8 +154,7 @@ class Graph(QWidget):
     def _drawGridDivs_x(self, painter: QPainter, step: float):
         """ отрисовка значений делений на оси X """
         if len(self._charts) > 0:
-            if is_logged:
-                Journal.log(__name__, "\tdrawing grid divisions X")
+            _LOG.debug("drawing grid divisions X")
             axis: Axis = self._charts[self._base_chart].getAxis('x')
             fm = QFontMetricsF(self._style['grid']['font'])
             for i, div in axis.generateDivSteps():
@@ -180,8 +168,7 @@ class Graph(QWidget):
     def _drawGridDivs_y(self, painter: QPainter, step: float, axis_name='y'):
         """ отрисовка значений делений на оси Y """
         if len(self._charts) > 0:
-            if is_logged:
-                Journal.log(__name__, f"\tdrawing grid divisions {axis_name}")
+            _LOG.debug("drawing grid divisions %s", axis_name)
             axis: Axis = self._charts[self._base_chart].getAxis(axis_name)
             fm = QFontMetricsF(self._style['grid']['font'])
             for i, div in axis.generateDivSteps():
@@ -194,20 +181,17 @@ class Graph(QWidget):
 
     def _drawBorder(self, painter: QPainter):
         """ отрисовка границы области графика """
-        if is_logged:
-            Journal.log(__name__, "\tdrawing border")
+        _LOG.debug("drawing border")
         pen = painter.pen()
         painter.setPen(self._style['grid']['border'])
-        painter.drawRect(0, 0,
-                         self.getDrawArea().width(),
-                         self.getDrawArea().height()
-        )
+        painter.drawRect(QRectF(0, 0,
+                                self.getDrawArea().width(),
+                                self.getDrawArea().height()))
         painter.setPen(pen)
 
     def _drawCharts(self, painter: QPainter):
         """ отрисовка всех кривых """
-        if is_logged:
-            Journal.log(__name__, "\tdrawCharts ->")
+        _LOG.debug("drawCharts ->")
         transform: QTransform = QTransform()
         transform.setMatrix(1, 0, 0,
                             0, 1, 0,
@@ -221,8 +205,7 @@ class Graph(QWidget):
 
     def _drawChart(self, painter: QPainter, chart: Chart, _flag=''):
         """ отрисовка кривой """
-        if is_logged:
-            Journal.log(__name__, "\tdrawing chart", chart.name)
+        _LOG.debug("drawing chart %s", chart.name)
         if len(chart.getPoints('x')) > 1:
             points = chart.getTranslatedPoints([
                 self.getDrawArea().width(),
@@ -231,13 +214,12 @@ class Graph(QWidget):
             points = chart.apply_spline(points)
             Graph.drawCurve(painter, points, chart.getPen())
         else:
-            Journal.log(__name__, "\tchart", chart.name, "is empty")
+            _LOG.debug("chart %s is empty", chart.name)
 
     def _updateBaseChart(self, chart: Chart, name: str):
         """ обновление информации об основной кривой """
         if self._base_chart == 'none' or name == 'none':
-            if is_logged:
-                Journal.log(__name__, "\tupdating base chart to", name)
+            _LOG.debug("updating base chart to %s", name)
             self._base_chart = name
             self._divs_x = chart.getAxis('x').getDivs() if chart else 1
             self._divs_y = chart.getAxis('y').getDivs() if chart else 1
@@ -300,7 +282,8 @@ class Graph(QWidget):
             self._margins[0],
             -self.getDrawArea().height() - self._margins[1]
         )
-        painter.setTransform(transform)
+        if painter is not None:
+            painter.setTransform(transform)
 
     def _getSteps(self):
         step_x = self.getDrawArea().width() / self._divs_x
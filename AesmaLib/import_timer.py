@@ -0,0 +1,60 @@
+"""
+    Модуль замера времени импорта модулей
+    ImportTimer - перехватывает импорт и записывает время загрузки
+    каждого модуля (собственное и вместе с вложенными импортами)
+"""
+import sys
+import time
+import builtins
+
+
+class ImportTimer:
+    """ Класс замера времени импорта модулей """
+    def __init__(self):
+        self._original = None
+        self._stack = []    # время вложенных импортов для текущего уровня
+        self._times = {}    # {модуль: (собственное время, общее время, уровень)}
+
+    def install(self):
+        """ установка перехвата импорта """
+        if self._original is None:
+            self._original = builtins.__import__
+            builtins.__import__ = self._import
+
+    def uninstall(self):
+        """ снятие перехвата импорта """
+        if self._original is not None:
+            builtins.__import__ = self._original
+            self._original = None
+
+    def getTimes(self) -> dict:
+        """ время импорта модулей, сек """
+        return dict(self._times)
+
+    def report(self, file=None, limit=50):
+        """ вывод самых долгих импортов (по общему времени) """
+        file = file if file else sys.stdout
+        items = sorted(self._times.items(), key=lambda x: x[1][1], reverse=True)
+        total = sum(vals[1] for vals in self._times.values() if vals[2] == 0)
+        file.write(f"Импорт модулей: {len(items)}, всего {total * 1000:.1f} мс\n")
+        file.write(f"{'общее, мс':>10}{'собств., мс':>12}  модуль\n")
+        for name, (self_time, cumulative, depth) in items[:limit]:
+            file.write(f"{cumulative * 1000:>10.1f}{self_time * 1000:>12.1f}"
+                       f"  {'  ' * depth}{name}\n")
+
+    def _import(self, name, globals_=None, locals_=None, fromlist=(), level=0):
+        """ перехваченный импорт: замер только для новых модулей """
+        if level or name in sys.modules:
+            return self._original(name, globals_, locals_, fromlist, level)
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original(name, globals_, locals_, fromlist, level)
+        finally:
+            cumulative = time.perf_counter() - start
+            nested = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += cumulative
+            if name not in self._times:
+                self._times[name] = (cumulative - nested, cumulative,
+                                     len(self._stack))
@@ -2,8 +2,23 @@
     Модуль журналирования
     logged - декоратор журналирования метода
     log - метод записи сообщения в журнал
+    getLogger - журнал модуля с уровнями сообщений
+    dump - вывод последних записей журнала (при аварийном завершении)
 """
-from datetime import date
+import os
+import sys
+import time
+import queue
+import atexit
+import threading
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+
+
+def _skip(*_args, **_kwargs):
+    """ заглушка для отключенного уровня журналирования """
 
 
 class Journal:
@@ -12,6 +27,65 @@ class Journal:
     IS_NUMERATED = True     # вкл/выкл нумерации строк
     WRITE_TO_FILE = False   # вкл/выкл записи в файл
     LINE_NUMBER = 0         # текущий номер строки
+    FLUSH_INTERVAL = 1.0    # период сброса буфера записи в файл, сек
+    FILE_PATH = 'journal.log'       # файл журнала
+    FILE_MAX_SIZE = 1024 * 1024     # размер файла для ротации, байт
+    FILE_BACKUPS = 5                # кол-во старых файлов журнала
+    RING_SIZE = 500                 # кол-во последних записей в памяти
+    RING_PATH = None                # файл для периодического сброса последних
+                                    # записей (на случай аварии интерпретатора)
+    # уровни сообщений
+    DEBUG = 10
+    INFO = 20
+    WARNING = 30
+    ERROR = 40
+    LEVEL_NAMES = {DEBUG: 'DEBUG', INFO: 'INFO', WARNING: 'WARNING', ERROR: 'ERROR'}
+    LEVEL = INFO            # уровень по умолчанию
+    LEVELS = {}             # уровни для модулей {'Classes.Graph': WARNING}
+    _loggers = {}           # журналы модулей
+    _writer = None          # поток вывода записей
+    _lock = threading.Lock()
+    _ring = deque()         # последние записи (размер - RING_SIZE)
+
+    @staticmethod
+    def setLogged(state: bool):
+        """ вкл/выкл журналирования """
+        Journal.LOGGED = state
+        Journal._updateLoggers()
+
+    @staticmethod
+    def setLevel(level: int, module: str = ''):
+        """ установка уровня сообщений для модуля (пакета)
+            или по умолчанию, если модуль не указан """
+        if module:
+            Journal.LEVELS[module] = level
+        else:
+            Journal.LEVEL = level
+        Journal._updateLoggers()
+
+    @staticmethod
+    def getLevel(module: str) -> int:
+        """ получение уровня сообщений для модуля:
+            ищется ближайший родительский пакет с заданным уровнем """
+        name = module
+        while name:
+            if name in Journal.LEVELS:
+                return Journal.LEVELS[name]
+            name = name.rpartition('.')[0]
+        return Journal.LEVEL
+
+    @staticmethod
+    def getLogger(module: str):
+        """ получение журнала модуля """
+        if module not in Journal._loggers:
+            Journal._loggers[module] = Logger(module)
+        return Journal._loggers[module]
+
+    @staticmethod
+    def _updateLoggers():
+        """ обновление журналов модулей после смены настроек """
+        for logger in Journal._loggers.values():
+            logger.update()
 
     @staticmethod
     def logged(func):
@@ -49,15 +123,41 @@ class Journal:
         """ Запись сообщения в журнал """
         if Journal.LOGGED:
             message = " ".join([str(item) for item in messages])
-            if Journal.IS_NUMERATED:
-                Journal.LINE_NUMBER += 1
-                message = str(Journal.LINE_NUMBER) + '> ' + message
-            cur_date = date.today().strftime('%Y-%m-%d')
-            if Journal.WRITE_TO_FILE:
-                with open(cur_date, 'a', encoding='utf-8') as file_:
-                    file_.write(message + '\n')
-                    file_.close()
-            print(message, end=end)
+            Journal.emit(Journal.INFO, '', message, end)
+
+    @staticmethod
+    def emit(level: int, module: str, message: str, end='\n'):
+        """ создание записи журнала и передача её потоку вывода,
+            вызывающий поток не ждёт вывода в консоль и файл """
+        with Journal._lock:
+            Journal.LINE_NUMBER += 1
+            record = JournalRecord(
+                Journal.LINE_NUMBER, time.time(),
+                threading.current_thread().name,
+                level, module, message, end
+            )
+            if Journal._ring.maxlen != Journal.RING_SIZE:
+                Journal._ring = deque(Journal._ring, maxlen=Journal.RING_SIZE)
+            Journal._ring.append(record)
+        Journal._getWriter().put(record)
+
+    @staticmethod
+    def dump(file=None):
+        """ вывод последних записей журнала из памяти """
+        file = file if file else sys.stderr
+        with Journal._lock:
+            records = list(Journal._ring)
+        file.write(f"*** последние записи журнала ({len(records)}) ***\n")
+        for record in records:
+            file.write(record.toLine())
+        file.flush()
+
+    @staticmethod
+    def stop():
+        """ вывод оставшихся записей и остановка потока вывода """
+        if Journal._writer is not None:
+            Journal._writer.stop()
+            Journal._writer = None
 
     @staticmethod
     def log_func(func, postfix=""):
@@ -74,3 +174,162 @@ class Journal:
             Journal.log(f"{func.__self__.__class__.__name__}::",
                         f"\t{func.__func__.__doc__.strip()}",
                         f"--> {postfix}" if postfix else "")
+
+    @staticmethod
+    def _getWriter():
+        """ получение (запуск при первом обращении) потока вывода записей """
+        if Journal._writer is None:
+            with Journal._lock:
+                if Journal._writer is None:
+                    writer = JournalWriter(Journal.FLUSH_INTERVAL)
+                    writer.start()
+                    Journal._writer = writer
+        return Journal._writer
+
+
+@dataclass
+class JournalRecord:
+    """ Класс записи журнала """
+    number: int         # порядковый номер
+    timestamp: float    # время создания, сек
+    thread: str         # имя потока
+    level: int          # уровень сообщения
+    module: str         # модуль
+    message: str        # текст
+    end: str = '\n'     # окончание строки для консоли
+
+    def toText(self) -> str:
+        """ текст записи для консоли (с модулем, если указан) """
+        text = f"{self.module}\t{self.message}" if self.module else self.message
+        if Journal.IS_NUMERATED:
+            return f"{self.number}> {text}"
+        return text
+
+    def toLine(self) -> str:
+        """ строка записи для файла: время, поток, уровень, модуль, текст """
+        stamp = datetime.fromtimestamp(self.timestamp)
+        return "\t".join((
+            stamp.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3],
+            self.thread, Journal.LEVEL_NAMES.get(self.level, str(self.level)),
+            self.module,
+            self.message.replace('\n', ' ')
+        )) + '\n'
+
+
+class Logger:
+    """ Журнал модуля с уровнями сообщений.
+        Методы отключенных уровней заменяются заглушкой,
+        поэтому отфильтрованное сообщение не форматируется:
+        logger.debug("точка %s добавлена", name) """
+    def __init__(self, module: str):
+        self.module = module
+        self.debug = self.info = self.warning = self.error = _skip
+        self.update()
+
+    def update(self):
+        """ обновление методов в соответствии с уровнем модуля """
+        level = Journal.getLevel(self.module)
+        for msg_level, name in ((Journal.DEBUG, 'debug'),
+                                (Journal.INFO, 'info'),
+                                (Journal.WARNING, 'warning'),
+                                (Journal.ERROR, 'error')):
+            is_enabled = Journal.LOGGED and msg_level >= level
+            setattr(self, name,
+                    partial(self._write, msg_level) if is_enabled else _skip)
+
+    def isEnabled(self, level: int) -> bool:
+        """ проверка, включен ли уровень сообщений """
+        return Journal.LOGGED and level >= Journal.getLevel(self.module)
+
+    def _write(self, level: int, message: str, *args):
+        """ форматирование и запись сообщения в журнал """
+        if args:
+            message = message % args
+        Journal.emit(level, self.module, message)
+
+
+class JournalWriter(threading.Thread):
+    """ Поток вывода записей журнала: забирает записи из очереди,
+        выводит в консоль и, если включено, в файл с ротацией по размеру """
+    def __init__(self, interval: float):
+        super().__init__(name="Journal writer", daemon=True)
+        self._interval = interval
+        self._queue = queue.Queue()
+        self._stop_event = threading.Event()
+        self._file = None
+        self._dumped = 0    # номер последней сброшенной в RING_PATH записи
+
+    def put(self, record: JournalRecord):
+        """ добавление записи в очередь вывода """
+        self._queue.put(record)
+
+    def run(self):
+        """ вывод записей до остановки, файл сбрасывается
+            на диск раз в interval секунд """
+        last_flush = time.monotonic()
+        while not (self._stop_event.is_set() and self._queue.empty()):
+            try:
+                record = self._queue.get(timeout=self._interval)
+                self._write(record)
+            except queue.Empty:
+                pass
+            if time.monotonic() - last_flush >= self._interval:
+                self._flush()
+                self._dumpRing()
+                last_flush = time.monotonic()
+        self._flush()
+        self._dumpRing()
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def stop(self):
+        """ остановка потока после вывода оставшихся записей """
+        self._stop_event.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join()
+
+    def _write(self, record: JournalRecord):
+        """ вывод записи """
+        print(record.toText(), end=record.end)
+        if Journal.WRITE_TO_FILE:
+            self._getFile().write(record.toLine())
+
+    def _flush(self):
+        """ сброс буферов вывода """
+        sys.stdout.flush()
+        if self._file:
+            self._file.flush()
+
+    def _dumpRing(self):
+        """ перезапись файла последних записей, если появились новые """
+        if not Journal.RING_PATH or self._dumped == Journal.LINE_NUMBER:
+            return
+        self._dumped = Journal.LINE_NUMBER
+        path = f"{Journal.RING_PATH}.tmp"
+        with open(path, 'w', encoding='utf-8') as file_:
+            Journal.dump(file_)
+        os.replace(path, Journal.RING_PATH)
+
+    def _getFile(self):
+        """ получение открытого файла журнала с ротацией по размеру """
+        if self._file and self._file.tell() >= Journal.FILE_MAX_SIZE:
+            self._file.close()
+            self._file = None
+            self._rotate()
+        if self._file is None:
+            self._file = open(Journal.FILE_PATH, 'a', encoding='utf-8')
+        return self._file
+
+    @staticmethod
+    def _rotate():
+        """ ротация: journal.log -> journal.log.1 -> ... """
+        path = Journal.FILE_PATH
+        for i in range(Journal.FILE_BACKUPS - 1, 0, -1):
+            if os.path.exists(f"{path}.{i}"):
+                os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+        if os.path.exists(path):
+            os.replace(path, f"{path}.1")
+
+
+atexit.register(Journal.stop)
@@ -0,0 +1,103 @@
+"""
+    Модуль замера времени запуска приложения
+    StartupTracer - записывает моменты начала и окончания этапов запуска
+    (импорт, загрузка интерфейса, подключение к БД, список тестов,
+    комбобоксы, первая отрисовка) и формирует отчёт
+"""
+import sys
+import time
+# начало отсчёта фиксируется до импорта Qt
+_START = time.monotonic()
+from contextlib import contextmanager
+from PyQt5.QtCore import QObject, QEvent, QTimer
+
+
+class StartupTracer:
+    """ Класс замера времени этапов запуска """
+    _start = _START             # начало отсчёта (импорт модуля)
+    _begins = {}                # {этап: начало}
+    _phases = []                # [(этап, начало, окончание)]
+    _filter = None              # фильтр событий первой отрисовки
+
+    @staticmethod
+    def reset():
+        """ сброс замеров и начала отсчёта """
+        StartupTracer._start = time.monotonic()
+        StartupTracer._begins.clear()
+        StartupTracer._phases.clear()
+
+    @staticmethod
+    def begin(name: str):
+        """ начало этапа """
+        StartupTracer._begins[name] = time.monotonic()
+
+    @staticmethod
+    def end(name: str):
+        """ окончание этапа """
+        if name in StartupTracer._begins:
+            begin = StartupTracer._begins.pop(name)
+            StartupTracer._phases.append((name, begin, time.monotonic()))
+
+    @staticmethod
+    @contextmanager
+    def phase(name: str):
+        """ замер этапа: with StartupTracer.phase('combos'): ... """
+        StartupTracer.begin(name)
+        try:
+            yield
+        finally:
+            StartupTracer.end(name)
+
+    @staticmethod
+    def watchFirstPaint(widget, callback=None):
+        """ окончание этапа 'first paint' после обработки первого
+            события отрисовки виджета, затем вызов callback """
+        StartupTracer.begin('first paint')
+        StartupTracer._filter = _FirstPaintFilter(widget, callback)
+        widget.installEventFilter(StartupTracer._filter)
+
+    @staticmethod
+    def getPhases() -> list:
+        """ этапы: [(этап, смещение от начала, длительность)], сек """
+        start = StartupTracer._start
+        return [(name, begin - start, end - begin)
+                for name, begin, end in StartupTracer._phases]
+
+    @staticmethod
+    def getTotal() -> float:
+        """ время от начала отсчёта до окончания последнего этапа, сек """
+        if not StartupTracer._phases:
+            return 0.0
+        end = max(phase[2] for phase in StartupTracer._phases)
+        return end - StartupTracer._start
+
+    @staticmethod
+    def report(file=None):
+        """ вывод отчёта по этапам запуска """
+        file = file if file else sys.stdout
+        file.write(f"Запуск: {StartupTracer.getTotal() * 1000:.1f} мс\n")
+        file.write(f"{'начало, мс':>11}{'длит., мс':>11}  этап\n")
+        for name, offset, duration in StartupTracer.getPhases():
+            file.write(f"{offset * 1000:>11.1f}{duration * 1000:>11.1f}  {name}\n")
+
+
+class _FirstPaintFilter(QObject):
+    """ Фильтр событий, отмечающий первую отрисовку виджета """
+    def __init__(self, widget, callback):
+        super().__init__(widget)
+        self._callback = callback
+
+    def eventFilter(self, obj, event):
+        """ первое событие отрисовки: окончание этапа
+            откладывается до завершения отрисовки """
+        if event.type() == QEvent.Paint:
+            obj.removeEventFilter(self)
+            QTimer.singleShot(0, self._finish)
+        return False
+
+    def _finish(self):
+        """ окончание этапа первой отрисовки """
+        StartupTracer.end('first paint')
+        StartupTracer._filter = None
+        if self._callback:
+            self._callback()
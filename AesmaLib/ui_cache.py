@@ -0,0 +1,105 @@
+"""
+    Модуль загрузки графического интерфейса из модулей,
+    заранее сгенерированных из файлов .ui
+    loadUi - загружает интерфейс в виджет (аналог uic.loadUi)
+    compileUi - генерирует модуль интерфейса в папку кэша
+    Модуль кэша хранит хэш исходного .ui файла, при его изменении
+    модуль генерируется заново, а если это невозможно -
+    интерфейс загружается разбором .ui файла (uic.loadUi)
+
+    Генерация модулей при сборке:
+    python -m AesmaLib.ui_cache Files/mainwindow_seal.ui Files/seal_window.ui
+"""
+import os
+import sys
+import hashlib
+import py_compile
+import importlib.util
+from AesmaLib.journal import Journal
+
+
+CACHE_DIR = '__uicache__'   # папка кэша рядом с файлом .ui
+HASH_PREFIX = '# ui-hash: '
+_LOG = Journal.getLogger(__name__)
+
+
+def loadUi(path_to_ui: str, widget):
+    """ загрузка интерфейса в виджет
+        -> возвращает виджет (как uic.loadUi) """
+    module = _getModule(path_to_ui)
+    if module is None:
+        from PyQt5 import uic
+        _LOG.info("загрузка %s разбором .ui", path_to_ui)
+        return uic.loadUi(path_to_ui, widget)
+    ui_class = next(getattr(module, name) for name in dir(module)
+                    if name.startswith('Ui_'))
+    form = ui_class()
+    form.setupUi(widget)
+    # uic.loadUi создаёт элементы как атрибуты виджета
+    for name, value in vars(form).items():
+        setattr(widget, name, value)
+    return widget
+
+
+def compileUi(path_to_ui: str) -> str:
+    """ генерация модуля интерфейса с хэшем .ui файла
+        -> возвращает путь к модулю """
+    from PyQt5 import uic
+    path_to_module = getModulePath(path_to_ui)
+    os.makedirs(os.path.dirname(path_to_module), exist_ok=True)
+    path_to_temp = path_to_module + '.tmp'
+    with open(path_to_ui, encoding='utf-8') as ui_file, \
+         open(path_to_temp, 'w', encoding='utf-8') as py_file:
+        py_file.write(f"{HASH_PREFIX}{getHash(path_to_ui)}\n")
+        uic.compileUi(ui_file, py_file)
+    os.replace(path_to_temp, path_to_module)
+    # байт-код сохраняется сразу, чтобы модуль не компилировался
+    # при каждом запуске (даже если запись байт-кода отключена)
+    py_compile.compile(path_to_module, doraise=True)
+    _LOG.info("сгенерирован модуль интерфейса %s", path_to_module)
+    return path_to_module
+
+
+def getModulePath(path_to_ui: str) -> str:
+    """ путь к модулю интерфейса в кэше """
+    folder, name = os.path.split(os.path.abspath(path_to_ui))
+    return os.path.join(folder, CACHE_DIR, os.path.splitext(name)[0] + '_ui.py')
+
+
+def getHash(path_to_ui: str) -> str:
+    """ хэш содержимого .ui файла """
+    with open(path_to_ui, 'rb') as file_:
+        return hashlib.sha1(file_.read()).hexdigest()
+
+
+def isFresh(path_to_ui: str) -> bool:
+    """ проверка, что модуль в кэше сгенерирован из текущего .ui файла """
+    path_to_module = getModulePath(path_to_ui)
+    if not os.path.exists(path_to_module):
+        return False
+    with open(path_to_module, encoding='utf-8') as file_:
+        line = file_.readline().strip()
+    return line == HASH_PREFIX + getHash(path_to_ui)
+
+
+def _getModule(path_to_ui: str):
+    """ загрузка модуля интерфейса из кэша с генерацией
+        устаревшего -> возвращает модуль или None """
+    try:
+        if not isFresh(path_to_ui):
+            _LOG.info("модуль интерфейса для %s устарел", path_to_ui)
+            compileUi(path_to_ui)
+        path_to_module = getModulePath(path_to_ui)
+        name = os.path.splitext(os.path.basename(path_to_module))[0]
+        spec = importlib.util.spec_from_file_location(name, path_to_module)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    except (OSError, SyntaxError, ImportError, py_compile.PyCompileError) as error:
+        _LOG.warning("кэш интерфейса недоступен: %s", error)
+    return None
+
+
+if __name__ == '__main__':
+    for path in sys.argv[1:]:
+        print(compileUi(path))
@@ -0,0 +1,235 @@
+#!python
+# coding=utf-8
+"""
+    Замер опроса контроллера (Adam5K + AdamManager) на имитаторе Adam5000TCP,
+    запущенном в отдельном процессе (его нагрузка не входит в замер CPU).
+    Для каждого интервала опроса выводятся:
+    samples/s - частота событий dataReceived,
+    emit - задержка от чтения аналоговых данных из сокета до испускания
+    dataReceived в потоке опроса (на тиках записи событие испускается
+    без чтения, поэтому хвост распределения - это возраст данных),
+    delivery - то же до получения события в главном потоке Qt,
+    write - задержка от вызова AdamManager.setValue (ползунок) до ответа
+    контроллера на команду записи,
+    cpu/sample - процессорное время программы на одно событие.
+
+    python Benchmarks/bench_acquisition.py --intervals 0.1 0.05 0 --json acq.json
+    python Benchmarks/bench_acquisition.py --baseline acq.json --threshold 0.2
+    (код возврата 1, если частота упала или задержки выросли больше threshold)
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import subprocess
+from collections import deque
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# метрики: имя -> True, если рост значения - это ухудшение
+METRICS = {
+    'rate': False,
+    'emit_p50': True, 'emit_p99': True,
+    'delivery_p50': True, 'delivery_p99': True,
+    'write_p50': True, 'write_p99': True,
+    'cpu_per_sample': True
+}
+
+
+class SocketProbe:
+    """ Класс обёртки сокета Adam5K с отметками времени чтения ответов """
+    READ_ANALOG = 0x04
+    WRITES = (0x05, 0x06)
+
+    def __init__(self, sock):
+        self._sock = sock
+        self._func = 0
+        self.read_time = 0.0            # время последнего чтения аналоговых данных
+        self.pending = deque()          # время вызова setValue для команд в очереди
+        self.write_delays = []
+
+    def __getattr__(self, name):
+        return getattr(self._sock, name)
+
+    def sendall(self, data):
+        """ отправка команды (запоминается код функции) """
+        self._func = data[7] if len(data) > 7 else 0
+        self._sock.sendall(data)
+
+    def recv(self, size: int) -> bytes:
+        """ чтение ответа с отметкой времени """
+        result = self._sock.recv(size)
+        now = time.perf_counter()
+        if self._func == self.READ_ANALOG:
+            self.read_time = now
+        elif self._func in self.WRITES and self.pending:
+            self.write_delays.append(now - self.pending.popleft())
+            self._func = 0      # ответ читается частями - учитывается первая
+        return result
+
+
+def startSimulator(latency: float, jitter: float):
+    """ запуск имитатора в отдельном процессе -> (процесс, порт) """
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'Classes.Adam.adam_simulator', '--port', '0',
+         '--latency', str(latency), '--jitter', str(jitter), '--seed', '0'],
+        cwd=ROOT, stdout=subprocess.PIPE, text=True
+    )
+    line = proc.stdout.readline()
+    if not line:
+        raise RuntimeError(f"имитатор не запущен (код {proc.wait()})")
+    return proc, int(line.rsplit(':', 1)[1])
+
+
+def runOnce(app, port: int, interval: float, duration: float, writes: float) -> dict:
+    """ замер опроса с заданным интервалом -> метрики """
+    from PyQt5.QtCore import Qt, QObject, QTimer, pyqtSlot
+    from Classes.Adam.adam_manager import AdamManager
+    from Classes.Adam import adam_config
+
+    emitted, delivered, sent = [], [], deque()
+
+    class Receiver(QObject):
+        """ получатель событий в главном потоке """
+        @pyqtSlot(dict)
+        def onData(self, _args):
+            delivered.append(time.perf_counter() - sent.popleft())
+
+    def onEmit(_args):
+        now = time.perf_counter()
+        emitted.append(now - probe.read_time)
+        sent.append(probe.read_time)
+
+    manager = AdamManager('127.0.0.1', port)
+    if not manager._adam.connect():
+        raise RuntimeError("нет подключения к имитатору")
+    probe = SocketProbe(manager._adam._sock)
+    manager._adam._sock = probe
+    receiver = Receiver()
+    manager.dataReceived.connect(onEmit, Qt.DirectConnection)
+    manager.dataReceived.connect(receiver.onData, Qt.QueuedConnection)
+
+    stop = threading.Event()
+
+    def threadWrites():
+        value, param = 0, adam_config.params['valve_']
+        while not stop.wait(1.0 / writes):
+            value = (value + 97) % param.dig_max
+            probe.pending.append(time.perf_counter())
+            manager.setValue(param, value)
+
+    writer = threading.Thread(target=threadWrites) if writes > 0 else None
+    cpu = time.process_time()
+    manager.setPollingState(True, interval)
+    if writer:
+        writer.start()
+    QTimer.singleShot(int(duration * 1000), app.quit)
+    app.exec_()
+    stop.set()
+    if writer:
+        writer.join()
+    manager.setPollingState(False)
+    app.processEvents()
+    cpu = time.process_time() - cpu
+    manager.dataReceived.disconnect()
+
+    result = {
+        'interval': interval,
+        'samples': len(emitted),
+        'rate': len(emitted) / duration,
+        'writes': len(probe.write_delays),
+        'cpu_per_sample': cpu / len(emitted) if emitted else None
+    }
+    for name, values in (('emit', emitted), ('delivery', delivered),
+                         ('write', probe.write_delays)):
+        percentiles = np.percentile(values, (50, 99)).tolist() if values else (None, None)
+        result[f'{name}_p50'], result[f'{name}_p99'] = percentiles
+    return result
+
+
+def report(results: list, file=None):
+    """ вывод таблицы результатов """
+    def msec(value):
+        return f"{value * 1000:>9.2f}" if value is not None else f"{'-':>9}"
+
+    file = file if file else sys.stdout
+    file.write(f"{'интервал':>9}{'samples/s':>10}{'emit50':>9}{'emit99':>9}"
+               f"{'deliv50':>9}{'deliv99':>9}{'write50':>9}{'write99':>9}"
+               f"{'cpu/smp':>9}  (мс)\n")
+    for res in results:
+        file.write(f"{res['interval']:>9.3f}{res['rate']:>10.1f}"
+                   + "".join(msec(res[name]) for name in (
+                       'emit_p50', 'emit_p99', 'delivery_p50', 'delivery_p99',
+                       'write_p50', 'write_p99', 'cpu_per_sample'))
+                   + "\n")
+
+
+def checkRegression(results: list, path_to_baseline: str, threshold: float) -> list:
+    """ сравнение с базовым замером по одинаковым интервалам
+        -> список замечаний """
+    with open(path_to_baseline, encoding='utf-8') as file_:
+        baseline = {res['interval']: res for res in json.load(file_)['results']}
+    result = []
+    for res in results:
+        base = baseline.get(res['interval'])
+        if base is None:
+            continue
+        for name, rising_is_worse in METRICS.items():
+            old, new = base.get(name), res.get(name)
+            if not old or new is None:
+                continue
+            change = (new - old) / old if rising_is_worse else (old - new) / old
+            if change > threshold:
+                result.append(f"интервал {res['interval']}: {name} {old:.6g} -> {new:.6g}")
+    return result
+
+
+def main():
+    """ разбор аргументов и запуск замеров """
+    parser = argparse.ArgumentParser(description="Замер опроса контроллера")
+    parser.add_argument('--intervals', type=float, nargs='+', default=[0.1, 0.05, 0.0],
+                        help="интервалы опроса, сек")
+    parser.add_argument('--duration', type=float, default=5.0,
+                        help="длительность замера одного интервала, сек")
+    parser.add_argument('--writes', type=float, default=2.0,
+                        help="частота записи ползунка, раз/сек (0 - без записи)")
+    parser.add_argument('--latency', type=float, default=0.001,
+                        help="задержка ответа имитатора, сек")
+    parser.add_argument('--jitter', type=float, default=0.0005,
+                        help="разброс задержки имитатора, сек")
+    parser.add_argument('--json', help="файл для сохранения результатов")
+    parser.add_argument('--baseline', help="файл базового замера (--json)")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="допустимое ухудшение метрики, доля")
+    args = parser.parse_args()
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtCore import QCoreApplication
+    app = QCoreApplication(sys.argv[:1])
+    proc, port = startSimulator(args.latency, args.jitter)
+    try:
+        results = [runOnce(app, port, interval, args.duration, args.writes)
+                   for interval in args.intervals]
+    finally:
+        proc.terminate()
+        proc.wait()
+    print(f"имитатор: задержка {args.latency * 1000:.1f} мс, "
+          f"разброс {args.jitter * 1000:.1f} мс, запись {args.writes} раз/сек")
+    report(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file_:
+            json.dump({'options': vars(args), 'results': results},
+                      file_, indent=2, ensure_ascii=False)
+    if args.baseline:
+        regressions = checkRegression(results, args.baseline, args.threshold)
+        for line in regressions:
+            print("РЕГРЕССИЯ", line)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,144 @@
+#!python
+# coding=utf-8
+"""
+    Замер времени запуска главного окна без дисплея (QT_QPA_PLATFORM=offscreen)
+    на синтетической базе данных.
+    Каждый запуск выполняется в отдельном процессе, чтобы учитывать импорт.
+
+    python Benchmarks/bench_startup.py --tests 5000 --runs 5 --json result.json
+    python Benchmarks/bench_startup.py --baseline result.json --threshold 0.2
+    (код возврата 1, если медиана запуска выросла больше чем на threshold)
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+RESULT_PREFIX = 'STARTUP_RESULT '
+
+
+def runChild(path_to_db: str):
+    """ запуск главного окна и вывод длительности этапов """
+    from AesmaLib.startup_tracer import StartupTracer
+    StartupTracer.begin('imports')
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtWidgets import QApplication
+    from Classes.UI.wnd_main import MainWindow
+    StartupTracer.end('imports')
+
+    paths = {
+        'DB': path_to_db,
+        'WND': os.path.join(ROOT, 'Files/mainwindow_seal.ui'),
+        'TYPE': os.path.join(ROOT, 'Files/seal_window.ui'),
+        'TEMPLATE': os.path.join(ROOT, 'Files/report')
+    }
+    QApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    app = QApplication(sys.argv[:1])
+    wnd = MainWindow(paths)
+
+    def onFirstPaint():
+        result = {name: duration for name, _, duration in StartupTracer.getPhases()}
+        result['total'] = StartupTracer.getTotal()
+        print(RESULT_PREFIX + json.dumps(result), flush=True)
+        app.quit()
+
+    StartupTracer.watchFirstPaint(wnd, onFirstPaint)
+    if wnd.show():
+        app.exec_()
+
+
+def runOnce(path_to_db: str, timeout: float) -> dict:
+    """ один запуск в отдельном процессе -> длительность этапов, сек """
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', path_to_db],
+        env=env, cwd=ROOT, capture_output=True, text=True,
+        timeout=timeout, check=False
+    )
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"запуск не завершён (код {proc.returncode}):\n{proc.stderr}")
+
+
+def summarize(runs: list) -> dict:
+    """ медиана, минимум и максимум по каждому этапу, сек """
+    names = list(dict.fromkeys(name for run in runs for name in run))
+    result = {}
+    for name in names:
+        values = [run[name] for run in runs if name in run]
+        result[name] = {
+            'median': statistics.median(values),
+            'min': min(values),
+            'max': max(values)
+        }
+    return result
+
+
+def report(summary: dict, file=None):
+    """ вывод отчёта по этапам """
+    file = file if file else sys.stdout
+    file.write(f"{'медиана, мс':>12}{'мин, мс':>10}{'макс, мс':>10}  этап\n")
+    for name, vals in summary.items():
+        file.write(f"{vals['median'] * 1000:>12.1f}{vals['min'] * 1000:>10.1f}"
+                   f"{vals['max'] * 1000:>10.1f}  {name}\n")
+
+
+def checkRegression(summary: dict, path_to_baseline: str, threshold: float) -> list:
+    """ сравнение медиан с базовым замером -> список замечаний """
+    with open(path_to_baseline, encoding='utf-8') as file_:
+        baseline = json.load(file_)['summary']
+    result = []
+    for name, vals in summary.items():
+        if name in baseline:
+            base = baseline[name]['median']
+            if base > 0 and vals['median'] > base * (1 + threshold):
+                result.append(f"{name}: {base * 1000:.1f} -> "
+                              f"{vals['median'] * 1000:.1f} мс")
+    return result
+
+
+def main():
+    """ разбор аргументов и запуск замеров """
+    parser = argparse.ArgumentParser(description="Замер времени запуска")
+    parser.add_argument('--child', metavar='DB', help=argparse.SUPPRESS)
+    parser.add_argument('--tests', type=int, default=2000,
+                        help="кол-во испытаний в синтетической БД")
+    parser.add_argument('--runs', type=int, default=5, help="кол-во запусков")
+    parser.add_argument('--timeout', type=float, default=120.0,
+                        help="ограничение одного запуска, сек")
+    parser.add_argument('--json', help="файл для сохранения результатов")
+    parser.add_argument('--baseline', help="файл базового замера (--json)")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="допустимый рост медианы, доля")
+    args = parser.parse_args()
+    if args.child:
+        runChild(args.child)
+        return 0
+
+    from Benchmarks.synthetic_db import createSyntheticDB
+    with tempfile.TemporaryDirectory() as tmp:
+        path_to_db = createSyntheticDB(os.path.join(tmp, 'seals.sqlite'), args.tests)
+        runs = [runOnce(path_to_db, args.timeout) for _ in range(args.runs)]
+    summary = summarize(runs)
+    print(f"испытаний в БД: {args.tests}, запусков: {args.runs}")
+    report(summary)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file_:
+            json.dump({'tests': args.tests, 'runs': runs, 'summary': summary},
+                      file_, indent=2, ensure_ascii=False)
+    if args.baseline:
+        regressions = checkRegression(summary, args.baseline, args.threshold)
+        for line in regressions:
+            print("РЕГРЕССИЯ", line)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
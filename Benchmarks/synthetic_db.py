@@ -0,0 +1,70 @@
+"""
+    Модуль создания синтетической базы данных для замеров
+    createSyntheticDB - создаёт файл БД со структурой из alchemy_tables
+    и заполняет её случайными производителями, типоразмерами,
+    насосами и испытаниями
+"""
+import os
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from Classes.Data.alchemy_tables import Base, Assembly, Customer, Producer
+from Classes.Data.alchemy_tables import Type, Seal, Test
+
+
+def createSyntheticDB(path_to_db: str, tests=2000, seed=0) -> str:
+    """ создание БД с заданным кол-вом испытаний
+        -> возвращает путь к файлу БД """
+    if os.path.exists(path_to_db):
+        os.remove(path_to_db)
+    rnd = random.Random(seed)
+    producers = max(tests // 400, 3)
+    types = max(tests // 40, 10)
+    seals = max(tests // 2, 1)
+    start = datetime(2020, 1, 1)
+    engine = create_engine(f'sqlite:///{path_to_db}')
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(Assembly.__table__.insert(), [
+            {'ID': i, 'Name': f"Сборка {i}"} for i in range(1, 6)
+        ])
+        conn.execute(Customer.__table__.insert(), [
+            {'ID': i, 'Name': f"Заказчик {i}"} for i in range(1, 21)
+        ])
+        conn.execute(Producer.__table__.insert(), [
+            {'ID': i, 'Name': f"Производитель {i}"}
+            for i in range(1, producers + 1)
+        ])
+        conn.execute(Type.__table__.insert(), [
+            {
+                'ID': i, 'Name': f"ГЗ-{i:03d}",
+                'Producer': rnd.randint(1, producers),
+                'Date': start.strftime('%Y-%m-%d'),
+                'Rpm': 2910.0, 'Thrust': rnd.uniform(1.0, 10.0),
+                'Temp': rnd.uniform(60.0, 120.0),
+                'Power': rnd.uniform(0.5, 5.0),
+                'Direction': rnd.randint(1, 3),
+                'TestPressure': True, 'TestThrust': True,
+                'ProducerName': ""
+            } for i in range(1, types + 1)
+        ])
+        conn.execute(Seal.__table__.insert(), [
+            {'ID': i, 'Serial': f"S{i:06d}", 'Type': rnd.randint(1, types)}
+            for i in range(1, seals + 1)
+        ])
+        conn.execute(Test.__table__.insert(), [
+            {
+                'ID': i, 'OrderNum': f"НЗ-{i:06d}",
+                'Customer': rnd.randint(1, 20),
+                'Seal': rnd.randint(1, seals),
+                'DateReceived': (start + timedelta(hours=i)).strftime('%Y-%m-%d'),
+                'DateTime': (start + timedelta(hours=i)).strftime('%Y-%m-%d %H:%M'),
+                'Head': rnd.randint(1, 5), 'Base': rnd.randint(1, 5),
+                'Coupling': False, 'Coating': False,
+                'OilShavings': False, 'OilWater': False, 'OilKV': 0,
+                'Rotation': "", 'ExtTop': "", 'ExtBottom': "",
+                'Vibrations': "", 'Comments': ""
+            } for i in range(1, tests + 1)
+        ])
+    engine.dispose()
+    return path_to_db
@@ -3,9 +3,9 @@
     Модуль для работы с Advantech Adam5000TCP
 """
 import socket
-from time import sleep
-from threading import Thread
-from dataclasses import dataclass
+from time import sleep, perf_counter, monotonic
+from threading import Thread, Event
+from dataclasses import dataclass, asdict
 from enum import Enum
 from array import array
 from AesmaLib.journal import Journal
@@ -80,6 +80,13 @@ class CommandBuilder:
             result[10:] = b'\xff\00' if value else b'\x00\00'
         return result
 
+    def buildCommand_range(self, slot_type: SlotType, start: int, count: int):
+        """ построение комманды для чтения диапазона регистров """
+        result = self._default_commands[slot_type][CommandType.READ].copy()
+        result[8:10] = start.to_bytes(2, 'big')
+        result[10:12] = count.to_bytes(2, 'big')
+        return result
+
     def buildCommand_slot(self, slot_type: SlotType, slot: int, pattern: list):
         """ построение комманды для чтения из регистров слота """
         address = slot * (16 if slot_type == SlotType.DIGITAL else 8)
@@ -101,23 +108,106 @@ class CommandBuilder:
         return result
 
 
+@dataclass
+class ReadRange:
+    """ Класс непрерывного диапазона регистров для чтения """
+    slot_type: SlotType
+    start: int          # адрес первого регистра (дискретные - кратен 16)
+    count: int          # кол-во регистров
+    command: bytearray
+
+
+class ReadPlan:
+    """ Класс плана чтения - минимальный набор непрерывных диапазонов
+        регистров, покрывающих каналы датчиков. Дискретные каналы
+        читаются слотами целиком (16 выходов), т.к. хранятся словами """
+    MAX_GAP = 4     # пропуск, при котором выгоднее читать одним запросом
+    UNITS = {SlotType.ANALOG: 1, SlotType.DIGITAL: 16}
+
+    def __init__(self, builder: CommandBuilder, params: list):
+        self.key = self.getKey(params)
+        self.ranges = []
+        for slot_type, unit in self.UNITS.items():
+            addresses = sorted({
+                param.slot if unit > 1 else 8 * param.slot + param.channel
+                for param in params if param.slot_type == slot_type
+            })
+            for start, count in self._mergeAddresses(addresses):
+                start, count = start * unit, count * unit
+                self.ranges.append(ReadRange(
+                    slot_type, start, count,
+                    builder.buildCommand_range(slot_type, start, count)
+                ))
+
+    @staticmethod
+    def getKey(params: list) -> tuple:
+        """ ключ плана (для проверки изменения конфигурации) """
+        return tuple(sorted({
+            (param.slot_type.value, param.slot, param.channel) for param in params
+        }))
+
+    def getSize(self) -> int:
+        """ кол-во байт запросов и ответов за один цикл чтения """
+        result = 0
+        for rng in self.ranges:
+            data = rng.count * 2 if rng.slot_type == SlotType.ANALOG else rng.count // 8
+            result += len(rng.command) + 9 + data
+        return result
+
+    @classmethod
+    def _mergeAddresses(cls, addresses: list) -> list:
+        """ объединение адресов в диапазоны -> [(начало, кол-во)] """
+        result = []
+        for address in addresses:
+            if result and address - sum(result[-1]) <= cls.MAX_GAP:
+                result[-1][1] = address - result[-1][0] + 1
+            else:
+                result.append([address, 1])
+        return [tuple(item) for item in result]
+
+
+@dataclass
+class LinkHealth:
+    """ Класс показателей качества связи """
+    online: bool = False        # соединение установлено
+    rtt: float = 0.0            # время отклика (скользящее среднее), сек
+    rtt_max: float = 0.0        # максимальное время отклика, сек
+    requests: int = 0           # кол-во запросов
+    errors: int = 0             # кол-во ошибок (нет ответа, неверный ответ)
+    error_rate: float = 0.0     # доля ошибок (скользящее среднее)
+    reconnects: int = 0         # кол-во восстановлений связи
+    invalid_samples: int = 0    # кол-во тиков без достоверных данных
+    last_error: str = ''
+
+
 class Adam5K:
     """ Класс для работы с Advantech Adam5000TCP """
-
-    _states = {
-        "is_connected": False,
-        "is_reading": False,
-        "is_paused": False,
-        "interval": 1.0
-    }
+    RTT_ALPHA = 0.5         # коэффициент сглаживания времени отклика
+    ERROR_ALPHA = 0.05      # коэффициент сглаживания доли ошибок
+    CONNECT_TIMEOUT = 0.5   # ожидание подключения, сек
+    READ_TIMEOUT = 1.0      # ожидание ответа, сек
+    RECONNECT_MIN = 0.5     # начальная пауза перед переподключением, сек
+    RECONNECT_MAX = 10.0    # максимальная пауза перед переподключением, сек
 
     def __init__(self, host: str, port=502, address=1):
         self._conn = (host, port)
+        self._states = {
+            "is_connected": False,
+            "is_reading": False,
+            "is_paused": False,
+            "interval": 1.0
+        }
         self._builder = CommandBuilder(address.to_bytes(1, 'big')[0])
         self._sock: socket.socket = None
         self._thread: Thread = None
         self._callback = None
         self._commands = []
+        self._plan: ReadPlan = None
+        self._health = LinkHealth()
+        self._is_valid = False      # данные последнего тика достоверны
+        self._stamps = (0.0, 0.0)   # отметки отправки/получения последнего тика
+        self._reconnect = {'delay': self.RECONNECT_MIN, 'time': 0.0}
+        self._wake = Event()        # прерывание ожидания опроса
         self._data = {
             SlotType.ANALOG: [],
             SlotType.DIGITAL: []
@@ -137,12 +227,10 @@ class Adam5K:
             msg = 'already connected'
         else:
             try:
-                self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                self._sock.settimeout(0.5)
-                self._sock.connect(self._conn)
-                self._sock.settimeout(None)
+                self.__openSocket()
                 self._states["is_connected"] = True
                 self._states["is_reading"] = False
+                self._reconnect['delay'] = self.RECONNECT_MIN
                 msg = 'socket connected'
             except socket.error as ex:
                 msg = 'error', self._conn, ex.strerror
@@ -155,10 +243,10 @@ class Adam5K:
             msg = 'not connected'
         else:
             self._states["is_reading"] = False
-            while self._thread.is_alive():
+            self._wake.set()
+            while self._thread and self._thread.is_alive():
                 continue
-            self._sock.close()
-            self._sock = None
+            self.__closeSocket()
             self._states["is_connected"] = False
             msg = 'socket disconnected'
         Journal.log(f'Adam5K::disconnect:\t{msg}')
@@ -188,9 +276,38 @@ class Adam5K:
         self._commands.clear()
 
     def setInterval(self, seconds: float):
-        """ установка интервала опроса """
+        """ установка интервала опроса (при уменьшении
+            текущее ожидание прерывается) """
+        if seconds < self._states["interval"]:
+            self._wake.set()
         self._states["interval"] = seconds
 
+    def getInterval(self) -> float:
+        """ интервал опроса, сек """
+        return self._states["interval"]
+
+    def getRoundTrip(self) -> float:
+        """ время отклика контроллера (скользящее среднее), сек """
+        return self._health.rtt
+
+    def getHealth(self) -> dict:
+        """ показатели качества связи """
+        return asdict(self._health)
+
+    def isOnline(self) -> bool:
+        """ установлено ли соединение (False во время потери связи) """
+        return self._health.online
+
+    def isDataValid(self) -> bool:
+        """ достоверны ли данные последнего тика опроса
+            (все запросы выполнены без ошибок) """
+        return self._is_valid
+
+    def getTimestamps(self) -> tuple:
+        """ монотонные отметки последнего тика опроса
+            (отправка первого запроса, получение последнего ответа), сек """
+        return self._stamps
+
     def setReadingState(self, state: bool) -> bool:
         """ вкл/выкл режима чтения """
         # проверка подключения
@@ -206,6 +323,24 @@ class Adam5K:
         Journal.log(f'Adam5K::setReadingState:\tresult {self._states["is_reading"]}')
         return True
 
+    def setReadPlan(self, params: list):
+        """ установка плана чтения по каналам датчиков
+            (None - читать все регистры), план перестраивается
+            только при изменении каналов """
+        if params is None:
+            self._plan = None
+            return
+        if self._plan and self._plan.key == ReadPlan.getKey(params):
+            return
+        plan = ReadPlan(self._builder, params)
+        self._data = {
+            SlotType.ANALOG: [0] * 64,
+            SlotType.DIGITAL: [0] * 8
+        }
+        self._plan = plan
+        Journal.log(f'Adam5K::setReadPlan:\t{len(plan.ranges)} запрос(а), '
+                    f'{plan.getSize()} байт за цикл')
+
     def setChannelValue(self, slot_type: SlotType, slot: int, channel: int, value):
         """ установка значения для канала """
         command = self._builder.buildCommand_register(
@@ -272,6 +407,7 @@ class Adam5K:
     def _stopThread(self):
         """ остановка потока опроса """
         self._states["is_reading"] = False
+        self._wake.set()
         while self._thread.is_alive():
             continue
 
@@ -279,7 +415,12 @@ class Adam5K:
         """ поток чтения данных из устройства """
         Journal.log('Adam5K::\tзапущен таймер опроса устройства...')
         while self._states["is_reading"]:
-            sleep(self._states["interval"])
+            timeout = self._states["interval"]
+            if not self._health.online:
+                # без связи - не чаще попыток переподключения
+                timeout = max(timeout, self._reconnect['time'] - monotonic())
+            self._wake.wait(timeout)
+            self._wake.clear()
             if self._states["is_paused"]:
                 continue
             thr = Thread(
@@ -292,20 +433,32 @@ class Adam5K:
 
     def _threadTick(self):
         """ тик таймера отправки команд в устройство """
-        # если в очереди есть комманды - выполнить
-        if self._commands:
-            command = self._commands.pop(0)
-            _ = self.__execute(command)
-        # если нет - читать все значения
-        else:
-            self.__readAllValues_fromDevice()
+        errors = self._health.errors
+        sent = monotonic()
+        # без связи - попытка переподключения (команды остаются в очереди)
+        if self._health.online or self.__tryReconnect():
+            # если в очереди есть комманды - выполнить
+            if self._commands:
+                command = self._commands.pop(0)
+                _ = self.__execute(command)
+            # если нет - читать все значения
+            else:
+                self.__readAllValues_fromDevice()
+        self._stamps = (sent, monotonic())
+        self._is_valid = self._health.online and self._health.errors == errors
+        if not self._is_valid:
+            self._health.invalid_samples += 1
         # транслировать событие, если есть обработчик
         if self._callback:
             self._callback()
 
     def __readAllValues_fromDevice(self, slot_type: SlotType = SlotType.ALL):
         """ чтение всех значений в слоте из устройства """
-        if slot_type == SlotType.ALL:
+        plan = self._plan
+        if plan is not None:
+            for rng in plan.ranges:
+                self.__readRange(rng)
+        elif slot_type == SlotType.ALL:
             self.__readAllValues_fromDevice(SlotType.ANALOG)
             self.__readAllValues_fromDevice(SlotType.DIGITAL)
         else:
@@ -315,8 +468,22 @@ class Adam5K:
             if len(data_bytes) > 8:
                 data_count = data_bytes[8]
                 data_bytes = data_bytes[9:9 + data_count]
-            result = self.__parseBytes(slot_type, data_bytes)
-            self._data[slot_type] = result.tolist()
+                result = self.__parseBytes(slot_type, data_bytes)
+                self._data[slot_type] = result.tolist()
+
+    def __readRange(self, rng: ReadRange):
+        """ чтение диапазона регистров из устройства """
+        data_bytes = self.__execute(rng.command)
+        if len(data_bytes) <= 8:
+            return
+        data_bytes = data_bytes[9:9 + data_bytes[8]]
+        values = self.__parseBytes(rng.slot_type, data_bytes).tolist()
+        if rng.slot_type == SlotType.DIGITAL:
+            start, count = rng.start // 16, rng.count // 16
+        else:
+            start, count = rng.start, rng.count
+        if len(values) == count:
+            self._data[rng.slot_type][start:start + count] = values
 
     def __execute(self, command: bytearray):
         """ выполнение команды """
@@ -325,21 +492,97 @@ class Adam5K:
         return result
 
     def __read(self, command: bytearray, result: bytearray):
-        """ запись / чтение из устройства """
-        if self.__write(command):
-            data = bytearray(self._sock.recv(0x89))
+        """ запись / чтение из устройства (ответ читается целиком
+            по длине из заголовка Modbus TCP) """
+        if not self._sock or not self._states["is_connected"]:
+            return
+        start = perf_counter()
+        error = ''
+        try:
+            self._sock.sendall(command)
+            data = self.__recvExactly(6)
+            data += self.__recvExactly(int.from_bytes(data[4:6], 'big'))
+            result.extend(data)
+            # код функции ответа с 0x80 - ошибка контроллера
+            if len(data) < 9 or data[7] != command[7]:
+                error = f'ошибка ответа {bytes(data[6:9]).hex()}'
+        except OSError as ex:
+            error = str(ex) or type(ex).__name__
+            result.clear()
+            self.__setOffline(error)
+        self.__updateHealth(perf_counter() - start, error)
+
+    def __recvExactly(self, size: int) -> bytearray:
+        """ чтение ровно size байт из сокета """
+        result = bytearray()
+        while len(result) < size:
+            data = self._sock.recv(size - len(result))
+            if not data:
+                raise ConnectionResetError('соединение закрыто контроллером')
             result.extend(data)
+        return result
 
-    def __write(self, command: bytes):
-        """ запись команды в устройство """
-        if self._sock and self._states["is_connected"]:
-            return self._sock.send(command) == len(command)
-        return False
+    def __updateHealth(self, rtt: float, error: str):
+        """ учёт результата запроса в показателях связи """
+        health = self._health
+        health.requests += 1
+        health.error_rate += ((1.0 if error else 0.0) - health.error_rate) * self.ERROR_ALPHA
+        if error:
+            health.errors += 1
+            health.last_error = error
+        else:
+            health.rtt += (rtt - health.rtt) * self.RTT_ALPHA
+            health.rtt_max = max(health.rtt_max, rtt)
+            # пауза переподключения сбрасывается только после ответа
+            self._reconnect['delay'] = self.RECONNECT_MIN
+
+    def __openSocket(self):
+        """ открытие сокета и подключение к устройству """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(self.CONNECT_TIMEOUT)
+        try:
+            sock.connect(self._conn)
+        except OSError:
+            sock.close()
+            raise
+        sock.settimeout(self.READ_TIMEOUT)
+        self._sock = sock
+        self._health.online = True
+
+    def __closeSocket(self):
+        """ закрытие сокета """
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+        self._health.online = False
+
+    def __setOffline(self, error: str):
+        """ потеря связи: закрытие сокета и планирование переподключения """
+        if self._health.online:
+            Journal.log(f'Adam5K::\tсвязь потеряна ({error})')
+        self.__closeSocket()
+        self._reconnect['time'] = monotonic() + self._reconnect['delay']
+
+    def __tryReconnect(self) -> bool:
+        """ попытка переподключения (с растущей паузой между попытками) """
+        if monotonic() < self._reconnect['time']:
+            return False
+        try:
+            self.__openSocket()
+        except OSError as ex:
+            delay = min(self._reconnect['delay'] * 2, self.RECONNECT_MAX)
+            self._reconnect.update(delay=delay, time=monotonic() + delay)
+            self._health.last_error = str(ex) or type(ex).__name__
+            return False
+        self._health.reconnects += 1
+        self._reconnect['delay'] = min(self._reconnect['delay'] * 2, self.RECONNECT_MAX)
+        Journal.log(f'Adam5K::\tсвязь восстановлена (попытка {self._health.reconnects})')
+        return True
 
     @staticmethod
     def __toBits(value: int):
         """ конвертирование значения в биты """
-        bits = f"{0:08b}".format(value)
+        bits = f"{value:016b}"
         bits = bits[::-1]
         return bits
 
@@ -7,6 +7,8 @@ from Classes.Adam.adam_5k import SlotType, Param
 IP              = '10.10.10.11'
 PORT            = 502
 ADDRESS         = 1
+WORKER          = False     # опрос в отдельном процессе (AdamWorker)
+HEARTBEAT       = 5.0       # период публикации всех показаний, сек
 
 params = {
     # "имя": ((тип_слота, слот, канал), (диапазон, смещение, макс.цифр)
@@ -29,3 +31,9 @@ params = {
     "torque_":      Param(SlotType.ANALOG,  2, 2,      0, 0x0, 0x0FFF),
     "pressure_":    Param(SlotType.ANALOG,  2, 3,      0, 0x0, 0x0FFF),
 }
+
+# зона нечувствительности датчиков (по умолчанию 0.2% диапазона)
+# "имя": изменение, меньше которого показание не публикуется
+deadbands = {
+    "rpm":          2.0,
+}
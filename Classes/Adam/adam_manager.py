@@ -4,32 +4,43 @@
 from PyQt5.QtCore import pyqtSignal, QObject
 from AesmaLib.journal import Journal
 from Classes.Adam.adam_5k import Adam5K, Param, SlotType
+from Classes.Adam.adam_sensors import Sensors, ChangeFilter
+from Classes.Adam.adam_rate import RateController, Profile
+from Classes.Adam.adam_timing import TimingStats
 from Classes.Adam import adam_config as adam
 
 
 class AdamManager(QObject):
     """ Класс для связи контроллера Adam5000TCP с интерфейсом программы """
-    _signal = pyqtSignal(dict, name="dataReceived")
-    _probes = 10
-    _sensors = {
-        'rpm': [0.0] * _probes,
-        'torque': [0.0] * _probes,
-        'psi_in': [0.0] * _probes,
-        'psi_out': [0.0] * _probes,
-        'flw0': [0.0] * _probes,
-        'flw1': [0.0] * _probes,
-        'flw2': [0.0] * _probes
-    }
+    _signal = pyqtSignal(dict, name="dataReceived")            # каждый тик
+    _changed = pyqtSignal(dict, name="dataChanged")            # изменившиеся
+    _edge = pyqtSignal(str, bool, name="digitalChanged")        # фронт канала
+    _link = pyqtSignal(bool, name="linkChanged")               # потеря/восстановление связи
+    _sample = pyqtSignal(float, float, dict, name="sampleReceived")  # отметки и показания
 
     def __init__(self, host, port=502, address=1, parent=None) -> None:
         super().__init__(parent=parent)
         self._adam = Adam5K(host, port, address)
+        self._sensors = Sensors(adam.params)
+        self._filter = ChangeFilter(adam.params, adam.deadbands, adam.HEARTBEAT)
+        self._rate = RateController()
+        self._timing = TimingStats()
+        self._is_adaptive = True
+        self._is_online = False
         self._adam.setCallback(self.__adamThreadTickCallback)
 
-    def setPollingState(self, state: bool, interval=1):
-        """ вкл/выкл опрос устройства """
+    def setPollingState(self, state: bool, interval=None):
+        """ вкл/выкл опрос устройства, интервал опроса
+            постоянный или (если не указан) по режиму опроса """
+        self._filter.reset()
+        self._is_online = state
         if state and self._adam.connect():
-            self._adam.setInterval(interval)
+            self._adam.setReadPlan(self._sensors.getParams())
+            self._is_adaptive = interval is None
+            self._timing.reset()
+            self._adam.setInterval(
+                self._rate.getInterval() if self._is_adaptive else interval
+            )
             return self._adam.setReadingState(True)
         self._adam.setReadingState(False)
         self._adam.disconnect()
@@ -44,6 +55,24 @@ class AdamManager(QObject):
             return True
         return False
 
+    def getHealth(self) -> dict:
+        """ показатели качества связи с контроллером """
+        return self._adam.getHealth()
+
+    def setProfile(self, profile: Profile):
+        """ установка режима опроса (простой, наблюдение, испытание) """
+        self._rate.setProfile(profile)
+        if self._is_adaptive:
+            self._adam.setInterval(self._rate.getInterval())
+
+    def getTiming(self) -> dict:
+        """ статистика периода опроса (частота, отклонения, опоздания) """
+        return self._timing.getSummary()
+
+    def dumpTiming(self, path: str):
+        """ сохранение статистики и отметок опроса в файл """
+        self._timing.dump(path)
+
     @staticmethod
     def checkParams(params: Param, value) -> bool:
         """ проверка параметров """
@@ -54,29 +83,48 @@ class AdamManager(QObject):
         return False
 
     def __adamThreadTickCallback(self):
-        """ тик таймера опроса устройства """
-        self.__updateSensors()
-        args = self.__createEventArgs()
+        """ тик таймера опроса устройства (при недостоверных данных
+            показания не обновляются и не публикуются) """
+        is_online = self._adam.isOnline()
         try:
-            self._signal.emit(args)
+            if is_online != self._is_online:
+                self._is_online = is_online
+                if is_online:
+                    # интерфейс очищает показания при потере связи ->
+                    # после восстановления публикуются все значения
+                    self._filter.reset()
+                self._link.emit(is_online)
+            if self._adam.isDataValid():
+                self.__updateSensors()
+                args = self.__createEventArgs()
+                sent, received = self._adam.getTimestamps()
+                self._timing.setInterval(self._adam.getInterval())
+                self._timing.add(sent, received)
+                self._signal.emit(args)
+                self._sample.emit(sent, received, args)
+                self.__emitChanges(args)
         except RuntimeError as err:
             self._adam.disconnect()
             Journal.log(err.args)
+            return
+        if self._is_adaptive:
+            self._adam.setInterval(self._rate.update(self._adam.getRoundTrip()))
+
+    def __emitChanges(self, args: dict):
+        """ испускание событий изменения показаний и фронтов каналов """
+        changes = self._filter.getChanges(args)
+        if changes:
+            self._changed.emit(changes)
+        for name, state in self._filter.getEdges(self._sensors.getStates()).items():
+            self._edge.emit(name, state)
 
     def __updateSensors(self):
-        for key in self._sensors:
-            if not self._adam.isReading():
-                self._sensors[key] = [0.0] * self._probes
-                continue
-            param = adam.params[key]
-            value = self._adam.getValue(
-                param.slot_type, param.slot, param.channel
-            )
-            value = param.val_rng * (value - param.offset) / param.dig_max
-            self._sensors[key].pop(0)
-            self._sensors[key].append(round(value, 2))
+        if self._adam.isReading():
+            self._sensors.update(self._adam)
+            # план чтения перестраивается при изменении конфигурации
+            self._adam.setReadPlan(self._sensors.getParams())
+        else:
+            self._sensors.clear()
 
     def __createEventArgs(self):
-        return {
-            key: sum(vals)/len(vals) for key, vals in self._sensors.items()
-        }
+        return self._sensors.getValues()
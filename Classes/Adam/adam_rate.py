@@ -0,0 +1,75 @@
+"""
+    Модуль выбора интервала опроса Adam5000TCP.
+    Интервал задаётся режимом работы (простой, наблюдение, испытание)
+    и увеличивается, если время отклика контроллера ухудшилось
+"""
+import time
+from enum import Enum
+from AesmaLib.journal import Journal
+
+
+_LOG = Journal.getLogger(__name__)
+
+
+class Profile(Enum):
+    """ Режим опроса """
+    IDLE = 'IDLE'               # простой (информационная страница)
+    MONITORING = 'MONITORING'   # наблюдение (страница испытания)
+    TEST = 'TEST'               # идёт испытание
+
+
+class RateController:
+    """ Класс выбора интервала опроса по режиму и времени отклика """
+    INTERVALS = {
+        Profile.IDLE: 1.0,
+        Profile.MONITORING: 0.1,
+        Profile.TEST: 0.0       # с максимальной частотой, которую держит связь
+    }
+    CHECK_PERIOD = 0.5      # период проверки времени отклика, сек
+    DEGRADED_RATIO = 3.0    # во сколько раз отклик хуже лучшего - ухудшение
+    DEGRADED_MIN = 0.010    # отклик, ниже которого ухудшения нет, сек
+    BEST_DRIFT = 0.01       # рост лучшего отклика за проверку (привыкание)
+    BACKOFF_MIN = 0.010     # минимальная добавка к интервалу, сек
+    BACKOFF_MAX = 1.0       # максимальная добавка к интервалу, сек
+
+    def __init__(self, profile=Profile.IDLE):
+        self._profile = profile
+        self._backoff = 0.0
+        self._best = 0.0
+        self._checked = 0.0
+
+    @property
+    def profile(self) -> Profile:
+        """ текущий режим опроса """
+        return self._profile
+
+    def setProfile(self, profile: Profile):
+        """ установка режима опроса """
+        if profile != self._profile:
+            _LOG.info("режим опроса %s", profile.value)
+            self._profile = profile
+
+    def getInterval(self) -> float:
+        """ интервал опроса с учётом ухудшения отклика, сек """
+        return max(self.INTERVALS[self._profile], self._backoff)
+
+    def update(self, rtt: float, now: float = None) -> float:
+        """ учёт времени отклика -> интервал опроса, сек """
+        now = time.monotonic() if now is None else now
+        if rtt > 0:
+            self._best = min(self._best, rtt) if self._best else rtt
+        if now - self._checked >= self.CHECK_PERIOD:
+            self._checked = now
+            backoff = self._backoff
+            if rtt > max(self._best * self.DEGRADED_RATIO, self.DEGRADED_MIN):
+                self._backoff = min(max(backoff * 2, self.BACKOFF_MIN), self.BACKOFF_MAX)
+            elif backoff / 2 >= self.BACKOFF_MIN:
+                self._backoff = backoff / 2
+            else:
+                self._backoff = 0.0
+            if bool(backoff) != bool(self._backoff):
+                _LOG.warning("отклик %.1f мс (лучший %.1f мс): %s", rtt * 1000,
+                             self._best * 1000,
+                             "интервал увеличен" if self._backoff else "восстановлен")
+            self._best *= 1 + self.BEST_DRIFT
+        return self.getInterval()
@@ -0,0 +1,130 @@
+"""
+    Модуль сглаживания и отбора показаний датчиков Adam5000TCP.
+    Не зависит от Qt и используется как в AdamManager (поток опроса),
+    так и в процессе опроса AdamWorker.
+    Sensors - скользящее среднее аналоговых датчиков и состояния
+    дискретных каналов
+    ChangeFilter - отбор изменившихся показаний: аналоговые - при выходе
+    за зону нечувствительности (не чаще периода отображения) или по истечении
+    периода публикации всех показаний, дискретные - только фронты (смена
+    состояния)
+"""
+import time
+from collections import deque
+from Classes.Adam.adam_5k import Adam5K, SlotType
+
+
+class Sensors:
+    """ Класс сглаживания показаний датчиков (скользящее среднее) """
+    PROBES = 10     # кол-во значений для усреднения
+    NAMES = ('rpm', 'torque', 'psi_in', 'psi_out', 'flw0', 'flw1', 'flw2')
+    DIGITAL = ('engine_', 'flw0_', 'flw1_', 'flw2_')
+
+    def __init__(self, params: dict, names=NAMES, probes=PROBES, digital=DIGITAL):
+        self._params = params
+        self._probes = {
+            name: deque([0.0] * probes, maxlen=probes) for name in names
+        }
+        self._states = dict.fromkeys(digital, False)
+
+    @property
+    def names(self) -> tuple:
+        """ имена датчиков """
+        return tuple(self._probes)
+
+    @property
+    def digital(self) -> tuple:
+        """ имена дискретных каналов """
+        return tuple(self._states)
+
+    def getParams(self) -> list:
+        """ параметры каналов датчиков (для плана чтения) """
+        return [self._params[name] for name in (*self._probes, *self._states)]
+
+    def update(self, adam5k: Adam5K):
+        """ чтение значений датчиков из данных контроллера """
+        for name, probes in self._probes.items():
+            param = self._params[name]
+            value = adam5k.getValue(param.slot_type, param.slot, param.channel)
+            value = param.val_rng * (value - param.offset) / param.dig_max
+            probes.append(round(value, 2))
+        for name in self._states:
+            param = self._params[name]
+            self._states[name] = adam5k.getValue(SlotType.DIGITAL, param.slot, param.channel)
+
+    def clear(self):
+        """ сброс значений датчиков в 0 """
+        for probes in self._probes.values():
+            probes.extend([0.0] * probes.maxlen)
+        self._states = dict.fromkeys(self._states, False)
+
+    def getValues(self) -> dict:
+        """ сглаженные значения датчиков """
+        return {
+            name: sum(probes) / len(probes) for name, probes in self._probes.items()
+        }
+
+    def getStates(self) -> dict:
+        """ состояния дискретных каналов """
+        return dict(self._states)
+
+
+class ChangeFilter:
+    """ Класс отбора изменившихся показаний """
+    DEADBAND = 0.002    # зона нечувствительности по умолчанию, доля диапазона
+    HEARTBEAT = 5.0     # период публикации всех показаний, сек
+    PERIOD = 0.05       # минимальный период публикации изменений, сек
+
+    def __init__(self, params: dict, deadbands: dict = None, heartbeat=HEARTBEAT,
+                 period=PERIOD):
+        self._params = params
+        self._deadbands = deadbands or {}
+        self._heartbeat = heartbeat
+        self._period = period
+        self._values = {}   # последние опубликованные значения
+        self._states = {}   # последние состояния дискретных каналов
+        self._published = 0.0
+        self._changed = 0.0
+
+    def reset(self):
+        """ сброс: следующие показания публикуются полностью """
+        self._values.clear()
+        self._states.clear()
+        self._published = self._changed = 0.0
+
+    def getDeadband(self, name: str) -> float:
+        """ зона нечувствительности датчика """
+        if name in self._deadbands:
+            return self._deadbands[name]
+        return self.DEADBAND * self._params[name].val_rng
+
+    def getChanges(self, values: dict, now: float = None) -> dict:
+        """ аналоговые показания, вышедшие за зону нечувствительности,
+            или все показания, если истёк период публикации
+            (изменения чаще периода отображения объединяются) """
+        now = time.monotonic() if now is None else now
+        if now - self._published >= self._heartbeat:
+            self._published = now
+            result = dict(values)
+        elif now - self._changed < self._period:
+            return {}
+        else:
+            result = {
+                name: value for name, value in values.items()
+                if name not in self._values
+                or abs(value - self._values[name]) > self.getDeadband(name)
+            }
+        if result:
+            self._changed = now
+        self._values.update(result)
+        return result
+
+    def getEdges(self, states: dict) -> dict:
+        """ дискретные каналы, сменившие состояние
+            (после сброса - все) """
+        result = {
+            name: state for name, state in states.items()
+            if self._states.get(name) != state
+        }
+        self._states.update(result)
+        return result
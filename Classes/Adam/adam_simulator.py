@@ -0,0 +1,369 @@
+"""
+    Модуль имитации контроллера Advantech Adam5000TCP.
+    AdamSimulator - Modbus TCP сервер с картой регистров CommandBuilder:
+    аналоговые регистры (8 слотов по 8 каналов, адрес = 8 * слот + канал)
+    и дискретные выходы (8 слотов по 16 каналов, адрес = 16 * слот + канал).
+    Поддерживает функции 0x01, 0x04, 0x05, 0x06, 0x0F, 0x10.
+    Показания датчиков рассчитываются по синтетической характеристике
+    насоса (PumpModel) с учётом задвижки (valve_), частоты (speed_)
+    и включения двигателя (engine_) из adam_config.params.
+    Для нагрузочных испытаний задаются задержка ответа, её разброс,
+    разбиение ответа на части и принудительный разрыв соединений.
+
+    python -m Classes.Adam.adam_simulator --port 5020 --latency 0.005 --split 64
+"""
+import time
+import struct
+import random
+import socket
+import argparse
+import threading
+from dataclasses import dataclass, field
+from Classes.Adam.adam_5k import SlotType
+from Classes.Adam import adam_config
+from AesmaLib.journal import Journal
+
+
+ANALOG_COUNT = 8 * 8        # кол-во аналоговых регистров
+DIGITAL_COUNT = 8 * 16      # кол-во дискретных выходов
+_LOG = Journal.getLogger(__name__)
+
+
+@dataclass
+class SimulatorOptions:
+    """ Класс параметров имитации канала связи """
+    latency: float = 0.0        # задержка ответа, сек
+    jitter: float = 0.0         # разброс задержки (равномерный +-), сек
+    split: int = 0              # размер части ответа, байт (0 - целиком)
+    split_delay: float = 0.0    # пауза между частями ответа, сек
+    drop_rate: float = 0.0      # вероятность разрыва соединения на запрос
+    seed: int = None
+
+
+@dataclass
+class PumpModel:
+    """ Класс синтетической характеристики насоса
+        (значения в единицах диапазонов adam_config.params) """
+    rpm_nom: float = 2910.0     # частота при полном задании скорости
+    flw_max: float = 800.0      # расход при открытой задвижке
+    psi_max: float = 3.0        # давление на закрытую задвижку
+    torque_max: float = 0.15    # момент при открытой задвижке
+    tau: float = 0.5            # постоянная времени разгона, сек
+    noise: float = 0.005        # шум датчиков (доля от диапазона)
+    values: dict = field(default_factory=dict)  # текущие показания
+
+    def update(self, engine: bool, speed: float, valve: float, delta: float):
+        """ расчёт показаний через delta сек
+            при задании скорости и задвижки в долях 0..1 """
+        target = self.rpm_nom * (speed or 1.0) if engine else 0.0
+        rpm = self.values.get('rpm', 0.0)
+        rpm += (target - rpm) * min(1.0, delta / self.tau) if self.tau else target - rpm
+        coef = rpm / self.rpm_nom
+        self.values = {
+            'rpm': rpm,
+            'flw': self.flw_max * valve * coef,
+            'psi_in': 0.0,
+            'psi_out': self.psi_max * coef ** 2 * (1.0 - valve ** 2),
+            'torque': self.torque_max * coef ** 2 * (0.4 + 0.6 * valve)
+        }
+        return self.values
+
+
+class AdamSimulator:
+    """ Класс имитатора Adam5000TCP (Modbus TCP сервер) """
+
+    def __init__(self, host='127.0.0.1', port=0, options: SimulatorOptions = None,
+                 model: PumpModel = None, params: dict = None):
+        self._options = options or SimulatorOptions()
+        self._model = model or PumpModel()
+        self._params = params or adam_config.params
+        self._sensors = self._getSensors()      # {адрес: (имя, датчик)}
+        self._random = random.Random(self._options.seed)
+        self._registers = [0] * ANALOG_COUNT    # записанные аналоговые выходы
+        self._coils = [False] * DIGITAL_COUNT   # дискретные выходы
+        self._lock = threading.Lock()
+        self._clients = set()
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((host, port))
+        self._thread: threading.Thread = None
+        self._running = False
+        self._time = time.monotonic()
+        self._stats = {'requests': 0, 'errors': 0, 'connections': 0, 'drops': 0}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *_args):
+        self.stop()
+
+    @property
+    def address(self) -> tuple:
+        """ адрес сервера (host, port) """
+        return self._sock.getsockname()
+
+    @property
+    def options(self) -> SimulatorOptions:
+        """ параметры имитации канала связи (можно менять на ходу) """
+        return self._options
+
+    def start(self):
+        """ запуск сервера """
+        self._sock.listen()
+        self._running = True
+        self._thread = threading.Thread(
+            name="AdamSimulator accept thread",
+            target=self._threadAccept, daemon=True
+        )
+        self._thread.start()
+        _LOG.info("имитатор запущен на %s:%d", *self.address)
+
+    def stop(self):
+        """ остановка сервера и разрыв соединений """
+        self._running = False
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+        self.dropConnections()
+        if self._thread:
+            self._thread.join()
+        _LOG.info("имитатор остановлен")
+
+    def dropConnections(self):
+        """ принудительный разрыв всех соединений """
+        with self._lock:
+            clients, self._clients = self._clients, set()
+        for conn in clients:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            conn.close()
+
+    def getStats(self) -> dict:
+        """ счётчики запросов, ошибок, подключений и разрывов """
+        with self._lock:
+            return dict(self._stats)
+
+    def getRegister(self, address: int) -> int:
+        """ записанное значение аналогового регистра """
+        return self._registers[address]
+
+    def getCoil(self, address: int) -> bool:
+        """ состояние дискретного выхода """
+        return self._coils[address]
+
+    def getSensors(self) -> dict:
+        """ текущие показания модели насоса """
+        with self._lock:
+            return dict(self._model.values)
+
+    def _threadAccept(self):
+        """ поток приёма подключений """
+        while self._running:
+            try:
+                conn, addr = self._sock.accept()
+            except OSError:
+                break
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self._lock:
+                self._clients.add(conn)
+                self._stats['connections'] += 1
+            _LOG.debug("подключение %s:%d", *addr)
+            threading.Thread(
+                name="AdamSimulator client thread",
+                target=self._threadClient, args=(conn,), daemon=True
+            ).start()
+
+    def _threadClient(self, conn: socket.socket):
+        """ поток обработки запросов клиента """
+        try:
+            while self._running:
+                header = self._recvExactly(conn, 7)
+                if header is None:
+                    break
+                tid, pid, length, unit = struct.unpack('>HHHB', header)
+                pdu = self._recvExactly(conn, length - 1)
+                if pdu is None:
+                    break
+                if self._random.random() < self._options.drop_rate:
+                    with self._lock:
+                        self._stats['drops'] += 1
+                    break
+                response = self._handle(pdu)
+                adu = struct.pack('>HHHB', tid, pid, len(response) + 1, unit) + response
+                self._send(conn, adu)
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                self._clients.discard(conn)
+            conn.close()
+
+    def _send(self, conn: socket.socket, data: bytes):
+        """ отправка ответа с задержкой и разбиением на части """
+        options = self._options
+        delay = options.latency + self._random.uniform(-options.jitter, options.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        size = options.split or len(data)
+        for start in range(0, len(data), size):
+            if start and options.split_delay:
+                time.sleep(options.split_delay)
+            conn.sendall(data[start:start + size])
+
+    def _handle(self, pdu: bytes) -> bytes:
+        """ выполнение запроса -> ответ (PDU) """
+        func = pdu[0]
+        handler = {
+            0x01: self._readCoils,
+            0x04: self._readRegisters,
+            0x05: self._writeCoil,
+            0x06: self._writeRegister,
+            0x0F: self._writeCoils,
+            0x10: self._writeRegisters
+        }.get(func)
+        with self._lock:
+            self._stats['requests'] += 1
+            try:
+                if handler is None:
+                    raise _ModbusError(0x01)
+                return bytes([func]) + handler(pdu[1:])
+            except (_ModbusError, struct.error, IndexError) as error:
+                self._stats['errors'] += 1
+                code = error.code if isinstance(error, _ModbusError) else 0x03
+                return bytes([func | 0x80, code])
+
+    def _readCoils(self, data: bytes) -> bytes:
+        start, count = self._checkRange(data, DIGITAL_COUNT)
+        result = bytearray((count + 7) // 8)
+        for i in range(count):
+            if self._coils[start + i]:
+                result[i // 8] |= 1 << (i % 8)
+        return bytes([len(result)]) + result
+
+    def _readRegisters(self, data: bytes) -> bytes:
+        start, count = self._checkRange(data, ANALOG_COUNT)
+        values = self._updateSensors()
+        return bytes([count * 2]) + struct.pack(f'>{count}H', *values[start:start + count])
+
+    def _writeCoil(self, data: bytes) -> bytes:
+        address, value = struct.unpack('>HH', data[:4])
+        if address >= DIGITAL_COUNT or value not in (0x0000, 0xFF00):
+            raise _ModbusError(0x02 if address >= DIGITAL_COUNT else 0x03)
+        self._coils[address] = value == 0xFF00
+        return data[:4]
+
+    def _writeRegister(self, data: bytes) -> bytes:
+        address, value = struct.unpack('>HH', data[:4])
+        if address >= ANALOG_COUNT:
+            raise _ModbusError(0x02)
+        self._registers[address] = value
+        return data[:4]
+
+    def _writeCoils(self, data: bytes) -> bytes:
+        start, count = self._checkRange(data, DIGITAL_COUNT)
+        values = data[5:5 + data[4]]
+        for i in range(min(count, len(values) * 8)):
+            self._coils[start + i] = bool(values[i // 8] >> (i % 8) & 1)
+        return data[:4]
+
+    def _writeRegisters(self, data: bytes) -> bytes:
+        start, count = self._checkRange(data, ANALOG_COUNT)
+        values = struct.unpack(f'>{count}H', data[5:5 + count * 2])
+        self._registers[start:start + count] = values
+        return data[:4]
+
+    @staticmethod
+    def _recvExactly(conn: socket.socket, size: int):
+        """ чтение ровно size байт (None - соединение закрыто) """
+        result = bytearray()
+        while len(result) < size:
+            data = conn.recv(size - len(result))
+            if not data:
+                return None
+            result.extend(data)
+        return bytes(result)
+
+    @staticmethod
+    def _checkRange(data: bytes, size: int) -> tuple:
+        """ начальный адрес и кол-во из запроса с проверкой диапазона """
+        start, count = struct.unpack('>HH', data[:4])
+        if start + count > size:
+            raise _ModbusError(0x02)
+        return start, count
+
+    def _updateSensors(self) -> list:
+        """ пересчёт модели насоса -> значения аналоговых регистров """
+        now = time.monotonic()
+        delta, self._time = now - self._time, now
+        values = self._model.update(
+            self._getOutput('engine_'), self._getOutput('speed_'),
+            self._getOutput('valve_'), delta
+        )
+        result = list(self._registers)
+        for address, (name, param) in self._sensors.items():
+            value = values.get(name.rstrip('012'), 0.0)
+            value += self._random.gauss(0.0, self._model.noise * param.val_rng)
+            digits = param.offset + value * param.dig_max / param.val_rng \
+                if param.val_rng else param.offset
+            result[address] = int(min(max(digits, 0), param.dig_max))
+        return result
+
+    def _getSensors(self) -> dict:
+        """ аналоговые датчики по адресам регистров: из нескольких
+            датчиков на одном канале - первый с ненулевым диапазоном """
+        result = {}
+        for name, param in self._params.items():
+            if name.endswith('_') or param.slot_type != SlotType.ANALOG:
+                continue
+            address = 8 * param.slot + param.channel
+            if address not in result or \
+                    (param.val_rng and not result[address][1].val_rng):
+                result[address] = (name, param)
+        return result
+
+    def _getOutput(self, name: str):
+        """ состояние выхода управления: дискретный -> bool,
+            аналоговый -> доля 0..1 """
+        param = self._params.get(name)
+        if param is None:
+            return 0.0
+        if param.slot_type == SlotType.DIGITAL:
+            return self._coils[16 * param.slot + param.channel]
+        value = self._registers[8 * param.slot + param.channel]
+        return min(value / param.dig_max, 1.0)
+
+
+class _ModbusError(Exception):
+    """ исключение Modbus с кодом ошибки """
+    def __init__(self, code: int):
+        super().__init__(code)
+        self.code = code
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Имитатор Adam5000TCP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=adam_config.PORT)
+    parser.add_argument('--latency', type=float, default=0.0, help="задержка, сек")
+    parser.add_argument('--jitter', type=float, default=0.0, help="разброс, сек")
+    parser.add_argument('--split', type=int, default=0, help="часть ответа, байт")
+    parser.add_argument('--split-delay', type=float, default=0.0)
+    parser.add_argument('--drop-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+    simulator = AdamSimulator(args.host, args.port, SimulatorOptions(
+        args.latency, args.jitter, args.split, args.split_delay,
+        args.drop_rate, args.seed
+    ))
+    with simulator:
+        print(f"Adam5000TCP simulator on {args.host}:{simulator.address[1]}", flush=True)
+        try:
+            while True:
+                time.sleep(1.0)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,145 @@
+"""
+    Модуль статистики временных отметок опроса Adam5000TCP.
+    Каждое показание имеет монотонные (time.monotonic) отметки отправки
+    первого запроса тика и получения последнего ответа.
+    TimingStats - фактическая частота, гистограмма отклонений периода
+    от расчётного (интервал опроса + время тика), кол-во опоздавших тиков,
+    сохранение в файл для проверки соответствия методике испытаний
+"""
+import json
+from collections import deque
+from threading import Lock
+import numpy as np
+
+
+class TimingStats:
+    """ Класс статистики периода опроса
+        (пополняется из потока опроса, читается из интерфейса) """
+    WINDOW = 10000          # кол-во последних отметок для статистики
+    LATE_RATIO = 0.5        # тик опоздал, если период больше расчётного на 50%
+    LATE_MARGIN = 0.002     # ... и больше чем на 2 мс
+    DURATION_ALPHA = 0.1    # коэффициент сглаживания длительности тика
+    # границы гистограммы отклонений периода, мс
+    BINS = (-20, -10, -5, -2, -1, -0.5, 0.5, 1, 2, 5, 10, 20, 50, 100)
+
+    def __init__(self):
+        self._lock = Lock()
+        self._sent = deque(maxlen=self.WINDOW)
+        self._received = deque(maxlen=self.WINDOW)
+        self._jitter = deque(maxlen=self.WINDOW)
+        self._interval = 0.0
+        self._duration = 0.0
+        self._skip = True
+        self._count = 0
+        self._late = 0
+
+    def reset(self):
+        """ сброс статистики """
+        with self._lock:
+            self._sent.clear()
+            self._received.clear()
+            self._jitter.clear()
+            self._duration = 0.0
+            self._skip = True
+            self._count = self._late = 0
+
+    def setInterval(self, interval: float):
+        """ установка интервала опроса (период после смены не учитывается) """
+        if interval != self._interval:
+            self._interval = interval
+            self._skip = True
+
+    def add(self, sent: float, received: float):
+        """ учёт отметок показания """
+        with self._lock:
+            self.__add(sent, received)
+
+    def __add(self, sent: float, received: float):
+        if self._received and not self._skip:
+            period = received - self._received[-1]
+            nominal = self._interval + self._duration
+            self._jitter.append(period - nominal)
+            if period > nominal * (1 + self.LATE_RATIO) + self.LATE_MARGIN:
+                self._late += 1
+        self._skip = False
+        duration = received - sent
+        self._duration += (duration - self._duration) * self.DURATION_ALPHA \
+            if self._count else duration
+        self._sent.append(sent)
+        self._received.append(received)
+        self._count += 1
+
+    def getSummary(self) -> dict:
+        """ сводка: частота, период, отклонения, опоздания (времена в мс) """
+        with self._lock:
+            sent = np.array(self._sent)
+            received = np.array(self._received)
+            jitter = np.array(self._jitter) * 1000
+        result = {
+            'samples': self._count,
+            'late_ticks': self._late,
+            'late_percent': 100.0 * self._late / max(self._count - 1, 1),
+            'interval': self._interval * 1000,
+            'tick': self._duration * 1000
+        }
+        if received.size > 1:
+            periods = np.diff(received) * 1000
+            durations = (received - sent) * 1000
+            result.update({
+                'rate': (received.size - 1) / (received[-1] - received[0]),
+                'nominal_rate': 1000.0 / (result['interval'] + result['tick']),
+                'period_mean': float(periods.mean()),
+                'period_std': float(periods.std()),
+                'period_p50': float(np.percentile(periods, 50)),
+                'period_p99': float(np.percentile(periods, 99)),
+                'period_max': float(periods.max()),
+                'tick_p99': float(np.percentile(durations, 99)),
+                'jitter_std': float(jitter.std()) if jitter.size else 0.0,
+                'histogram': self.getHistogram(jitter)
+            })
+        return result
+
+    def getHistogram(self, jitter: np.ndarray = None) -> dict:
+        """ гистограмма отклонений периода от расчётного, мс
+            (крайние интервалы включают выходящие за границы) """
+        if jitter is None:
+            with self._lock:
+                jitter = np.array(self._jitter) * 1000
+        bins = np.array(self.BINS, dtype=float)
+        counts, _ = np.histogram(np.clip(jitter, bins[0], bins[-1]), bins)
+        return {'edges': list(self.BINS), 'counts': counts.tolist()}
+
+    def dump(self, path: str):
+        """ сохранение сводки и отметок показаний в файл (json) """
+        summary = self.getSummary()
+        with self._lock:
+            data = {
+                'summary': summary,
+                'sent': list(self._sent),
+                'received': list(self._received)
+            }
+        with open(path, 'w', encoding='utf-8') as file_:
+            json.dump(data, file_, indent=1, ensure_ascii=False)
+
+
+def formatSummary(summary: dict) -> str:
+    """ сводка статистики опроса в виде текста """
+    if 'rate' not in summary:
+        return f"показаний: {summary['samples']}"
+    lines = [
+        f"показаний: {summary['samples']}",
+        f"частота: {summary['rate']:.1f} Гц (расчётная {summary['nominal_rate']:.1f} Гц)",
+        f"интервал опроса: {summary['interval']:.1f} мс, тик: {summary['tick']:.2f} мс"
+        f" (p99 {summary['tick_p99']:.2f} мс)",
+        f"период: {summary['period_mean']:.2f} ± {summary['period_std']:.2f} мс"
+        f" (p50 {summary['period_p50']:.2f}, p99 {summary['period_p99']:.2f},"
+        f" макс {summary['period_max']:.2f})",
+        f"опоздавших тиков: {summary['late_ticks']} ({summary['late_percent']:.2f}%)",
+        "отклонение периода, мс:"
+    ]
+    histogram = summary['histogram']
+    edges, counts = histogram['edges'], histogram['counts']
+    for left, right, count in zip(edges, edges[1:], counts):
+        if count:
+            lines.append(f"  {left:>6} .. {right:<6} {count}")
+    return "\n".join(lines)
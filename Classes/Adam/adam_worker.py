@@ -0,0 +1,318 @@
+"""
+    Модуль опроса Adam5000TCP в отдельном процессе.
+    Опрос контроллера (Modbus TCP) и сглаживание показаний выполняются
+    в процессе, не связанном GIL с интерфейсом. Показания с отметками
+    времени отправки и получения (time.monotonic, общее для процессов)
+    записываются в кольцевой буфер в разделяемой памяти (SampleRing),
+    который интерфейс читает без блокировок со своей частотой. Команды передаются в процесс
+    опроса через канал (multiprocessing.Pipe).
+    AdamWorker - замена AdamManager с тем же интерфейсом
+    (включается в adam_config.WORKER)
+"""
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+from PyQt5.QtCore import pyqtSignal, QObject, QTimer
+from AesmaLib.journal import Journal
+from Classes.Adam.adam_5k import Adam5K, Param
+from Classes.Adam.adam_sensors import Sensors, ChangeFilter
+from Classes.Adam.adam_rate import RateController, Profile
+from Classes.Adam.adam_timing import TimingStats
+from Classes.Adam.adam_manager import AdamManager
+from Classes.Adam import adam_config
+
+
+_LOG = Journal.getLogger(__name__)
+
+
+class SampleRing:
+    """ Класс кольцевого буфера показаний в разделяемой памяти.
+        Один писатель, любое кол-во читателей без блокировок:
+        запись = [номер, время, значения..., номер], писатель сначала
+        сбрасывает завершающий номер, счётчик записей увеличивается
+        после записи; читатель отбрасывает записи, номера которых
+        не совпадают, и записи, которые могли быть перезаписаны
+        за время копирования (по счётчику после копирования) """
+    SIZE = 4096     # кол-во записей в буфере
+
+    def __init__(self, names, size=SIZE, name: str = None):
+        self._names = tuple(names)
+        self._size = size
+        self._width = len(self._names) + 3
+        nbytes = (1 + size * self._width) * np.dtype(float).itemsize
+        self._shm = shared_memory.SharedMemory(name=name, create=name is None, size=nbytes)
+        buffer = np.ndarray((1 + size * self._width,), dtype=float, buffer=self._shm.buf)
+        self._count = buffer[:1]
+        self._records = buffer[1:].reshape(size, self._width)
+        if name is None:
+            buffer[:] = -1.0
+            self._count[0] = 0
+
+    @property
+    def name(self) -> str:
+        """ имя блока разделяемой памяти (для подключения из процесса) """
+        return self._shm.name
+
+    @property
+    def names(self) -> tuple:
+        """ имена датчиков (столбцы значений) """
+        return self._names
+
+    def getCount(self) -> int:
+        """ кол-во записанных показаний """
+        return int(self._count[0])
+
+    def write(self, timestamp: float, values):
+        """ запись показаний (только из процесса опроса) """
+        seq = self._count[0]
+        record = self._records[int(seq) % self._size]
+        record[-1] = -1.0
+        record[0] = seq
+        record[1] = timestamp
+        record[2:-1] = values
+        record[-1] = seq
+        self._count[0] = seq + 1
+
+    def read(self, start: int = 0) -> tuple:
+        """ чтение показаний с номера start (не старше размера буфера)
+            -> (номер следующего, отметки времени, значения (кол-во, датчики)) """
+        count = self.getCount()
+        start = max(start, count - self._size)
+        seqs = np.arange(start, count)
+        block = self._records[seqs % self._size].copy()
+        valid = (block[:, 0] == seqs) & (block[:, -1] == seqs)
+        # за время копирования писатель мог начать перезапись этих слотов
+        valid &= seqs >= self.getCount() - self._size + 1
+        block = block[valid]
+        return count, block[:, 1], block[:, 2:-1]
+
+    def getLatest(self) -> dict:
+        """ последние показания {датчик: значение} или пустой словарь """
+        _, _, values = self.read(self.getCount() - 1)
+        return dict(zip(self._names, values[-1].tolist())) if len(values) else {}
+
+    def close(self, unlink=False):
+        """ отключение от разделяемой памяти (и удаление, если unlink) """
+        self._count = self._records = None
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+
+
+def runWorker(conn, ring_name: str, ring_size: int, names: tuple,
+              host: str, port: int, address: int, interval: float,
+              profile: Profile):
+    """ процесс опроса: запись показаний в буфер, выполнение команд из канала
+        (интервал постоянный или, если None, по режиму опроса) """
+    ring = SampleRing(names, ring_size, ring_name)
+    adam5k = Adam5K(host, port, address)
+    sensors = Sensors(adam_config.params)
+    rate = RateController(profile)
+
+    def onTick():
+        is_valid = adam5k.isDataValid()
+        if is_valid:
+            sensors.update(adam5k)
+            adam5k.setReadPlan(sensors.getParams())
+        sent, received = adam5k.getTimestamps()
+        values = {**sensors.getValues(), **sensors.getStates(),
+                  'online': adam5k.isOnline(), 'valid': is_valid,
+                  'sent': sent, 'interval': adam5k.getInterval()}
+        ring.write(received, [float(values[name]) for name in names])
+        if interval is None:
+            adam5k.setInterval(rate.update(adam5k.getRoundTrip()))
+
+    adam5k.setCallback(onTick)
+    adam5k.setReadPlan(sensors.getParams())
+    adam5k.setInterval(rate.getInterval() if interval is None else interval)
+    state = adam5k.connect() and adam5k.setReadingState(True)
+    conn.send(state)
+    try:
+        while state:
+            command, args = conn.recv()
+            if command == 'stop':
+                break
+            if command == 'setValue':
+                param, value = args
+                adam5k.setChannelValue(param.slot_type, param.slot, param.channel, value)
+            elif command == 'setInterval':
+                adam5k.setInterval(args)
+            elif command == 'getHealth':
+                conn.send(adam5k.getHealth())
+            elif command == 'setProfile':
+                rate.setProfile(args)
+                if interval is None:
+                    adam5k.setInterval(rate.getInterval())
+    except EOFError:
+        pass
+    finally:
+        adam5k.setReadingState(False)
+        adam5k.disconnect()
+        ring.close()
+
+
+class AdamWorker(QObject):
+    """ Класс связи интерфейса с процессом опроса Adam5000TCP """
+    _signal = pyqtSignal(dict, name="dataReceived")            # новые показания
+    _changed = pyqtSignal(dict, name="dataChanged")            # изменившиеся
+    _edge = pyqtSignal(str, bool, name="digitalChanged")        # фронт канала
+    _link = pyqtSignal(bool, name="linkChanged")               # потеря/восстановление связи
+    _sample = pyqtSignal(float, float, dict, name="sampleReceived")  # отметки и показания
+    # столбцы буфера: датчики, дискретные каналы, связь, достоверность,
+    # отметка отправки (отметка получения - время записи), интервал опроса
+    NAMES = Sensors.NAMES + Sensors.DIGITAL + ('online', 'valid', 'sent', 'interval')
+    READ_INTERVAL = 50      # период чтения буфера интерфейсом, мс
+    START_TIMEOUT = 5.0     # ожидание подключения процесса опроса, сек
+
+    def __init__(self, host, port=502, address=1, parent=None) -> None:
+        super().__init__(parent=parent)
+        self._conn = (host, port, address)
+        self._context = multiprocessing.get_context('spawn')
+        self._process = None
+        self._pipe = None
+        self._ring: SampleRing = None
+        self._next = 0
+        self._profile = Profile.IDLE
+        self._is_online = False
+        self._filter = ChangeFilter(
+            adam_config.params, adam_config.deadbands, adam_config.HEARTBEAT
+        )
+        self._timing = TimingStats()
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.READ_INTERVAL)
+        self._timer.timeout.connect(self._onTimer)
+
+    def setPollingState(self, state: bool, interval=None):
+        """ вкл/выкл опрос устройства, интервал опроса
+            постоянный или (если не указан) по режиму опроса """
+        self._stopProcess()
+        if state:
+            return self._startProcess(interval)
+        return False
+
+    def setValue(self, param: Param, value: int) -> bool:
+        """ установка значения для канала """
+        if self._pipe and self.checkParams(param, value):
+            self._pipe.send(('setValue', (param, value)))
+            return True
+        return False
+
+    def setInterval(self, interval: float):
+        """ установка интервала опроса """
+        if self._pipe:
+            self._pipe.send(('setInterval', interval))
+
+    def getHealth(self) -> dict:
+        """ показатели качества связи с контроллером (из процесса опроса) """
+        if self._pipe:
+            while self._pipe.poll():
+                self._pipe.recv()   # ответ на запрос, не дождавшийся чтения
+            self._pipe.send(('getHealth', None))
+            if self._pipe.poll(1.0):
+                return self._pipe.recv()
+        return {}
+
+    def setProfile(self, profile: Profile):
+        """ установка режима опроса (простой, наблюдение, испытание) """
+        self._profile = profile
+        if self._pipe:
+            self._pipe.send(('setProfile', profile))
+
+    def getTiming(self) -> dict:
+        """ статистика периода опроса (частота, отклонения, опоздания) """
+        return self._timing.getSummary()
+
+    def dumpTiming(self, path: str):
+        """ сохранение статистики и отметок опроса в файл """
+        self._timing.dump(path)
+
+    @staticmethod
+    def checkParams(params: Param, value) -> bool:
+        """ проверка параметров """
+        return AdamManager.checkParams(params, value)
+
+    def getSamples(self, start: int = 0) -> tuple:
+        """ показания из буфера с номера start
+            -> (номер следующего, отметки времени, значения) """
+        if self._ring is None:
+            return start, np.empty(0), np.empty((0, len(self.NAMES)))
+        return self._ring.read(start)
+
+    def _startProcess(self, interval: float) -> bool:
+        """ запуск процесса опроса """
+        self._ring = SampleRing(self.NAMES)
+        self._next = 0
+        self._is_online = True
+        self._filter.reset()
+        self._timing.reset()
+        self._pipe, child = self._context.Pipe()
+        self._process = self._context.Process(
+            name="Adam5k polling process", target=runWorker, daemon=True,
+            args=(child, self._ring.name, SampleRing.SIZE, self._ring.names,
+                  *self._conn, interval, self._profile)
+        )
+        self._process.start()
+        child.close()
+        state = self._pipe.poll(self.START_TIMEOUT) and self._pipe.recv()
+        if state:
+            self._timer.start()
+        else:
+            self._stopProcess()
+        _LOG.info("процесс опроса %s", "запущен" if state else "не запущен")
+        return bool(state)
+
+    def _stopProcess(self):
+        """ остановка процесса опроса и освобождение буфера """
+        self._timer.stop()
+        if self._process:
+            try:
+                self._pipe.send(('stop', None))
+            except (BrokenPipeError, OSError):
+                pass
+            self._process.join(self.START_TIMEOUT)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._pipe.close()
+            self._process = self._pipe = None
+            _LOG.info("процесс опроса остановлен")
+        if self._ring:
+            self._ring.close(unlink=True)
+            self._ring = None
+            self._signal.emit(dict.fromkeys(Sensors.NAMES, 0.0))
+
+    def _onTimer(self):
+        """ чтение новых показаний из буфера """
+        if self._process and not self._process.is_alive():
+            _LOG.error("процесс опроса завершился (код %s)", self._process.exitcode)
+            self._stopProcess()
+            return
+        self._next, times, values = self._ring.read(self._next)
+        if not len(values):
+            return
+        analog, digital = len(Sensors.NAMES), len(Sensors.DIGITAL)
+        # связь, фронты и отметки времени - по всем новым показаниям
+        # (не пропустить импульс)
+        for received, row in zip(times.tolist(), values.tolist()):
+            is_online, is_valid, sent, interval = row[analog + digital:]
+            if bool(is_online) != self._is_online:
+                self._is_online = bool(is_online)
+                if self._is_online:
+                    # интерфейс очищает показания при потере связи ->
+                    # после восстановления публикуются все значения
+                    self._filter.reset()
+                self._link.emit(self._is_online)
+            if is_valid:
+                states = dict(zip(Sensors.DIGITAL, map(bool, row[analog:analog + digital])))
+                for name, state in self._filter.getEdges(states).items():
+                    self._edge.emit(name, state)
+                self._timing.setInterval(interval)
+                self._timing.add(sent, received)
+                self._sample.emit(sent, received, dict(zip(Sensors.NAMES, row[:analog])))
+        values = values[values[:, analog + digital + 1] > 0]
+        if not len(values):
+            return
+        args = dict(zip(Sensors.NAMES, values[-1, :analog].tolist()))
+        self._signal.emit(args)
+        changes = self._filter.getChanges(args)
+        if changes:
+            self._changed.emit(changes)
@@ -0,0 +1,162 @@
+"""
+    Модуль статистического анализа архива испытаний типоразмера.
+    ArchiveStats - выбирает из БД порциями все испытания типоразмера,
+    распаковывает их точки, приводит кривые к общей сетке по расходу
+    и рассчитывает полосы процентилей и оценки выбросов.
+    Результаты кэшируются: при повторном запросе из БД читаются
+    только испытания, добавленные после предыдущего. Запись или
+    перезапись точек прочитанного испытания сбрасывает кэш
+    его типоразмера (invalidateTest)
+"""
+import warnings
+from dataclasses import dataclass, field
+import numpy as np
+from Classes.Data.alchemy_tables import Seal, Test
+from Classes.Data.test_curves import decodeCurves
+from AesmaLib.journal import Journal
+
+
+_LOG = Journal.getLogger(__name__)
+
+
+@dataclass
+class TypeStats:
+    """ Класс статистики испытаний типоразмера """
+    type_id: int
+    last_id: int = 0                                # последний прочитанный ID
+    ids: list = field(default_factory=list)         # ID испытаний с точками
+    missing: set = field(default_factory=set)       # ID испытаний без точек
+    curves: list = field(default_factory=list)      # точки (3, n) испытаний
+    grid: np.ndarray = None                         # сетка по расходу
+    values: dict = field(default_factory=dict)      # {'lft': (испытания, сетка)}
+    bands: dict = field(default_factory=dict)       # {'lft': {процентиль: массив}}
+    scores: dict = field(default_factory=dict)      # {ID испытания: оценка}
+
+
+class ArchiveStats:
+    """ Класс анализа архива испытаний """
+    GRID_SIZE = 50
+    PERCENTILES = (5, 25, 50, 75, 95)
+    CHUNK_SIZE = 500        # кол-во испытаний в порции чтения из БД
+    CURVES = {'lft': 1, 'pwr': 2}     # кривые (строки массива точек)
+
+    def __init__(self, data_manager):
+        self._data_manager = data_manager
+        self._cache = {}    # {ID типоразмера: TypeStats}
+
+    def getStats(self, type_id: int) -> TypeStats:
+        """ статистика испытаний типоразмера (дочитываются новые испытания) """
+        stats = self._cache.setdefault(type_id, TypeStats(type_id))
+        count = len(stats.ids)
+        self._readNewTests(stats)
+        if len(stats.ids) != count:
+            self._update(stats, count)
+        return stats
+
+    def getOutliers(self, type_id: int, threshold=3.0) -> dict:
+        """ испытания с оценкой выброса больше threshold """
+        stats = self.getStats(type_id)
+        return {test_id: score for test_id, score in stats.scores.items()
+                if score > threshold}
+
+    def invalidate(self, type_id: int = 0):
+        """ сброс кэша типоразмера (всех, если не указан),
+            например после удаления испытаний """
+        if type_id:
+            self._cache.pop(type_id, None)
+        else:
+            self._cache.clear()
+
+    def invalidateTest(self, test_id: int):
+        """ сброс кэша типоразмера, испытание которого уже прочитано
+            (после записи, перезаписи или удаления его точек) """
+        for type_id, stats in list(self._cache.items()):
+            if test_id in stats.missing or test_id in stats.ids:
+                self.invalidate(type_id)
+
+    def _readNewTests(self, stats: TypeStats):
+        """ чтение порциями испытаний, добавленных после last_id """
+        def func(**kwargs):
+            query = kwargs['session'].query(Test.ID, Test.RawData) \
+                .join(Seal, Test.Seal == Seal.ID) \
+                .filter(Seal.Type == stats.type_id, Test.ID > stats.last_id) \
+                .order_by(Test.ID).yield_per(self.CHUNK_SIZE)
+            for test_id, raw_data in query:
+                stats.last_id = test_id
+                curves = decodeCurves(raw_data)
+                if curves is not None and curves.shape[1] > 1:
+                    stats.ids.append(test_id)
+                    stats.curves.append(curves)
+                else:
+                    stats.missing.add(test_id)
+        self._data_manager.execute(func)
+
+    def _update(self, stats: TypeStats, count: int):
+        """ приведение к сетке новых кривых (или всех, если сетка
+            изменилась) и перерасчёт полос и оценок """
+        flw_max = max(float(np.max(curves[0])) for curves in stats.curves[count:])
+        if stats.grid is None or flw_max > stats.grid[-1]:
+            stats.grid = np.linspace(0.0, flw_max, self.GRID_SIZE)
+            count = 0
+        for name, row in self.CURVES.items():
+            values = resample(stats.curves[count:], row, stats.grid)
+            if count:
+                values = np.vstack((stats.values[name], values))
+            stats.values[name] = values
+            with warnings.catch_warnings():
+                # узлы сетки без точек ни одной кривой -> nan
+                warnings.simplefilter('ignore', RuntimeWarning)
+                stats.bands[name] = dict(zip(
+                    self.PERCENTILES,
+                    np.nanpercentile(values, self.PERCENTILES, axis=0)
+                ))
+        stats.scores = dict(zip(
+            stats.ids, map(float, calculateScores(stats.values.values()))
+        ))
+        _LOG.info("типоразмер %d: испытаний %d", stats.type_id, len(stats.ids))
+
+
+def resample(curves: list, row: int, grid: np.ndarray) -> np.ndarray:
+    """ линейная интерполяция кривых разной длины на общую сетку
+        одним векторным проходом -> массив (кривые, сетка),
+        вне диапазона точек кривой - nan """
+    if not curves:
+        return np.empty((0, grid.size))
+    length = max(curves_.shape[1] for curves_ in curves)
+    flws = np.full((len(curves), length), np.inf)
+    vals = np.full((len(curves), length), np.nan)
+    for i, curves_ in enumerate(curves):
+        order = np.argsort(curves_[0])
+        flws[i, :curves_.shape[1]] = curves_[0][order]
+        vals[i, :curves_.shape[1]] = curves_[row][order]
+    counts = np.isfinite(flws).sum(axis=1)[:, None]
+    # индекс правой точки отрезка для каждого узла сетки
+    right = (flws[:, :, None] <= grid[None, None, :]).sum(axis=1)
+    last = np.take_along_axis(flws, counts - 1, axis=1)
+    inside = (right > 0) & ((right < counts) | (grid == last))
+    right = np.clip(right, 1, counts - 1)
+    x_0 = np.take_along_axis(flws, right - 1, axis=1)
+    x_1 = np.take_along_axis(flws, right, axis=1)
+    y_0 = np.take_along_axis(vals, right - 1, axis=1)
+    y_1 = np.take_along_axis(vals, right, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        coef = np.where(x_1 > x_0, (grid - x_0) / (x_1 - x_0), 0.0)
+    result = y_0 + coef * (y_1 - y_0)
+    result[~inside] = np.nan
+    return result
+
+
+def calculateScores(values) -> np.ndarray:
+    """ оценка выброса каждого испытания: среднее по сетке отклонение
+        от медианы в единицах MAD (робастная z-оценка) по всем кривым """
+    scores = []
+    with warnings.catch_warnings():
+        # узлы сетки без точек и нулевой разброс -> nan
+        warnings.simplefilter('ignore', RuntimeWarning)
+        for matrix in values:
+            median = np.nanmedian(matrix, axis=0)
+            mad = np.nanmedian(np.abs(matrix - median), axis=0) * 1.4826
+            z_score = np.abs(matrix - median) / np.where(mad > 0, mad, np.nan)
+            scores.append(z_score)
+        result = np.nanmean(np.hstack(scores), axis=1)
+    return np.nan_to_num(result)
@@ -0,0 +1,214 @@
+"""
+    Модуль обмена данными между стендами.
+    exportData - выгрузка производителей, заказчиков, сборок, типоразмеров,
+    насосов и испытаний (вместе с точками RawData) в архив numpy (.npz),
+    где каждая таблица хранится по столбцам порциями по CHUNK_SIZE строк
+    importData - загрузка архива в БД одной транзакцией:
+    внешние ключи сопоставляются по естественным ключам (наименование,
+    заводской номер, наряд-заказ), уже существующие записи пропускаются,
+    новые добавляются пакетно (executemany)
+
+    python -m Classes.Data.data_exchange export Files/seals.sqlite stand1.npz
+    python -m Classes.Data.data_exchange import Files/seals.sqlite stand1.npz
+"""
+import sys
+import json
+import math
+import numpy as np
+from sqlalchemy import bindparam, create_engine, func, select, type_coerce
+from sqlalchemy.sql.sqltypes import BLOB, Numeric, String
+from Classes.Data.alchemy_tables import Base, Assembly, Customer, Producer
+from Classes.Data.alchemy_tables import Type, Seal, Test
+from AesmaLib.journal import Journal
+
+
+FORMAT_VERSION = 2
+CHUNK_SIZE = 50000
+# порядок таблиц: сначала те, на которые ссылаются остальные
+TABLES = (Producer, Customer, Assembly, Type, Seal, Test)
+_LOG = Journal.getLogger(__name__)
+
+
+def exportData(path_to_db: str, path_to_file: str, chunk_size=CHUNK_SIZE) -> dict:
+    """ выгрузка таблиц в архив -> возвращает {таблица: кол-во строк} """
+    engine = create_engine(f'sqlite:///{path_to_db}')
+    arrays, meta = {}, {'version': FORMAT_VERSION, 'tables': {}}
+    with engine.connect() as conn:
+        for table_class in TABLES:
+            table = table_class.__table__
+            # DECIMAL читается текстом (без преобразования через float)
+            columns = [type_coerce(column, String).label(column.name)
+                       if _isDecimal(column) else column
+                       for column in table.columns]
+            result = conn.execution_options(stream_results=True) \
+                .execute(select(*columns).order_by(table.c.ID))
+            chunks = rows = 0
+            for chunk in result.partitions(chunk_size):
+                for i, column in enumerate(table.columns):
+                    values = [row[i] for row in chunk]
+                    key = f"{table.name}/{chunks}/{column.name}"
+                    arrays.update(_packColumn(key, column, values))
+                chunks += 1
+                rows += len(chunk)
+            meta['tables'][table.name] = {'chunks': chunks, 'rows': rows}
+    engine.dispose()
+    arrays['meta'] = np.array(json.dumps(meta))
+    np.savez_compressed(path_to_file, **arrays)
+    counts = {name: vals['rows'] for name, vals in meta['tables'].items()}
+    _LOG.info("выгружено в %s: %s", path_to_file, counts)
+    return counts
+
+
+def importData(path_to_db: str, path_to_file: str) -> dict:
+    """ загрузка архива в БД одной транзакцией
+        -> возвращает {таблица: кол-во добавленных строк} """
+    counts = {}
+    engine = create_engine(f'sqlite:///{path_to_db}')
+    Base.metadata.create_all(engine)
+    with np.load(path_to_file, allow_pickle=False) as archive, \
+         engine.begin() as conn:
+        meta = json.loads(str(archive['meta']))
+        if meta['version'] != FORMAT_VERSION:
+            raise ValueError(f"неподдерживаемая версия архива {meta['version']}")
+        id_maps = {}    # {таблица: {ID в архиве: ID в БД}}
+        for table_class in TABLES:
+            table = table_class.__table__
+            info = meta['tables'].get(table.name, {'chunks': 0})
+            importer = _Importer(conn, table, id_maps)
+            for chunk in range(info['chunks']):
+                importer.insert(_readChunk(archive, table, chunk))
+            id_maps[table.name] = importer.id_map
+            counts[table.name] = importer.inserted
+    engine.dispose()
+    _LOG.info("загружено из %s: %s", path_to_file, counts)
+    return counts
+
+
+class _Importer:
+    """ Загрузка строк таблицы: сопоставление внешних ключей,
+        пропуск существующих записей, пакетная вставка """
+    # естественные ключи для поиска существующих записей
+    KEYS = {
+        'Producers': ('Name',),
+        'Customers': ('Name',),
+        'Assemblies': ('Name',),
+        'Types': ('Name', 'Producer'),
+        'Seals': ('Serial',),
+        'Tests': ('OrderNum', 'Seal')
+    }
+
+    def __init__(self, conn, table, id_maps: dict):
+        self._conn = conn
+        self._table = table
+        self._id_maps = id_maps
+        self._keys = self.KEYS[table.name]
+        self._foreign = {
+            column.name: next(iter(column.foreign_keys)).column.table.name
+            for column in table.columns if column.foreign_keys
+        }
+        columns = [table.c.ID] + [table.c[name] for name in self._keys]
+        self._existing = {
+            tuple(row[1:]): row[0] for row in conn.execute(select(*columns))
+        }
+        self._next_id = (conn.execute(select(func.max(table.c.ID))).scalar() or 0) + 1
+        # DECIMAL записывается текстом (без преобразования через float)
+        self._statement = table.insert().values({
+            column.name: bindparam(column.name, type_=String())
+            for column in table.columns if _isDecimal(column)
+        })
+        self.id_map = {}
+        self.inserted = 0
+
+    def insert(self, rows: list):
+        """ вставка порции строк """
+        new_rows = []
+        for row in rows:
+            for name, target in self._foreign.items():
+                if row[name] is not None:
+                    row[name] = self._id_maps[target].get(row[name])
+            key = tuple(row[name] for name in self._keys)
+            if key in self._existing:
+                self.id_map[row['ID']] = self._existing[key]
+                continue
+            self.id_map[row['ID']] = self._existing[key] = row['ID'] = self._next_id
+            self._next_id += 1
+            new_rows.append(row)
+        if new_rows:
+            self._conn.execute(self._statement, new_rows)
+            self.inserted += len(new_rows)
+
+
+def _packColumn(key: str, column, values: list) -> dict:
+    """ упаковка столбца: числа - float с nan вместо None,
+        BLOB - байты и размеры (-1 - None), строки и DECIMAL (текстом,
+        без потери точности) - байты UTF-8 и размеры """
+    if isinstance(column.type, BLOB):
+        return _packBytes(key, values)
+    if isinstance(column.type, String):
+        return _packBytes(key, [None if value is None else value.encode('utf-8')
+                                for value in values])
+    if _isDecimal(column):
+        return _packBytes(key, [None if value is None else str(value).encode('ascii')
+                                for value in values])
+    return {key: np.array([np.nan if value is None else float(value)
+                           for value in values], dtype=float)}
+
+
+def _packBytes(key: str, values: list) -> dict:
+    """ упаковка байтовых значений: общий массив байт и размеры """
+    sizes = [len(value) if value is not None else -1 for value in values]
+    data = b''.join(value for value in values if value is not None)
+    return {key: np.frombuffer(data, dtype=np.uint8),
+            f"{key}/sizes": np.array(sizes, dtype=np.int64)}
+
+
+def _unpackBytes(archive, key: str) -> list:
+    """ распаковка байтовых значений (None для размера -1) """
+    data, sizes = archive[key].tobytes(), archive[f"{key}/sizes"]
+    ends = np.cumsum(np.maximum(sizes, 0))
+    return [
+        None if size < 0 else data[end - size:end]
+        for size, end in zip(sizes.tolist(), ends.tolist())
+    ]
+
+
+def _isDecimal(column) -> bool:
+    """ столбец с десятичными числами (DECIMAL / NUMERIC) """
+    return isinstance(column.type, Numeric) and column.type.asdecimal
+
+
+def _readChunk(archive, table, chunk: int) -> list:
+    """ распаковка порции строк таблицы из архива -> [{столбец: значение}] """
+    columns = {}
+    for column in table.columns:
+        key = f"{table.name}/{chunk}/{column.name}"
+        if isinstance(column.type, BLOB):
+            columns[column.name] = _unpackBytes(archive, key)
+        elif isinstance(column.type, String):
+            columns[column.name] = [
+                None if value is None else value.decode('utf-8')
+                for value in _unpackBytes(archive, key)
+            ]
+        elif _isDecimal(column):
+            columns[column.name] = [
+                None if value is None else value.decode('ascii')
+                for value in _unpackBytes(archive, key)
+            ]
+        else:
+            python_type = column.type.python_type
+            columns[column.name] = [
+                None if math.isnan(value) else python_type(value)
+                for value in archive[key].tolist()
+            ]
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 4 or sys.argv[1] not in ('export', 'import'):
+        print("python -m Classes.Data.data_exchange export|import БД архив.npz")
+        sys.exit(1)
+    if sys.argv[1] == 'export':
+        print(exportData(sys.argv[2], sys.argv[3]))
+    else:
+        print(importData(sys.argv[2], sys.argv[3]))
@@ -7,6 +7,7 @@ from sqlalchemy import create_engine, MetaData
 from sqlalchemy.orm.session import sessionmaker
 from Classes.Data.alchemy_tables import Customer, Seal, Test
 from Classes.Data.record import Record, RecordType, RecordSeal, RecordTest
+from Classes.Data.archive_stats import ArchiveStats
 from AesmaLib.message import Message
 from AesmaLib.journal import Journal
 
@@ -27,6 +28,7 @@ class DataManager:
         self._engine = create_engine(f'sqlite:///{path_to_db}')
         self._meta = MetaData(self._engine)
         self._testdata = TestData(self)
+        self._archive_stats = None
 
     def execute(self, func, *args, **kwargs):
         """ выполнение запросов к БД и очистка """
@@ -43,6 +45,17 @@ class DataManager:
         """ возвращает ссылку на информацию об записи """
         return self._testdata
 
+    def getArchiveStats(self) -> ArchiveStats:
+        """ возвращает статистику архива испытаний (создаётся при запросе) """
+        if self._archive_stats is None:
+            self._archive_stats = ArchiveStats(self)
+        return self._archive_stats
+
+    def onTestChanged(self, test_id: int):
+        """ точки испытания перезаписаны или удалены -> сброс статистики """
+        if self._archive_stats is not None and test_id:
+            self._archive_stats.invalidateTest(test_id)
+
     def createRecord(self, super_class, data: dict):
         """ создать новую запись """
         record = Record(self, super_class)
@@ -77,6 +90,7 @@ class DataManager:
                     session_.commit()
                 session_.close()
                 self._engine.dispose()
+            self.onTestChanged(test_id)
 
     def clearTypeInfo(self):
         """ очистка информации о типоразмере """
@@ -101,6 +115,22 @@ class DataManager:
         result = self.execute(func)
         return list(map(dict, result))
 
+    def getTestsIDs(self, customer=0, date_from='', date_to=''):
+        """ получает список ID испытаний по заказчику и интервалу дат
+            [date_from, date_to), даты сравниваются как строки
+            в формате поля DateTime, например '2021-09-01' """
+        def func(**kwargs):
+            query = kwargs['session'].query(Test.ID)
+            if customer:
+                query = query.filter(Test.Customer == customer)
+            if date_from:
+                query = query.filter(Test.DateTime >= date_from)
+            if date_to:
+                query = query.filter(Test.DateTime < date_to)
+            return query.order_by(Test.ID).all()
+        result = self.execute(func)
+        return [item.ID for item in result]
+
     def getListFor(self, table_class, fields):
         """ получает список элементов из таблицы """
         def func(**kwargs):
@@ -124,6 +154,7 @@ class DataManager:
         """ сохраняет информацию о тесте """
         self._testdata.test_['Seal'] = self._testdata.seal_['ID']
         self._testdata.test_.write()
+        self.onTestChanged(self._testdata.test_['ID'])
 
     @Journal.logged
     def saveSealInfo(self) -> bool:
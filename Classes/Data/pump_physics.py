@@ -0,0 +1,71 @@
+"""
+    Модуль расчёта характеристик насоса.
+    Все функции принимают как отдельные значения, так и массивы
+    (списки, numpy) и считают их за один векторный проход:
+    для массивов возвращаются numpy массивы, для чисел - float
+"""
+import numpy as np
+
+
+NOMINAL_RPM = 2910.0    # номинальная частота вращения, об/мин
+PSI_PER_FT = 0.433      # давление столба воды высотой 1 фут, psi
+HP_TO_KW = 0.7457       # лошадиные силы -> кВт
+HP_TORQUE_RPM = 5252.0  # л.с. = момент (фунт*фут) * об/мин / 5252
+GRAVITY = 9.81          # ускорение свободного падения, м/с2
+SECONDS_PER_DAY = 24 * 3600
+
+
+def calculateLift(psi_in, psi_out):
+    """ расчёт напора по давлению на входе и выходе """
+    return _result((_array(psi_out) - _array(psi_in)) / PSI_PER_FT)
+
+
+def calculatePower(torque, rpm):
+    """ расчёт потребляемой мощности по моменту и частоте вращения """
+    return _result(_array(rpm) * _array(torque) / HP_TORQUE_RPM)
+
+
+def calculateEff(flw, lft, pwr):
+    """ расчёт КПД, % (0 - если расход, напор или мощность нулевые) """
+    flw, lft, pwr = np.broadcast_arrays(_array(flw), _array(lft), _array(pwr))
+    valid = (flw != 0) & (lft != 0) & (pwr != 0)
+    result = np.zeros(flw.shape)
+    np.divide(GRAVITY * lft * flw * 100, SECONDS_PER_DAY * pwr,
+              out=result, where=valid)
+    return _result(result)
+
+
+def applySpeedFactor(flw, lft, pwr, rpm):
+    """ приведение расхода, напора и мощности к номинальной частоте
+        по законам подобия (при нулевой частоте - без изменений) """
+    rpm = _array(rpm)
+    coeff = np.ones(rpm.shape)
+    np.divide(NOMINAL_RPM, rpm, out=coeff, where=rpm != 0)
+    return (_result(_array(flw) * coeff),
+            _result(_array(lft) * coeff ** 2),
+            _result(_array(pwr) * coeff ** 3))
+
+
+def hpToKw(pwr):
+    """ перевод мощности из л.с. в кВт """
+    return _result(_array(pwr) * HP_TO_KW)
+
+
+def calculatePoints(flw, psi_in, psi_out, torque, rpm):
+    """ расчёт точек по показаниям датчиков: напор, мощность,
+        приведение к номинальной частоте и КПД
+        -> возвращает (расход, напор, мощность, КПД) """
+    lft = calculateLift(psi_in, psi_out)
+    pwr = calculatePower(torque, rpm)
+    flw, lft, pwr = applySpeedFactor(flw, lft, pwr, rpm)
+    return flw, lft, pwr, calculateEff(flw, lft, pwr)
+
+
+def _array(values) -> np.ndarray:
+    """ преобразование значений в массив чисел """
+    return np.asarray(values, dtype=float)
+
+
+def _result(values: np.ndarray):
+    """ массив -> массив, 0-мерный массив -> float """
+    return float(values) if values.ndim == 0 else values
@@ -136,5 +136,5 @@ class RecordTest(RecordType):
         result = super().read(rec_id)
         if result and self.Vibrations:
             func = lambda x: float(x) if x != '' else 0.0
-            values_vbr = list(map(func, self.Vibrations.split(';')))
+            self.values_vbr = list(map(func, self.Vibrations.split(';')))
         return result
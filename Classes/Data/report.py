@@ -2,13 +2,16 @@
     Модуль описания класса протокола об испытании
 """
 import os
+import threading
 from jinja2 import FileSystemLoader, Environment
-from PyQt5.QtGui import QPageSize
+from PyQt5.QtGui import QPageSize, QImage
 from PyQt5.QtPrintSupport import QPrintDialog, QPrinter
-from PyQt5.QtCore import QSize, QUrl
+from PyQt5.QtCore import QUrl, QBuffer, QByteArray, QIODevice
 from PyQt5.QtWebEngineWidgets import QWebEngineView
-from Classes.Graph.graph_manager import GraphManager
+from Classes.Graph.report_graph import ReportGraph
 from Classes.Data.data_manager import TestData
+from Classes.Data.test_curves import decodeCurves
+from Classes.Data import pump_physics
 from AesmaLib.journal import Journal
 
 
@@ -16,20 +19,17 @@ class Report:
     """ Класс протокола об испытании """
     _NAMES = {
         "template": "template.html",
-        "report": "report.pdf",
-        "image": "graph_image.jpg"
+        "report": "report.pdf"
     }
 
-    def __init__(self, template_folder, graph_manager: GraphManager, test_data: TestData):
+    def __init__(self, template_folder, test_data: TestData):
         self._webview = None
         self._printer = None
+        self._template = None
+        self._template_lock = threading.Lock()
         self._template_folder = template_folder
         self._test_data = test_data
-        self._graph_manager = graph_manager
-        self._path_to_img = os.path.join(
-            self._template_folder,
-            self._NAMES["image"]
-        )
+        self._report_graph = None
         self._base_url = QUrl.fromLocalFile(self._template_folder + os.path.sep)
 
     @Journal.logged
@@ -37,10 +37,19 @@ class Report:
         """ Генерирование протокола """
         if not self._webview:
             self.initPrinter()
-        self.__createGraphImage()
-        report = self.__create()
+        report = self.createHtml(self._test_data, self.__createGraphImage())
         self.__print(report)
-        self.__deleteGraphImage()
+
+    def warmUp(self):
+        """ подготовка к печати в фоне после запуска приложения:
+            шаблон компилируется в отдельном потоке,
+            представление запускает процесс web движка заранее """
+        threading.Thread(
+            target=self.getTemplate, name="Report warmup", daemon=True
+        ).start()
+        if not self._webview:
+            self.initPrinter()
+            self._webview.setHtml("", baseUrl=self._base_url)
 
     def initPrinter(self):
         """ инициализация представления и принтера при первом запросе """
@@ -49,48 +58,66 @@ class Report:
         self._printer.setOutputFormat(QPrinter.NativeFormat)
         self._printer.setPageSize(QPageSize(QPageSize.A4))
 
-    def __loadTemplate(self):
-        """ загрузка html шаблона """
-        loader = FileSystemLoader(self._template_folder)
-        jinja_env = Environment(loader=loader, autoescape=True)
-        result = jinja_env.get_template(self._NAMES["template"])
-        return result
+    def getBaseUrl(self) -> QUrl:
+        """ адрес папки шаблона для ссылок из html """
+        return self._base_url
+
+    def getTemplate(self):
+        """ загрузка html шаблона (компилируется один раз) """
+        with self._template_lock:
+            if self._template is None:
+                loader = FileSystemLoader(self._template_folder)
+                jinja_env = Environment(loader=loader, autoescape=True)
+                self._template = jinja_env.get_template(self._NAMES["template"])
+        return self._template
+
+    def createHtml(self, test_data: TestData, graph_image: QImage) -> str:
+        """ создание web страницы протокола
+            (может вызываться из рабочих потоков) """
+        context = {
+            "seal_info": test_data.seal_,
+            "test_info": test_data.test_,
+            "type_info": test_data.type_,
+            "delta_lft": test_data.dlts_['lft'],
+            "delta_pwr": test_data.dlts_['pwr'],
+            "delta_eff": test_data.dlts_['eff'],
+            "points": self.getPoints(test_data),
+            "graph_image": self.toDataUri(graph_image)
+        }
+        return self.getTemplate().render(context)
+
+    @staticmethod
+    def getPoints(test_data: TestData) -> list:
+        """ точки испытания из RawData -> [(расход, напор, мощность, кпд)] """
+        curves = decodeCurves(test_data.test_['RawData'])
+        if curves is None:
+            return []
+        flws, lfts, pwrs = curves
+        effs = pump_physics.calculateEff(flws, lfts, pwrs)
+        return list(zip(flws.tolist(), lfts.tolist(), pwrs.tolist(), effs.tolist()))
 
-    def __createGraphImage(self):
-        """ сохранение графика испытания в jpg"""
-        img_size = QSize(794, 450)
-        self._graph_manager.switchPalette('report')
-        self._graph_manager.renderToImage(img_size, self._path_to_img)
-        self._graph_manager.switchPalette('application')
+    @staticmethod
+    def toDataUri(image: QImage) -> str:
+        """ кодирование рисунка в png -> data URI для вставки в шаблон """
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.WriteOnly)
+        image.save(buffer, 'PNG')
+        buffer.close()
+        return "data:image/png;base64," + bytes(data.toBase64()).decode('ascii')
 
-    def __deleteGraphImage(self):
-        if os.path.exists(self._path_to_img):
-            os.remove(self._path_to_img)
+    def __createGraphImage(self) -> QImage:
+        """ отрисовка графика испытания в рисунок
+            (вне графика главного окна, с кэшем) """
+        if self._report_graph is None:
+            self._report_graph = ReportGraph(self._test_data)
+        return self._report_graph.render(self._test_data)
 
     @staticmethod
     def __onPrinted(result: bool):
         """ callback вызова печати """
         print(f"Report\t\t->{'успех' if result else 'ошибка'}")
 
-    def __create(self):
-        """ создание web страницы протокола """
-        result = self.__loadTemplate()
-        result = self.__fill(result)
-        return result
-
-    def __fill(self, template):
-        """ заполнение шаблона данными об испытании """
-        context = {
-            "seal_info": self._test_data.seal_,
-            "test_info": self._test_data.test_,
-            "type_info": self._test_data.type_,
-            "delta_lft": self._test_data.dlts_['lft'],
-            "delta_pwr": self._test_data.dlts_['pwr'],
-            "delta_eff": self._test_data.dlts_['eff'],
-        }
-        result = template.render(context)
-        return result
-
     def __print(self, report):
         """ печать протокола испытания """
         self._webview.setZoomFactor(1)
@@ -98,4 +125,3 @@ class Report:
         if QPrintDialog(self._printer).exec_():
             print("Report\t\t->отправка протокола на печать")
             self._webview.page().print(self._printer, self.__onPrinted)
-        os.remove(self._path_to_img)
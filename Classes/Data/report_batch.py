@@ -0,0 +1,208 @@
+"""
+    Модуль пакетной выгрузки протоколов испытаний в PDF без диалога печати.
+    Этапы выгрузки выполняются конвейером:
+    загрузка записей из БД и заполнение шаблона - в пуле рабочих потоков,
+    отрисовка графика и печать в PDF (QWebEnginePage.printToPdf) -
+    в основном потоке Qt, одновременно печатается не более pages страниц.
+
+    python -m Classes.Data.report_batch --customer 3 --from 2021-09-01 --to 2021-10-01
+"""
+import os
+import sys
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from PyQt5.QtCore import QObject, QMarginsF, pyqtSignal
+from PyQt5.QtGui import QPageLayout, QPageSize
+from PyQt5.QtWebEngineWidgets import QWebEnginePage
+from Classes.Data.data_manager import DataManager, TestData
+from Classes.Data.report import Report
+from Classes.Graph.report_graph import ReportGraph
+from AesmaLib.journal import Journal
+
+
+_LOG = Journal.getLogger(__name__)
+
+
+class ReportBatch(QObject):
+    """ Класс пакетной выгрузки протоколов в PDF """
+    finished = pyqtSignal(dict)             # {ID испытания: путь к PDF или None}
+    _loaded = pyqtSignal(int, object)       # ID испытания, future загрузки
+    _filled = pyqtSignal(int, object)       # ID испытания, future заполнения
+
+    def __init__(self, template_folder, data_manager: DataManager,
+                 output_folder, workers=4, pages=2, parent=None):
+        super().__init__(parent=parent)
+        self._data_manager = data_manager
+        self._output_folder = output_folder
+        self._workers = workers
+        self._report_graph = ReportGraph(TestData(data_manager))
+        self._report = Report(template_folder, None)
+        self._layout = QPageLayout(
+            QPageSize(QPageSize.A4), QPageLayout.Portrait, QMarginsF()
+        )
+        self._pages = [self._createPage() for _ in range(pages)]
+        self._pool = None
+        self._pending = deque()     # ID испытаний, ожидающие загрузки
+        self._htmls = deque()       # заполненные шаблоны, ожидающие печати
+        self._jobs = {}             # {страница: (ID испытания, путь к PDF)}
+        self._in_work = 0           # кол-во испытаний в пуле потоков
+        self._results = {}
+        self._total = 0
+        self._loaded.connect(self._onLoaded)
+        self._filled.connect(self._onFilled)
+
+    def start(self, test_ids: list):
+        """ запуск выгрузки, по окончании - сигнал finished """
+        os.makedirs(self._output_folder, exist_ok=True)
+        self._pool = ThreadPoolExecutor(self._workers, "Report batch")
+        self._pending = deque(test_ids)
+        self._results = {}
+        self._total = len(test_ids)
+        _LOG.info("выгрузка %d протоколов в %s", self._total, self._output_folder)
+        self._feedPool()
+        self._checkFinished()
+
+    def _feedPool(self):
+        """ передача испытаний в пул потоков: в работе и в очереди
+            печати держится не больше 2 * workers испытаний """
+        while self._pending and \
+                self._in_work + len(self._htmls) < 2 * self._workers:
+            test_id = self._pending.popleft()
+            self._in_work += 1
+            future = self._pool.submit(self._loadTestdata, test_id)
+            future.add_done_callback(partial(self._emit, self._loaded, test_id))
+
+    @staticmethod
+    def _emit(signal, test_id, future):
+        """ передача результата рабочего потока в основной поток """
+        signal.emit(test_id, future)
+
+    def _loadTestdata(self, test_id: int) -> TestData:
+        """ загрузка записей испытания, насоса и типоразмера (рабочий поток) """
+        testdata = TestData(self._data_manager)
+        testdata.dlts_ = {}
+        if not testdata.test_.read(test_id):
+            raise LookupError(f"нет испытания {test_id}")
+        if testdata.seal_.read(testdata.test_['Seal']):
+            testdata.type_.read(testdata.seal_['Type'])
+        return testdata
+
+    def _onLoaded(self, test_id: int, future):
+        """ отрисовка графика (основной поток) и заполнение шаблона в пуле """
+        try:
+            testdata = future.result()
+            image = self._report_graph.render(testdata, deltas=True)
+        except Exception as error:
+            self._in_work -= 1
+            self._setResult(test_id, None, error)
+            return
+        future = self._pool.submit(self._report.createHtml, testdata, image)
+        future.add_done_callback(partial(self._emit, self._filled, test_id))
+
+    def _onFilled(self, test_id: int, future):
+        """ постановка заполненного шаблона в очередь печати """
+        self._in_work -= 1
+        try:
+            self._htmls.append((test_id, future.result()))
+        except Exception as error:
+            self._setResult(test_id, None, error)
+            return
+        self._feedPages()
+
+    def _createPage(self) -> QWebEnginePage:
+        """ создание страницы для печати в PDF """
+        page = QWebEnginePage(self)
+        page.loadFinished.connect(partial(self._onPageLoaded, page))
+        page.pdfPrintingFinished.connect(partial(self._onPagePrinted, page))
+        return page
+
+    def _feedPages(self):
+        """ загрузка шаблонов в свободные страницы """
+        for page in self._pages:
+            if not self._htmls:
+                break
+            if page not in self._jobs:
+                test_id, html = self._htmls.popleft()
+                path = os.path.join(self._output_folder, f"report_{test_id}.pdf")
+                self._jobs[page] = (test_id, path)
+                page.setHtml(html, baseUrl=self._report.getBaseUrl())
+
+    def _onPageLoaded(self, page: QWebEnginePage, state: bool):
+        """ печать загруженной страницы в PDF """
+        if page not in self._jobs:
+            return
+        if state:
+            page.printToPdf(self._jobs[page][1], self._layout)
+        else:
+            self._onPagePrinted(page, self._jobs[page][1], False)
+
+    def _onPagePrinted(self, page: QWebEnginePage, path: str, state: bool):
+        """ окончание печати страницы """
+        test_id, _ = self._jobs.pop(page)
+        self._setResult(test_id, path if state else None,
+                        None if state else "ошибка печати в PDF")
+
+    def _setResult(self, test_id: int, path, error=None):
+        """ запись результата и переход к следующим испытаниям """
+        self._results[test_id] = path
+        if error:
+            _LOG.warning("протокол %d не выгружен: %s", test_id, error)
+        else:
+            _LOG.debug("протокол %d -> %s", test_id, path)
+        self._feedPages()
+        self._feedPool()
+        self._checkFinished()
+
+    def _checkFinished(self):
+        """ проверка окончания выгрузки """
+        if self._pool and len(self._results) == self._total:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+            done = sum(1 for path in self._results.values() if path)
+            _LOG.info("выгружено протоколов: %d из %d", done, self._total)
+            self.finished.emit(self._results)
+
+
+def main():
+    """ выгрузка протоколов из командной строки """
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtWidgets import QApplication
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    parser = argparse.ArgumentParser(description="Пакетная выгрузка протоколов в PDF")
+    parser.add_argument('--db', default=os.path.join(root, 'Files/seals.sqlite'))
+    parser.add_argument('--template', default=os.path.join(root, 'Files/report'))
+    parser.add_argument('--out', default=os.path.join(root, 'Files/reports'))
+    parser.add_argument('--ids', type=int, nargs='*', help="ID испытаний")
+    parser.add_argument('--customer', type=int, default=0, help="ID заказчика")
+    parser.add_argument('--from', dest='date_from', default='', help="дата с")
+    parser.add_argument('--to', dest='date_to', default='', help="дата по (не вкл.)")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--pages', type=int, default=2)
+    args = parser.parse_args()
+
+    QApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    app = QApplication(sys.argv[:1])
+    data_manager = DataManager(args.db)
+    test_ids = args.ids or data_manager.getTestsIDs(
+        args.customer, args.date_from, args.date_to
+    )
+    batch = ReportBatch(args.template, data_manager, args.out,
+                        args.workers, args.pages)
+    results = {}
+    def onFinished(result: dict):
+        results.update(result)
+        app.quit()
+    batch.finished.connect(onFinished)
+    batch.start(test_ids)
+    if len(results) < len(test_ids):
+        app.exec_()
+    failed = [test_id for test_id, path in results.items() if not path]
+    print(f"выгружено: {len(results) - len(failed)}, ошибок: {len(failed)}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    Journal.setLogged(True)
+    sys.exit(main())
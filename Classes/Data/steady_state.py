@@ -0,0 +1,123 @@
+"""
+    Модуль обнаружения установившегося режима по потоку показаний.
+    Режим установился, если в скользящем окне для каждой величины
+    (расход, напор, мощность) СКО и изменение по линейному тренду
+    (наклон * длительность окна) не превышают допуска - доли среднего,
+    но не меньше абсолютного (для значений около нуля).
+    Режим считается нарушенным при превышении допуска в EXIT раз
+    (гистерезис), снятая точка повторно не снимается, пока расход
+    не изменится больше допуска или окно не будет сброшено
+"""
+from collections import deque
+from dataclasses import dataclass
+import numpy as np
+
+
+@dataclass
+class SteadyPoint:
+    """ Усреднённая точка установившегося режима """
+    mean: dict          # средние значения {величина: значение}
+    std: dict           # СКО {величина: значение}
+    samples: int        # кол-во показаний в окне
+    duration: float     # длительность окна, сек
+
+
+class SteadyDetector:
+    """ Класс обнаружения установившегося режима """
+    NAMES = ('flw', 'lft', 'pwr')
+    WINDOW = 2.0            # длительность окна, сек
+    FILL = 0.9              # доля окна, которую должны покрыть показания
+    MIN_SAMPLES = 10        # минимальное кол-во показаний в окне
+    CHECK_PERIOD = 0.1      # период проверки, сек
+    TOLERANCE = 0.01        # допустимое СКО, доля среднего
+    DRIFT = 0.01            # допустимое изменение за окно, доля среднего
+    FLOORS = {'flw': 1.0, 'lft': 1.0, 'pwr': 0.005}   # минимальные допуски
+    EXIT = 2.0              # множитель допусков для выхода из режима
+    REARM = 0.03            # изменение расхода для снятия новой точки, доля
+
+    def __init__(self, names=NAMES, window=WINDOW,
+                 tolerance=TOLERANCE, drift=DRIFT, floors: dict = None):
+        self._names = tuple(names)
+        self._window = window
+        self._tolerance = tolerance
+        self._drift = drift
+        self._floors = {**self.FLOORS, **(floors or {})}
+        self._times = deque()
+        self._values = deque()
+        self._checked = 0.0
+        self._is_steady = False
+        self._captured = None   # расход последней снятой точки
+
+    @property
+    def names(self) -> tuple:
+        """ имена контролируемых величин """
+        return self._names
+
+    def reset(self):
+        """ сброс окна (после изменения режима) """
+        self._times.clear()
+        self._values.clear()
+        self._checked = 0.0
+        self._is_steady = False
+        self._captured = None
+
+    def isSteady(self) -> bool:
+        """ установился ли режим (по последней проверке) """
+        return self._is_steady
+
+    def add(self, timestamp: float, values: dict) -> bool:
+        """ учёт показаний (отметка времени монотонная, сек)
+            -> установился ли режим """
+        self._times.append(timestamp)
+        self._values.append([values[name] for name in self._names])
+        while timestamp - self._times[0] > self._window:
+            self._times.popleft()
+            self._values.popleft()
+        if timestamp - self._checked >= self.CHECK_PERIOD:
+            self._checked = timestamp
+            self._is_steady = self._check()
+        return self._is_steady
+
+    def capture(self, point: SteadyPoint):
+        """ отметка снятия точки режима """
+        self._captured = point.mean.get('flw')
+
+    def isCaptured(self, point: SteadyPoint) -> bool:
+        """ снята ли уже точка этого режима (расход изменился не больше
+            допуска с момента снятия, окно не сбрасывалось) """
+        if self._captured is None or 'flw' not in point.mean:
+            return False
+        limit = max(abs(self._captured) * self.REARM, self._floors['flw'])
+        return abs(point.mean['flw'] - self._captured) <= limit
+
+    def getPoint(self) -> SteadyPoint:
+        """ средние значения и СКО показаний окна """
+        values = np.array(self._values, dtype=float).reshape(-1, len(self._names))
+        mean = values.mean(axis=0) if len(values) else np.zeros(len(self._names))
+        std = values.std(axis=0) if len(values) else np.zeros(len(self._names))
+        return SteadyPoint(
+            mean=dict(zip(self._names, mean.tolist())),
+            std=dict(zip(self._names, std.tolist())),
+            samples=len(values),
+            duration=self._times[-1] - self._times[0] if self._times else 0.0
+        )
+
+    def _check(self) -> bool:
+        """ проверка СКО и тренда величин в окне """
+        if len(self._times) < self.MIN_SAMPLES:
+            return False
+        times = np.array(self._times)
+        span = times[-1] - times[0]
+        if span < self._window * self.FILL:
+            return False
+        values = np.array(self._values, dtype=float)
+        mean = values.mean(axis=0)
+        deviations = values - mean
+        std = np.sqrt((deviations ** 2).mean(axis=0))
+        times -= times.mean()
+        slope = times @ deviations / (times @ times)
+        floors = np.array([self._floors.get(name, 0.0) for name in self._names])
+        ratio = self.EXIT if self._is_steady else 1.0
+        std_limit = np.maximum(np.abs(mean) * self._tolerance, floors) * ratio
+        drift_limit = np.maximum(np.abs(mean) * self._drift, floors) * ratio
+        return bool(np.all(std <= std_limit) and np.all(np.abs(slope) * span <= drift_limit))
@@ -0,0 +1,24 @@
+"""
+    Модуль хранения точек испытания в поле RawData таблицы Tests.
+    Точки хранятся массивом float32 (little-endian) из трёх строк:
+    расход, напор, мощность
+"""
+import numpy as np
+
+
+CURVES = ('flw', 'lft', 'pwr')
+_DTYPE = np.dtype('<f4')
+
+
+def encodeCurves(flws, lfts, pwrs) -> bytes:
+    """ упаковка точек испытания для записи в RawData """
+    return np.asarray([flws, lfts, pwrs], dtype=_DTYPE).tobytes()
+
+
+def decodeCurves(raw_data) -> np.ndarray:
+    """ распаковка точек испытания из RawData
+        -> возвращает массив (3, кол-во точек) или None """
+    if not raw_data or len(raw_data) % (len(CURVES) * _DTYPE.itemsize):
+        return None
+    result = np.frombuffer(raw_data, dtype=_DTYPE).reshape(len(CURVES), -1)
+    return result.astype(float)
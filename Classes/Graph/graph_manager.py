@@ -1,12 +1,14 @@
 """
     Модуль содержит функции работы с графиками
 """
-from PyQt5.QtGui import QPalette, QBrush, QColor, QPen
-from PyQt5.QtCore import Qt, QPointF
+import numpy as np
+from PyQt5.QtGui import QColor, QPen
+from PyQt5.QtCore import Qt, QPointF, QEvent
 from PyQt5.QtWidgets import QFrame
 from Classes.Graph.seal_graph import SealGraph
 from Classes.Graph.graph_markers import Markers
-from Classes.UI.funcs_aux import calculateEffs
+from Classes.Data import pump_physics
+from Classes.Data.test_curves import encodeCurves, decodeCurves
 from AesmaLib.GraphWidget.chart import Chart
 from AesmaLib.journal import Journal
 
@@ -17,6 +19,9 @@ class GraphManager(SealGraph):
         super().__init__(100, 100, parent=None)
         self._testdata = testdata
         self._markers = None
+        self._charts_generation = 0     # номер набора графиков (loadCharts)
+        self._deltas = {}
+        self._deltas_key = None
         self.setMargins([10, 10, 10, 10])
 
     def initMarkers(self, params, host):
@@ -26,48 +31,73 @@ class GraphManager(SealGraph):
             self._markers.setMarkerColor(key, val)
         host.addWidget(self._markers, 0, 0)
 
+    def setTestdata(self, testdata):
+        """ смена информации об испытании (пакетная выгрузка протоколов) """
+        self._testdata = testdata
+
     def drawCharts(self, frame: QFrame):
         """ отрисовка графиков испытания """
-        self.clearCharts()
-        if self._testdata.type_:
-            charts = self._loadCharts()
-            for chart in charts.values():
-                self.addChart(chart, chart.name)
-            self.setLimits(self._testdata.type_['Min'],
-                            self._testdata.type_['Nom'],
-                            self._testdata.type_['Max'])
+        self.loadCharts()
         self.displayCharts(frame)
 
+    def loadCharts(self):
+        """ создание графиков по информации об испытании """
+        self.clearCharts()
+        self._charts_generation += 1
+        charts = self._loadCharts()
+        for chart in charts.values():
+            self.addChart(chart, chart.name)
+        # пределы рабочего диапазона есть не у всех типоразмеров
+        limits = [self._testdata.type_[name] for name in ('Min', 'Nom', 'Max')]
+        if self._testdata.type_['ID'] and None not in limits:
+            self.setLimits(*limits)
+        else:
+            self.setLimits(0, 0, 0)
+
     def displayCharts(self, frame: QFrame):
-        """ вывод графика в рисунок и в frame """
-        pic = self.renderToImage(frame.size())
-        palette = frame.palette()
-        palette.setBrush(QPalette.Background, QBrush(pic))
-        frame.setPalette(palette)
-        frame.setAutoFillBackground(True)
+        """ встраивание графика в frame и его перерисовка """
+        if self.parentWidget() is not frame:
+            if self.parentWidget():
+                self.parentWidget().removeEventFilter(self)
+            self.setParent(frame)
+            frame.installEventFilter(self)
+            self.lower()    # под маркерами
+            self.show()
+        self.setGeometry(frame.rect())
+        self.update()
+
+    def eventFilter(self, obj, event_):
+        """ фильтр событий: подгонка размера графика под frame """
+        if obj is self.parentWidget() and event_.type() == QEvent.Resize:
+            self.setGeometry(obj.rect())
+        return super().eventFilter(obj, event_)
 
     def _loadCharts(self):
         """ загрузка данных о точках """
-        points = self._getPoints('etalon')
+        points = self._getPoints('etalon') if self._testdata.type_['ID'] else None
         result = self.createCharts_etalon(points)
-        if self._testdata.test_:
+        if self._testdata.test_['ID']:
             points = self._getPoints('test')
             result.update(self.createCharts_test(points, result))
         return result
 
     def _getPoints(self, chart_type='etalon'):
-        """ парсинг значений точек из строк """
-        is_etalon = (chart_type == 'etalon')
-        src = self._testdata.type_ if is_etalon else self._testdata.test_
-        if src.num_points:
-            flws = src.values_flw
-            lfts = src.values_lft
-            pwrs = src.values_pwr
-            if is_etalon:
-                pwrs = list(map(lambda x: x * 0.7457, pwrs))
-            effs = calculateEffs(flws, lfts, pwrs)
-            return [flws, lfts, pwrs, effs]
-        return None
+        """ значения точек: эталона - из строк типоразмера,
+            испытания - из RawData """
+        if chart_type == 'etalon':
+            src = self._testdata.type_
+            if not src.num_points:
+                return None
+            flws = np.asarray(src.values_flw, dtype=float)
+            lfts = np.asarray(src.values_lft, dtype=float)
+            pwrs = pump_physics.hpToKw(np.asarray(src.values_pwr, dtype=float))
+        else:
+            curves = decodeCurves(self._testdata.test_['RawData'])
+            if curves is None or not curves.shape[1]:
+                return None
+            flws, lfts, pwrs = curves
+        effs = pump_physics.calculateEff(flws, lfts, pwrs)
+        return [flws, lfts, pwrs, effs]
 
     def createCharts_etalon(self, points: list):
         """ создание кривых графиков для эталона """
@@ -88,18 +118,27 @@ class GraphManager(SealGraph):
         return result
 
     def createCharts_test(self, points: list, etalon_charts: dict):
-        """ создание кривых графиков для проведённого испытания """
+        """ создание кривых графиков для проведённого испытания
+            (в осях эталона или, если его нет, в собственных) """
         result = {}
-        if points and len(etalon_charts) == 3:
+        if points:
             ch_lft = self._createChart(points[0], points[1], 'test_lft', 'knots')
             ch_pwr = self._createChart(points[0], points[2], 'test_pwr', 'knots')
             ch_eff = self._createChart(points[0], points[3], 'test_eff', 'knots')
-            ch_lft.setPen(QPen(etalon_charts['lft'].getPen()), Qt.SolidLine)
-            ch_pwr.setPen(QPen(etalon_charts['pwr'].getPen()), Qt.SolidLine)
-            ch_eff.setPen(QPen(etalon_charts['eff'].getPen()), Qt.SolidLine)
-            self._scaleChart(ch_lft, axes=etalon_charts['lft'].getAxes())
-            self._scaleChart(ch_pwr, axes=etalon_charts['pwr'].getAxes())
-            self._scaleChart(ch_eff, axes=etalon_charts['eff'].getAxes())
+            if len(etalon_charts) == 3:
+                ch_lft.setPen(QPen(etalon_charts['lft'].getPen()), Qt.SolidLine)
+                ch_pwr.setPen(QPen(etalon_charts['pwr'].getPen()), Qt.SolidLine)
+                ch_eff.setPen(QPen(etalon_charts['eff'].getPen()), Qt.SolidLine)
+                self._scaleChart(ch_lft, axes=etalon_charts['lft'].getAxes())
+                self._scaleChart(ch_pwr, axes=etalon_charts['pwr'].getAxes())
+                self._scaleChart(ch_eff, axes=etalon_charts['eff'].getAxes())
+            else:
+                ch_lft.setPen(QPen(QColor(200, 200, 255), 1), Qt.SolidLine)
+                ch_pwr.setPen(QPen(QColor(255, 0, 0), 1), Qt.SolidLine)
+                ch_eff.setPen(QPen(QColor(0, 255, 0), 1), Qt.SolidLine)
+                self._scaleChart(ch_lft, (0.95, 1.1), 0, 0)
+                self._scaleChart(ch_pwr, (0.95, 1.1), 0, ch_lft.getAxis('y').getDivs())
+                self._scaleChart(ch_eff, (1.0, 1.0),  0, ch_lft.getAxis('y').getDivs())
             result.update({'test_lft': ch_lft,
                         'test_pwr': ch_pwr,
                         'test_eff': ch_eff})
@@ -133,6 +172,9 @@ class GraphManager(SealGraph):
         self._testdata.test_['Flows'] = ','.join(list(map(str, points_lft_x)))
         self._testdata.test_['Lifts'] = ','.join(list(map(str, points_lft_y)))
         self._testdata.test_['Powers'] = ','.join(list(map(str, points_pwr_y)))
+        self._testdata.test_['RawData'] = encodeCurves(
+            points_lft_x, points_lft_y, points_pwr_y
+        )
 
     def markersReposition(self):
         """ перенос маркеров на другой холст """
@@ -180,9 +222,17 @@ class GraphManager(SealGraph):
 
     def addPointsToCharts(self, flw, lft, pwr, eff):
         """ добавление точек напора и мощности на график """
-        self._addPointToChart('test_lft', flw, lft)
-        self._addPointToChart('test_pwr', flw, pwr)
-        self._addPointToChart('test_eff', flw, eff)
+        self._updateChartRegion('test_lft', self._addPointToChart, flw, lft)
+        self._updateChartRegion('test_pwr', self._addPointToChart, flw, pwr)
+        self._updateChartRegion('test_eff', self._addPointToChart, flw, eff)
+
+    def _updateChartRegion(self, chart_name: str, func, *args):
+        """ изменение кривой и перерисовка только занимаемой ею области """
+        rect = self.getChartRect(super().getChart(chart_name))
+        func(chart_name, *args)
+        rect = rect.united(self.getChartRect(super().getChart(chart_name)))
+        if not rect.isEmpty():
+            self.update(rect)
 
     def _addPointToChart(self, chart_name: str, value_x: float, value_y: float):
         """ добавление точки на график """
@@ -219,9 +269,9 @@ class GraphManager(SealGraph):
 
     def clearPointsFromCharts(self):
         """ удаление всех точек из графиков напора и мощности """
-        self._clearPointsFromChart('test_lft')
-        self._clearPointsFromChart('test_pwr')
-        self._clearPointsFromChart('test_eff')
+        self._updateChartRegion('test_lft', self._clearPointsFromChart)
+        self._updateChartRegion('test_pwr', self._clearPointsFromChart)
+        self._updateChartRegion('test_eff', self._clearPointsFromChart)
 
     def _clearPointsFromChart(self, chart_name: str):
         """ удаление всех точек из графика """
@@ -231,9 +281,9 @@ class GraphManager(SealGraph):
 
     def removeLastPointsFromCharts(self):
         """ удаление последних точек из графиков напора и мощности """
-        self._removeLastPointFromChart('test_lft')
-        self._removeLastPointFromChart('test_pwr')
-        self._removeLastPointFromChart('test_eff')
+        self._updateChartRegion('test_lft', self._removeLastPointFromChart)
+        self._updateChartRegion('test_pwr', self._removeLastPointFromChart)
+        self._updateChartRegion('test_eff', self._removeLastPointFromChart)
 
     def _removeLastPointFromChart(self, chart_name: str):
         """ удаление последней точки из графика """
@@ -250,54 +300,72 @@ class GraphManager(SealGraph):
         # переключение видимости линий для отбивания точек
         # если выключена видимость всех - показывается линии
         self._markers.setPointLinesVis(not state)
-        self.displayCharts(self._markers)
+        self._markers.update()
+        self.update()
 
     def generateResultText(self):
         """ генерирует миниотчёт об испытании """
-        self._testdata.dlts_.clear()
+        deltas = self.calculateDeltas()
         result_lines = []
-        # if self._testdata.test_['Flows']:
-        self._generateDeltasReport(result_lines)
-        self._generateDeltaEffsReport(result_lines)
-        return '\n'.join(result_lines)
-
-    def _generateDeltasReport(self, lines: list):
-        """ расчитывает отклонения для напора и мощности """
         for name, title in zip(('lft', 'pwr'),('Напор', 'Мощность')):
-            self._calculateDeltasFor(name)
             string = f'\u0394 {title}, %\t'
-            for val in self._testdata.dlts_[name]:
+            for val in deltas[name]:
                 frmt = '{:>10.2f}' if val else '-.--'
                 string += f'\t{frmt}'.format(val)
-            lines.append(string)
+            result_lines.append(string)
+        frmt = '{:>10.2f}' if deltas['eff'] else '-.--'
+        result_lines.append(
+            f'Отклонение КПД от номинального, %\t{frmt}'.format(deltas['eff'])
+        )
+        return '\n'.join(result_lines)
 
-    def _generateDeltaEffsReport(self, lines: list):
-        """ расчитывает отклонения для кпд """
-        result = None
+    def calculateDeltas(self) -> dict:
+        """ расчёт отклонений испытания от эталона в точках Min/Nom/Max
+            и отклонения КПД, результат кэшируется до изменения
+            кривых или пределов и записывается в testdata.dlts_ """
+        key = self._getDeltasKey()
+        if key != self._deltas_key:
+            limits = key[-1]
+            if None in limits:
+                self._deltas = {'lft': [None] * 3, 'pwr': [None] * 3, 'eff': None}
+            else:
+                ranges = np.array(limits, dtype=float)
+                self._deltas = {
+                    'lft': self._calculateDeltasFor('lft', ranges),
+                    'pwr': self._calculateDeltasFor('pwr', ranges),
+                    'eff': self._calculateDeltaEff(ranges[1])
+                }
+            self._deltas_key = key
+        self._testdata.dlts_.clear()
+        self._testdata.dlts_.update(self._deltas)
+        return self._deltas
+
+    def _getDeltasKey(self) -> tuple:
+        """ ключ кэша отклонений: набор графиков, версии их точек, пределы """
+        charts = [self.getChart(name) for name in
+                  ('lft', 'pwr', 'test_lft', 'test_pwr', 'test_eff')]
+        return (self._charts_generation,
+                tuple(chart.getVersion() if chart else None for chart in charts),
+                tuple(self._testdata.type_[rng] for rng in ('Min', 'Nom', 'Max')))
+
+    def _calculateDeltaEff(self, nom: float):
+        """ расчёт отклонения КПД в номинальной точке от максимального """
         chart = self._getChart('test_eff')
-        spline = chart.getSpline()
+        spline = chart.getSpline() if chart else None
         if spline:
-            curve = chart.regenerateCurve()
-            nom = self._testdata.type_['Nom']
-            eff_nom = float(spline(nom))
-            eff_max = float(max(curve['y']))
-            result = abs(eff_max - eff_nom)
-        frmt = '{:>10.2f}' if result else '-.--'
-        string = f'Отклонение КПД от номинального, %\t{frmt}'.format(result)
-        lines.append(string)
-        self._testdata.dlts_['eff'] = result
-
-    def _calculateDeltasFor(self, chart_name: str):
-        """ расчитывает отклонения для указанной характеристики """
-        names = (f'test_{chart_name}', f'{chart_name}')
-        ranges = ('Min', 'Nom', 'Max')
-        get_val = lambda spl, rng: float(spl(self._testdata.type_[rng]))
-        get_dlt = lambda tst, etl: round((tst / etl * 100 - 100), 2)
-        vals, result = [], [None] * 3
-        for name in names:
-            spln = self._getChart(f'{name}').getSpline()
+            _, eff_max = chart.getMaximum()
+            return abs(eff_max - float(spline(nom)))
+        return None
+
+    def _calculateDeltasFor(self, chart_name: str, ranges: np.ndarray):
+        """ расчитывает отклонения для указанной характеристики,
+            сплайны вычисляются сразу во всех точках диапазона """
+        vals = []
+        for name in (f'test_{chart_name}', f'{chart_name}'):
+            chart = self._getChart(name)
+            spln = chart.getSpline() if chart else None
             if spln:
-                vals.append([get_val(spln, rng) for rng in ranges])
+                vals.append(spln(ranges))
         if len(vals) > 1:
-            result = [get_dlt(x, y) for x, y in zip(vals[0], vals[1])]
-        self._testdata.dlts_[name] = result
+            return np.round(vals[0] / vals[1] * 100 - 100, 2).tolist()
+        return [None] * 3
@@ -3,8 +3,7 @@
 """
 from operator import itemgetter
 from PyQt5 import QtGui
-from PyQt5.QtCore import Qt, QEvent, QPoint, QPointF, pyqtSignal
-from PyQt5.QtGui import QPixmap
+from PyQt5.QtCore import Qt, QEvent, QPoint, QPointF, QRect, pyqtSignal
 from PyQt5.QtWidgets import QFrame
 from Classes.Graph.seal_graph import SealGraph
 from AesmaLib.GraphWidget.chart import Chart
@@ -102,7 +101,7 @@ class Markers(QFrame):
         """ добавление узла """
         if name in self._markers:
             self._markers[name]['knots'].append(self._markers[name]['pos'])
-            self._area.repaint()
+            self._area.update(self._getMarkerRect(self._markers[name]['pos']))
 
     def removeKnots(self):
         """ удаление узлов """
@@ -112,8 +111,8 @@ class Markers(QFrame):
     def removeKnot(self, name: str):
         """ удаление узла по имени """
         if name in self._markers and len(self._markers[name]['knots']) > 0:
-            self._markers[name]['knots'].pop()
-            self._area.repaint()
+            point = self._markers[name]['knots'].pop()
+            self._area.update(self._getMarkerRect(point))
 
     def clearAllKnots(self):
         """ очистка узлов """
@@ -128,17 +127,15 @@ class Markers(QFrame):
     def moveMarker(self, point, name: str):
         """ перемещение маркера  по имени """
         pos = self.translatePointToPosition(point, name)
+        self._area.update(self._getMarkerRect(self._markers[name]['pos']))
         self._markers[name]['pos'] = pos
         # self.eventMove.emit({name: self.translatePositionToPoint(name)})
-        self._area.repaint()
-
-    def createBackground(self):
-        """ создание подложки """
-        pixmap = QPixmap(self._graph.size())
-        self._graph.render(pixmap)
-        pixmap.save('render.png')
-        self.setStyleSheet("QFrame {background-image: url('render.png');}")
-        self._graph.setVisible(False)
+        self._area.update(self._getMarkerRect(pos))
+
+    @staticmethod
+    def _getMarkerRect(pos: QPointF):
+        """ область маркера (узла) для частичной перерисовки """
+        return QRect(int(pos.x()) - 6, int(pos.y()) - 6, 13, 13)
 
     def _initArea(self):
         self._area.installEventFilter(self)
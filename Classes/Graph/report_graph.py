@@ -0,0 +1,77 @@
+"""
+    Модуль отрисовки графика испытания для протокола.
+    ReportGraph - рисует график по копии данных TestData во внеэкранном
+    менеджере графиков (не затрагивая график главного окна) и кэширует
+    рисунки по хэшу испытания (номер и RawData), типоразмера, пределов
+    и палитры
+"""
+import copy
+import hashlib
+from collections import OrderedDict
+from PyQt5.QtCore import QSize
+from PyQt5.QtGui import QImage
+from Classes.Graph.graph_manager import GraphManager
+from AesmaLib.journal import Journal
+
+
+_LOG = Journal.getLogger(__name__)
+
+
+class ReportGraph:
+    """ Класс внеэкранной отрисовки графика для протокола """
+    SIZE = QSize(794, 450)
+    PALETTE = 'report'
+    CACHE_SIZE = 32             # кол-во рисунков в кэше
+    _cache = OrderedDict()      # {хэш: (рисунок, отклонения)} общий для всех
+
+    def __init__(self, testdata):
+        self._graph_manager = GraphManager(testdata)
+        self._graph_manager.switchPalette(self.PALETTE)
+
+    def render(self, testdata, deltas=False) -> QImage:
+        """ рисунок графика испытания, при deltas=True
+            в testdata.dlts_ записываются рассчитанные отклонения """
+        key = self.getKey(testdata)
+        if key in ReportGraph._cache:
+            ReportGraph._cache.move_to_end(key)
+            _LOG.debug("график %s из кэша", key[:8])
+        else:
+            ReportGraph._cache[key] = self._render(testdata)
+            if len(ReportGraph._cache) > self.CACHE_SIZE:
+                ReportGraph._cache.popitem(last=False)
+        image, result = ReportGraph._cache[key]
+        if deltas:
+            testdata.dlts_ = dict(result)
+        return image
+
+    @staticmethod
+    def clearCache():
+        """ очистка кэша рисунков """
+        ReportGraph._cache.clear()
+
+    def getKey(self, testdata) -> str:
+        """ хэш номера и точек (RawData) испытания, точек эталона,
+            пределов типоразмера и палитры """
+        raw_data = bytes(testdata.test_['RawData'] or b'')
+        items = [self.PALETTE, self.SIZE.width(), self.SIZE.height(),
+                 testdata.test_['ID'], hashlib.sha1(raw_data).hexdigest(),
+                 testdata.type_['ID']]
+        items += [testdata.type_[name] for name in ('Min', 'Nom', 'Max')]
+        type_ = testdata.type_
+        items.append(type_.num_points)
+        for values in (type_.values_flw, type_.values_lft, type_.values_pwr):
+            items.append(None if values is None else list(map(float, values)))
+        return hashlib.sha1(repr(items).encode('utf-8')).hexdigest()
+
+    def _render(self, testdata) -> tuple:
+        """ отрисовка графика и расчёт отклонений по копии testdata
+            -> возвращает (рисунок, отклонения) """
+        _LOG.debug("отрисовка графика испытания %s", testdata.test_['ID'])
+        snapshot = copy.copy(testdata)
+        snapshot.dlts_ = {}
+        self._graph_manager.setTestdata(snapshot)
+        self._graph_manager.loadCharts()
+        self._graph_manager.generateResultText()
+        result = dict(snapshot.dlts_)
+        image = self._graph_manager.renderToImage(self.SIZE).toImage()
+        return image, result
@@ -4,12 +4,12 @@
 """
 from PyQt5.QtGui import QPainter, QPen, QColor, QBrush, QFont, QFontMetricsF
 from PyQt5.QtGui import QTransform, QPixmap, QPolygonF, QPainterPath
-from PyQt5.QtCore import QPointF, Qt, QSize
+from PyQt5.QtCore import QPointF, QLineF, Qt, QSize, QRect, QRectF
 from AesmaLib.GraphWidget.graph import Graph, Chart, Axis
 from AesmaLib.journal import Journal
 
 
-IS_LOGGED = True
+_LOG = Journal.getLogger(__name__)
 LIMIT_PEN = QPen(QColor(200, 200, 0, 40), 1, Qt.SolidLine)
 
 class SealGraph(Graph):
@@ -21,6 +21,9 @@ class SealGraph(Graph):
         self._range_pixels = [0, 0, 0]
         self._grid_divs: dict = {}
         self._charts_data = {}
+        # кэш статичных слоёв (сетка, диапазоны, подписи, эталонные кривые)
+        self._static_layers: dict = {}
+        self._palette_name = ''
         # цветовые палитры для приложения или протокола
         self._grid_ranges = QBrush(QColor(70, 70, 70))
         self._palettes = {
@@ -50,12 +53,16 @@ class SealGraph(Graph):
     def switchPalette(self, name='application'):
         """ переключение цветовой палитры """
         self._style = self._palettes[name]
+        self._palette_name = name
+        self.update()
 
     def renderToImage(self, size: QSize, path_to_file=None):
         """ отрисовка содержимого компонента в рисунок и в файл """
+        geometry = self.geometry()
         self.setGeometry(0, 0, size.width(), size.height())
         pixmap = QPixmap(self.size())
         self.render(pixmap)
+        self.setGeometry(geometry)
         if path_to_file:
             pixmap.save(path_to_file)
         return pixmap
@@ -87,17 +94,113 @@ class SealGraph(Graph):
         self._charts_data.clear()
         # self.set_margins([10, 10, 10, 10])
 
+    def invalidateStaticLayer(self):
+        """ сброс кэша статичных слоёв (при изменении кривых вне графика) """
+        self._static_layers.clear()
+
+    def getChartRect(self, chart: Chart) -> QRect:
+        """ получение области кривой (узлы и кривая) в координатах компонента """
+        result = QRectF()
+        draw_area = self.getDrawArea()
+        sz_cnv = [draw_area.width(), draw_area.height()]
+        if chart is not None and chart.getAxes():
+            for for_curve in (False, True):
+                points = chart.getTranslatedPoints(sz_cnv, for_curve)
+                if points.size:
+                    result = result.united(QRectF(
+                        QPointF(points['x'].min(), points['y'].min()),
+                        QPointF(points['x'].max(), points['y'].max())
+                    ))
+        if result.isNull():
+            return QRect()
+        transform = QTransform()
+        self._setCanvasTransform(None, transform)
+        # запас на толщину пера и радиус узлов
+        result = transform.mapRect(result).adjusted(-4, -4, 4, 4)
+        return result.toAlignedRect()
+
+    def paintEvent(self, event):
+        """ событие перерисовки компонента:
+            статичный слой берётся из кэша, поверх рисуются кривые испытания """
+        rect = event.rect()
+        painter = QPainter()
+        painter.begin(self)
+        painter.setRenderHints(QPainter.Antialiasing, True)
+        if len(self._charts):
+            painter.drawPixmap(rect, self._getStaticLayer(), rect)
+        self._drawCharts(painter, self._getCharts(is_dynamic=True))
+        self._drawBorder(painter)
+        painter.end()
+
+    def _getStaticLayer(self):
+        """ получение статичного слоя из кэша или его отрисовка """
+        key = self._getStaticLayerKey()
+        if key not in self._static_layers:
+            _LOG.debug("отрисовка статичного слоя ->")
+            if len(self._static_layers) >= len(self._palettes):
+                self._static_layers.clear()
+            self._static_layers[key] = self._createStaticLayer()
+        return self._static_layers[key]
+
+    def _createStaticLayer(self):
+        """ отрисовка статичного слоя: сетка, диапазоны, подписи,
+            эталонные кривые и пределы допуска """
+        pixmap = QPixmap(self.size())
+        pixmap.fill(Qt.transparent)
+        painter = QPainter()
+        painter.begin(pixmap)
+        painter.setRenderHints(QPainter.Antialiasing, True)
+        self._drawGrid(painter)
+        self._drawCharts(painter, self._getCharts(is_dynamic=False))
+        painter.end()
+        return pixmap
+
+    def _getStaticLayerKey(self):
+        """ ключ кэша статичного слоя: размер, палитра, рабочий диапазон,
+            оси, точки и оформление эталонных кривых, а также оси
+            и цвета кривых, задающих сетку (без эталона - кривых испытания) """
+        charts = tuple(
+            (name, chart.getVersion(), chart.visibility,
+             *self._getChartStyleKey(chart))
+            for name, chart in self._charts.items()
+            if not self._isDynamicChart(chart)
+        )
+        axis_charts = tuple(
+            self._getChartStyleKey(chart) if chart else None
+            for chart in map(self._getAxisChart, ('lft', 'pwr', 'eff'))
+        )
+        return (self.width(), self.height(), self._palette_name,
+                tuple(self._limits_value), charts, axis_charts)
+
+    @staticmethod
+    def _getChartStyleKey(chart: Chart) -> tuple:
+        """ оформление и оси кривой для ключа кэша статичного слоя """
+        return (chart.getPen().color().rgba(), int(chart.getPen().style()),
+                tuple((axis_name, axis.getMinimum(), axis.getMaximum(),
+                       axis.getDivs())
+                      for axis_name, axis in chart.getAxes().items()))
+
+    def _getCharts(self, is_dynamic: bool):
+        """ получение списка динамичных (испытание) или статичных кривых """
+        return [chart for chart in self._charts.values()
+                if self._isDynamicChart(chart) == is_dynamic]
+
+    @staticmethod
+    def _isDynamicChart(chart: Chart):
+        """ является ли кривая динамичной (кривая испытания) """
+        return chart.name.startswith('test_')
+
     def _drawGrid(self, painter: QPainter):
         """ отрисовка сетки графика """
         if len(self._charts):
-            if IS_LOGGED:
-                Journal.log(__name__, "\tотрисовка сетки ->")
+            _LOG.debug("отрисовка сетки ->")
             self._calculateMargins()
             step_x, step_y = super()._getSteps()
             pen = painter.pen()
             painter.setPen(self._style['grid']['pen'])
             self._drawGridBackground(painter)
-            self._drawGridRanges(painter)
+            if any(self._limits_value):
+                self._drawGridRanges(painter)
             self._drawGridLines(painter, 'x0', step_x)
             self._drawGridLines(painter, 'y0', step_y)
             self._drawGridDivs_x(painter, step_x)
@@ -109,8 +212,7 @@ class SealGraph(Graph):
 
     def _drawGridRanges(self, painter: QPainter):
         """ отрисовка области рабочего диапазона """
-        if IS_LOGGED:
-            Journal.log(__name__, "\tотрисовка области раб.диапазона")
+        _LOG.debug("отрисовка области раб.диапазона")
         self._calculateLimits()
         # расчёт раб.диапазона
         x_0 = self._margins[0] + self._range_pixels[0]
@@ -122,19 +224,18 @@ class SealGraph(Graph):
         pen = painter.pen()
         painter.setPen(self._style['grid']['border'])
         painter.fillRect(
-            x_0, y_0, x_2 - x_0, y_1 - y_0,
+            QRectF(x_0, y_0, x_2 - x_0, y_1 - y_0),
             self._grid_ranges
         )
-        painter.drawLine(x_0, y_0, x_0, y_1)
-        painter.drawLine(x_1, y_0, x_1, y_1)
-        painter.drawLine(x_2, y_0, x_2, y_1)
+        painter.drawLine(QLineF(x_0, y_0, x_0, y_1))
+        painter.drawLine(QLineF(x_1, y_0, x_1, y_1))
+        painter.drawLine(QLineF(x_2, y_0, x_2, y_1))
         painter.setPen(pen)
 
     def _drawGridLines(self, painter: QPainter, name, step):
         """ отрисовка линий сетки для оси """
         if self._grid_divs[name].is_ready:
-            if IS_LOGGED:
-                Journal.log(__name__, f"\tотрисовка линий сетки оси {name}")
+            _LOG.debug("отрисовка линий сетки оси %s", name)
             divs = self._grid_divs[name].divs
             for i in range(1, len(divs)):
                 self._style['grid']['pen'].setStyle(Qt.SolidLine if divs[i] == 0
@@ -150,14 +251,12 @@ class SealGraph(Graph):
                 painter.setPen(self._style['grid']['pen'])
                 painter.drawLine(p_0, p_1)
         else:
-            if IS_LOGGED:
-                Journal.log(__name__, f"\tError -> деления оси {name} не готовы")
+            _LOG.error("деления оси %s не готовы", name)
 
     def _drawGridDivs_x(self, painter: QPainter, step: float):
         """ отрисовка значений делений на оси X """
         if self._grid_divs['x0'].is_ready:
-            if IS_LOGGED:
-                Journal.log(__name__, "\tотрисовка делений оси X")
+            _LOG.debug("отрисовка делений оси X")
             f_m = QFontMetricsF(self._style['grid']['font'])
             divs = self._grid_divs['x0'].divs
             pen = painter.pen()
@@ -173,8 +272,7 @@ class SealGraph(Graph):
 
     def _drawGridDivs_y(self, painter: QPainter, step: float, axis_name='y0'):
         """ отрисовка значений делений на оси Y """
-        if IS_LOGGED:
-            Journal.log(__name__, "\tотрисовка делений оси", axis_name)
+        _LOG.debug("отрисовка делений оси %s", axis_name)
         f_m = QFontMetricsF(self._style['grid']['font'])
         divs = self._grid_divs[axis_name].divs
         pen = painter.pen()
@@ -186,11 +284,11 @@ class SealGraph(Graph):
                 offset_x = self._margins[0] - f_m.width(text) - 10
             elif axis_name == 'y1':
                 offset_x = self._margins[0] + self.getDrawArea().width() + 10
-                painter.setPen(self._charts['pwr'].getPen())
+                painter.setPen(self._getAxisChart('pwr').getPen())
             elif axis_name == 'y2':
                 offset_x = self._margins[0] + self.getDrawArea().width() + \
                            self._grid_divs['y1'].width + 40
-                painter.setPen(self._charts['eff'].getPen())
+                painter.setPen(self._getAxisChart('eff').getPen())
             offset_y = self.height() - self._margins[3] + f_m.height() / 4.0
             painter.drawText(QPointF(offset_x, offset_y - i * step), text)
         painter.setPen(pen)
@@ -214,13 +312,13 @@ class SealGraph(Graph):
 
         text = 'Мощность, кВт'
         offset_x = self._margins[0] + self.getDrawArea().width() + 10
-        painter.setPen(self._charts['pwr'].getPen())
+        painter.setPen(self._getAxisChart('pwr').getPen())
         self._drawLabel(painter, f_m, offset_x, text)
 
         text = 'КПД, %'
         offset_x = self._margins[0] + self.getDrawArea().width() + \
                    self._grid_divs['y1'].width + 40
-        painter.setPen(self._charts['eff'].getPen())
+        painter.setPen(self._getAxisChart('eff').getPen())
         self._drawLabel(painter, f_m, offset_x, text)
         painter.setPen(pen)
 
@@ -232,42 +330,40 @@ class SealGraph(Graph):
         painter.drawText(QPointF(offset_y, offset_x + 45), text)
         painter.rotate(90)
 
-    def _drawCharts(self, painter: QPainter):
-        """ отрисовка всех графиков """
-        if IS_LOGGED:
-            Journal.log(__name__, "\tотрисовка графиков ->")
+    def _drawCharts(self, painter: QPainter, charts: list = None):
+        """ отрисовка графиков (по умолчанию всех) """
+        _LOG.debug("отрисовка графиков ->")
+        if charts is None:
+            charts = list(self._charts.values())
         transform: QTransform = QTransform()
-        self._prepareChartsData()
+        self._prepareChartsData(charts)
         self._setCanvasTransform(painter, transform)
-        self._drawChartsLimits(painter)
-        self._drawChartsKnotsAndCurves(painter)
+        self._drawChartsLimits(painter, charts)
+        self._drawChartsKnotsAndCurves(painter, charts)
         self._resetTransform(transform)
 
-    def _drawChartsLimits(self, painter: QPainter):
-        """ отрисовка пределов допуска для всех кривых """
-        for chart, data in self._charts_data.items():
+    def _drawChartsLimits(self, painter: QPainter, charts: list):
+        """ отрисовка пределов допуска для кривых """
+        for chart in charts:
+            data = self._charts_data[chart]
             if data['limits'].size:
                 self._drawLimitPolygon(painter, chart, data['limits'])
 
-    def _drawChartsKnotsAndCurves(self, painter: QPainter):
+    def _drawChartsKnotsAndCurves(self, painter: QPainter, charts: list):
         """ отрисовка узлов и кривых """
-        if IS_LOGGED:
-            Journal.log(__name__, "\tотрисовка узлов и кривых ->")
-        for chart, data in self._charts_data.items():
+        _LOG.debug("отрисовка узлов и кривых ->")
+        for chart in charts:
+            data = self._charts_data[chart]
             if data['knots'].size and chart.visibility:
                 pen = painter.pen()
                 brush = painter.brush()
                 painter.setPen(chart.getPen())
                 painter.setBrush(chart.getPen().color())
                 if "knots" in chart.getOptions():
-                    if IS_LOGGED:
-                        Journal.log(__name__, "\t-> отрисовка узлов для",
-                                    chart.name)
+                    _LOG.debug("-> отрисовка узлов для %s", chart.name)
                     SealGraph._drawKnots(painter, data['knots'])
                 painter.setBrush(brush)
-                if IS_LOGGED:
-                    Journal.log(__name__, "\t-> отрисовка кривой для",
-                                chart.name)
+                _LOG.debug("-> отрисовка кривой для %s", chart.name)
                 SealGraph._drawCurve(painter, data['curve'])
                 painter.setPen(pen)
 
@@ -291,9 +387,7 @@ class SealGraph(Graph):
     @staticmethod
     def _drawLimitPolygon(painter: QPainter, chart, points):
         """ отрисовка полигона для области допуска """
-        if IS_LOGGED:
-            Journal.log(__name__, "\tотрисовка пределов допуска для",
-                        chart.name)
+        _LOG.debug("отрисовка пределов допуска для %s", chart.name)
         if points.size:
             old_pen = painter.pen()
             old_brush = painter.brush()
@@ -308,12 +402,12 @@ class SealGraph(Graph):
 
     def _calculateMargins(self):
         """ расчёт отступов """
-        keys = self._charts.keys()
-        if 'lft' in keys and 'pwr' in keys and 'eff' in keys:
-            self._prepareDivs('x0', self._charts['lft'].getAxis('x'))
-            self._prepareDivs('y0', self._charts['lft'].getAxis('y'))
-            self._prepareDivs('y1', self._charts['pwr'].getAxis('y'))
-            self._prepareDivs('y2', self._charts['eff'].getAxis('y'))
+        charts = [self._getAxisChart(name) for name in ('lft', 'pwr', 'eff')]
+        if None not in charts:
+            self._prepareDivs('x0', charts[0].getAxis('x'))
+            self._prepareDivs('y0', charts[0].getAxis('y'))
+            self._prepareDivs('y1', charts[1].getAxis('y'))
+            self._prepareDivs('y2', charts[2].getAxis('y'))
 
             self._margins[0] = self._grid_divs['y0'].width + 50
             self._margins[1] = 20
@@ -321,6 +415,11 @@ class SealGraph(Graph):
                                self._grid_divs['y2'].width + 40
             self._margins[3] = self._grid_divs['x0'].height + 30
 
+    def _getAxisChart(self, name: str):
+        """ кривая, задающая ось величины: эталонная или,
+            если эталона нет, кривая испытания """
+        return self._charts.get(name, self._charts.get(f'test_{name}'))
+
     def _calculateLimits(self):
         """ расчёт рабочего диапазона """
         chart: Chart = self._charts[self._base_chart]
@@ -329,7 +428,7 @@ class SealGraph(Graph):
                 'x', self._limits_value[i], self.getDrawArea().width())
 
     def _setCanvasTransform(self, painter: QPainter, transform: QTransform):
-        """ трансформация холста """
+        """ трансформация холста (painter=None - только расчёт transform) """
         self._resetTransform(transform)
         super()._setTransform(painter, transform)
 
@@ -340,17 +439,15 @@ class SealGraph(Graph):
                             0, 1, 0,
                             0, 0, 1)
 
-    def _prepareChartsData(self):
+    def _prepareChartsData(self, charts: list):
         """ подготовка данных для формирования графика """
-        if IS_LOGGED:
-            Journal.log(__name__, "\tподготовка данных для кривых ->")
-        for chart in self._charts.values():
+        _LOG.debug("подготовка данных для кривых ->")
+        for chart in charts:
             self._prepareChartData(chart)
 
     def _prepareChartData(self, chart: Chart):
         """ подготовка данных для построения кривой """
-        if IS_LOGGED:
-            Journal.log(__name__, "\t-> подготовка данных для кривой", chart.name)
+        _LOG.debug("-> подготовка данных для кривой %s", chart.name)
         draw_area = self.getDrawArea()
         knots = self._getChartKnots(chart, draw_area)
         curve = self._getChartCurve(chart, draw_area)
@@ -361,9 +458,7 @@ class SealGraph(Graph):
     @staticmethod
     def _getChartKnots(chart: Chart, draw_area):
         """ получение координат узлов кривой """
-        if IS_LOGGED:
-            Journal.log(__name__, "\t-> получение узлов для",
-                        chart.name)
+        _LOG.debug("-> получение узлов для %s", chart.name)
         result = chart.createEmptyPoints()
         if len(chart.getPoints('x')) > 1:
             sz_cnv = [draw_area.width(), draw_area.height()]
@@ -373,8 +468,7 @@ class SealGraph(Graph):
     @staticmethod
     def _getChartCurve(chart: Chart, draw_area):
         """ получение координат точек кривой """
-        if IS_LOGGED:
-            Journal.log(__name__, "\t-> получение кривой для", chart.name)
+        _LOG.debug("-> получение кривой для %s", chart.name)
         result = chart.createEmptyPoints()
         if len(chart.getPoints('x')) > 1:
             sz_cnv = [draw_area.width(), draw_area.height()]
@@ -385,9 +479,7 @@ class SealGraph(Graph):
         """ получение координат точек описывающих пределы допуска """
         result = chart.createEmptyPoints()
         if 'limit' in chart.getOptions() and curve['x'].any():
-            if IS_LOGGED:
-                Journal.log(__name__, "\t-> получение пределов допуска для",
-                            chart.name)
+            _LOG.debug("-> получение пределов допуска для %s", chart.name)
             ranges = self._range_pixels
             coeffs = chart.getCoefs()
             result = self._sliceCurveToRange(curve, ranges)
@@ -433,8 +525,7 @@ class Divisions:
 
     def prepare(self, axis: Axis):
         """ подготовка делений для оси """
-        if IS_LOGGED:
-            Journal.log(__name__, "\tподготовка делений для", self.name)
+        _LOG.debug("подготовка делений для %s", self.name)
         f_m = QFontMetricsF(self.font)
         self.divs.clear()
         for _, div in axis.generateDivSteps():
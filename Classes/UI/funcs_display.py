@@ -4,10 +4,12 @@
 from PyQt5.QtWidgets import QLineEdit
 from AesmaLib.journal import Journal
 from Classes.UI import funcs_table, funcs_group, funcs_test
+from Classes.Data.steady_state import SteadyPoint
 
 
-def displaySensors(window, sensors: dict):
-    """ отображает показания датчиков """
+def displaySensors(window, sensors: dict, changed: dict = None):
+    """ отображает показания датчиков (только изменившиеся,
+        если указаны), поля обновляются только при смене текста """
     # датчики
     pairs = {
         "txtRPM": "rpm", "txtTorque": "torque",
@@ -15,14 +17,35 @@ def displaySensors(window, sensors: dict):
         "txtFlow0": "flw0", "txtFlow1": "flw1", "txtFlow2": "flw2"
     }
     for name, key in pairs.items():
+        if changed is not None and key not in changed:
+            continue
         item = window.findChild(QLineEdit, name)
         if item:
-            item.setText(str(round(sensors[key], 2)))
+            _setText(item, str(round(sensors[key], 2)))
     # расчётные значения
     flw, lft, pwr = funcs_test.getCalculatedVals(sensors)
-    window.txtFlow.setText(str(round(flw, 2)))
-    window.txtLift.setText(str(round(lft, 2)))
-    window.txtPower.setText(str(round(pwr, 4)))
+    _setText(window.txtFlow, str(round(flw, 2)))
+    _setText(window.txtLift, str(round(lft, 2)))
+    _setText(window.txtPower, str(round(pwr, 4)))
+
+
+def _setText(item: QLineEdit, text: str):
+    """ установка текста поля, если он изменился """
+    if item.text() != text:
+        item.setText(text)
+
+
+def displaySteadyState(window, state: bool, point: SteadyPoint = None):
+    """ индикация установившегося режима на кнопке добавления точки """
+    window.btnAddPoint.setStyleSheet(
+        "QPushButton { color: lime; }" if state else ""
+    )
+    if state and point:
+        window.btnAddPoint.setToolTip("\n".join(
+            f"{name}: {point.mean[name]:.2f} ± {point.std[name]:.3f}" for name in point.mean
+        ))
+    else:
+        window.btnAddPoint.setToolTip("")
 
 
 @Journal.logged
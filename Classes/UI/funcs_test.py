@@ -2,9 +2,12 @@
     Модуль содержит функции для процесса испытания
 """
 from PyQt5.QtWidgets import QSlider
-from Classes.UI import funcs_table, funcs_aux
+from Classes.UI import funcs_table
 from Classes.UI.funcs_aux import parseFloat
+from Classes.Data import pump_physics
+from Classes.Data.steady_state import SteadyPoint
 from Classes.Adam.adam_manager import AdamManager
+from Classes.Adam.adam_rate import Profile
 from Classes.Adam.adam_config import params
 
 
@@ -36,6 +39,7 @@ def switchControlsAccessible(wnd, state: bool):
     wnd.btnAddPoint.setEnabled(state)
     wnd.btnRemovePoint.setEnabled(state)
     wnd.btnClearCurve.setEnabled(state)
+    wnd.btnSequence.setEnabled(state)
     wnd.btnSaveCharts.setEnabled(not state)
     wnd.spinPointLines.setEnabled(not state)
     wnd.spinPointLines.setMaximum(
@@ -54,6 +58,38 @@ def switchRunningState(wnd, state: bool):
     wnd.btnSaveCharts.setEnabled(not state)
     wnd.btnGoBack.setEnabled(not state)
     wnd.adam_manager.setValue(params["engine_"], state)
+    updatePollingProfile(wnd)
+
+
+def switchSequenceState(wnd, state: bool):
+    """ переключение состояния автоматического снятия точек:
+        ручное управление клапаном и добавление точек недоступны """
+    wnd.btnSequence.setText("Прервать" if state else "Автоснятие")
+    wnd.btnAddPoint.setEnabled(not state)
+    wnd.btnRemovePoint.setEnabled(not state)
+    wnd.btnClearCurve.setEnabled(not state)
+    wnd.chkAutoPoint.setEnabled(not state)
+    wnd.sliderFlow.setEnabled(not state)
+
+
+def setSliderValue(slider: QSlider, value: int):
+    """ установка положения слайдера без сигналов
+        (значение уже отправлено в контроллер) """
+    slider.blockSignals(True)
+    slider.setValue(value)
+    slider.blockSignals(False)
+
+
+def updatePollingProfile(wnd):
+    """ переключение режима опроса контроллера по состоянию испытания:
+        испытание, страница испытания или простой """
+    if states["is_running"]:
+        profile = Profile.TEST
+    elif wnd.stackedWidget.currentIndex() == 1:
+        profile = Profile.MONITORING
+    else:
+        profile = Profile.IDLE
+    wnd.adam_manager.setProfile(profile)
 
 
 def switchActiveFlowmeter(adam_manager, radio, state):
@@ -78,17 +114,24 @@ def getCurrentVals(wnd):
     flw = parseFloat(wnd.txtFlow.text())
     lft = parseFloat(wnd.txtLift.text())
     pwr = parseFloat(wnd.txtPower.text())
-    eff = calculateEff(flw, lft, pwr)
+    eff = pump_physics.calculateEff(flw, lft, pwr)
+    return [flw, lft, pwr, eff]
+
+
+def getPointVals(point: SteadyPoint):
+    """ получение значений усреднённой точки (расход, напор, мощность, КПД) """
+    flw, lft, pwr = (point.mean[name] for name in ('flw', 'lft', 'pwr'))
+    eff = pump_physics.calculateEff(flw, lft, pwr)
     return [flw, lft, pwr, eff]
 
 
 def getCalculatedVals(sensors: dict):
     """ получение расчётных значений  """
-    flw = sensors[states["active_flowmeter"].rstrip("_")]
-    lft = funcs_aux.calculateLift(sensors)
-    pwr = funcs_aux.calculatePower(sensors)
-    rpm = sensors.get('rpm', 0)
-    flw, lft, pwr = funcs_aux.applySpeedFactor(flw, lft, pwr, rpm)
+    flw, lft, pwr, _ = pump_physics.calculatePoints(
+        sensors[states["active_flowmeter"].rstrip("_")],
+        sensors.get('psi_in', 0), sensors.get('psi_out', 0),
+        sensors.get('torque', 0), sensors.get('rpm', 0)
+    )
     return flw, lft, pwr
 
 
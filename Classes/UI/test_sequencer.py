@@ -0,0 +1,142 @@
+"""
+    Модуль автоматического снятия точек испытания.
+    Первая точка снимается при полностью открытом клапане (valve_)
+    и задаёт максимальный расход, остальные - на линиях точек,
+    равномерно делящих расход до нуля (как линии отбивания точек
+    на графике). Для каждой линии клапан устанавливается по расходу
+    и, если после установления режима расход не попал в допуск,
+    корректируется (метод секущих). Усреднённая точка установившегося
+    режима публикуется, затем выполняется переход к следующей линии.
+    Снятие прерывается оператором, при остановке двигателя, потере связи
+    или если режим не установился за отведённое время
+"""
+from PyQt5.QtCore import pyqtSignal, QObject, QTimer
+from AesmaLib.journal import Journal
+from Classes.Adam.adam_config import params
+from Classes.Data.steady_state import SteadyDetector, SteadyPoint
+
+
+_LOG = Journal.getLogger(__name__)
+
+
+class TestSequencer(QObject):
+    """ Класс последовательного снятия точек по линиям расхода """
+    _step = pyqtSignal(int, int, name="stepStarted")            # линия, всего
+    _point = pyqtSignal(int, object, name="pointCaptured")      # линия, SteadyPoint
+    _finished = pyqtSignal(bool, str, name="finished")          # успех, причина
+    _valve_moved = pyqtSignal(int, name="valveMoved")                 # положение клапана
+    VALVE = params["valve_"]
+    SETTLE_TIMEOUT = 30.0   # ожидание установившегося режима, сек
+    FLOW_TOLERANCE = 0.02   # допуск попадания на линию, доля макс.расхода
+    CORRECTIONS = 3         # макс.кол-во корректировок клапана на линию
+
+    def __init__(self, adam_manager, detector: SteadyDetector, parent=None):
+        super().__init__(parent=parent)
+        self._adam = adam_manager
+        self._detector = detector
+        self._count = 0
+        self._index = -1        # текущая линия (-1 - снятие не идёт)
+        self._flw_max = 0.0
+        self._valve = 0
+        self._corrections = 0
+        self._history = []      # последние (положение клапана, расход)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(int(self.SETTLE_TIMEOUT * 1000))
+        self._timer.timeout.connect(self._onTimeout)
+
+    def isRunning(self) -> bool:
+        """ идёт ли снятие точек """
+        return self._index >= 0
+
+    def start(self, count: int) -> bool:
+        """ запуск снятия count точек (двигатель должен быть запущен) """
+        if self.isRunning() or count <= 0:
+            return False
+        self._count = count
+        self._index = 0
+        self._flw_max = 0.0
+        self._history.clear()
+        _LOG.info("автоматическое снятие %d точек", count)
+        return self._moveValve(self.VALVE.dig_max)
+
+    def cancel(self, reason: str = "прервано оператором"):
+        """ прерывание снятия точек (клапан остаётся в текущем положении) """
+        if self.isRunning():
+            self._stop(False, reason)
+
+    def getValve(self) -> int:
+        """ последнее установленное положение клапана """
+        return self._valve
+
+    def getTargetFlow(self, index: int) -> float:
+        """ расход на линии точки index (0 - максимальный) """
+        if self._count < 2:
+            return self._flw_max
+        return self._flw_max * (self._count - 1 - index) / (self._count - 1)
+
+    def onSteady(self, point: SteadyPoint):
+        """ режим установился: корректировка клапана или снятие точки """
+        if not self.isRunning():
+            return
+        self._timer.stop()
+        flw = point.mean['flw']
+        self._history = [*self._history[-1:], (self._valve, flw)]
+        if self._index == 0:
+            self._flw_max = flw
+        target = self.getTargetFlow(self._index)
+        miss = abs(flw - target) > self.FLOW_TOLERANCE * self._flw_max
+        if miss and self._corrections < self.CORRECTIONS:
+            self._corrections += 1
+            self._moveValve(self._getValve(target), correction=True)
+            return
+        if miss:
+            _LOG.warning("точка %d: расход %.2f вне допуска (линия %.2f)",
+                         self._index + 1, flw, target)
+        self._point.emit(self._index, point)
+        if not self.isRunning():
+            return  # прервано обработчиком точки
+        self._index += 1
+        if self._index >= self._count:
+            self._stop(True, "все точки сняты")
+        else:
+            target = self.getTargetFlow(self._index)
+            self._moveValve(self._getValve(target))
+
+    def _getValve(self, target: float) -> int:
+        """ положение клапана для расхода target: по двум последним
+            измерениям, иначе - пропорционально максимальному расходу """
+        dig_max = self.VALVE.dig_max
+        (valve0, flw0), (valve1, flw1) = [(dig_max, self._flw_max), (0, 0.0)] \
+            if len(self._history) < 2 else self._history
+        if valve1 == valve0 or (flw1 - flw0) / (valve1 - valve0) <= 0:
+            (valve0, flw0), (valve1, flw1) = (dig_max, self._flw_max), (0, 0.0)
+        if not self._flw_max:
+            return 0
+        valve = valve1 + (target - flw1) * (valve1 - valve0) / (flw1 - flw0)
+        return int(round(min(max(valve, 0), dig_max)))
+
+    def _moveValve(self, valve: int, correction=False) -> bool:
+        """ установка клапана и ожидание установившегося режима """
+        if not self._adam.setValue(self.VALVE, valve):
+            self._stop(False, "ошибка установки клапана")
+            return False
+        self._valve = valve
+        self._valve_moved.emit(valve)
+        if not correction:
+            self._corrections = 0
+            self._step.emit(self._index + 1, self._count)
+        self._detector.reset()
+        self._timer.start()
+        return True
+
+    def _onTimeout(self):
+        """ режим не установился за отведённое время """
+        self._stop(False, f"режим не установился за {self.SETTLE_TIMEOUT:.0f} сек")
+
+    def _stop(self, success: bool, reason: str):
+        """ завершение снятия точек """
+        self._timer.stop()
+        self._index = -1
+        _LOG.info("автоматическое снятие точек завершено: %s", reason)
+        self._finished.emit(success, reason)
@@ -1,45 +1,55 @@
 """
     Модуль содержит функции основного окна программы
 """
-from PyQt5 import uic
-from PyQt5.QtCore import Qt, pyqtSlot
+from PyQt5.QtCore import Qt, pyqtSlot, QTimer
 from PyQt5.QtWidgets import QMainWindow, QMenu, QSlider
 from PyQt5.QtGui import QCursor, QCloseEvent
 from Classes.Adam import adam_config as adam
 from Classes.UI import funcs_table, funcs_combo, funcs_group, funcs_info
 from Classes.UI import funcs_aux, funcs_test, funcs_display, funcs_testlist
 from Classes.UI.wnd_type import TypeWindow
-from Classes.Data.report import Report
+from Classes.UI.test_sequencer import TestSequencer
 from Classes.Data.data_manager import DataManager
+from Classes.Data.steady_state import SteadyDetector
 from Classes.Graph.graph_manager import GraphManager
 from Classes.Adam.adam_manager import AdamManager
+from Classes.Adam.adam_worker import AdamWorker
+from Classes.Adam.adam_sensors import Sensors
+from Classes.Adam.adam_timing import formatSummary
 
 from AesmaLib.message import Message
 from AesmaLib.journal import Journal
+from AesmaLib import ui_cache
+from AesmaLib.startup_tracer import StartupTracer
 
 
 class MainWindow(QMainWindow):
     """ Класс описания функционала главного окна приложения """
     def __init__(self, paths, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
-        self._is_ready = self._createGUI(paths['WND'])
+        with StartupTracer.phase('UI load'):
+            self._is_ready = self._createGUI(paths['WND'])
         if self._is_ready:
-            self.adam_manager = AdamManager(
-                adam.IP, adam.PORT, adam.ADDRESS
-            )
+            manager = AdamWorker if adam.WORKER else AdamManager
+            self.adam_manager = manager(adam.IP, adam.PORT, adam.ADDRESS)
+            self._sensors = dict.fromkeys(Sensors.NAMES, 0.0)
+            self._steady = SteadyDetector()
+            self._is_steady = False
+            self._sequencer = TestSequencer(self.adam_manager, self._steady, self)
             # self.adam_manager.callback.append(self._onAdam_dataReceived)
             self._is_displaying = dict.fromkeys(
                 ['Producer','Type','Serial'], False
             )
-            self._data_manager = DataManager(paths['DB'])
-            self._testdata = self._data_manager.getTestdata()
+            with StartupTracer.phase('DB connect'):
+                self._data_manager = DataManager(paths['DB'])
+                self._testdata = self._data_manager.getTestdata()
             self._graph_manager = GraphManager(self._testdata)
             self._type_window = TypeWindow(
                 self, self._data_manager, paths['TYPE']
             )
-            self._report = Report(
-                paths['TEMPLATE'], self._graph_manager, self._testdata
-            )
+            self._report = None
+            self._path_to_template = paths['TEMPLATE']
+            self._path_to_timing = paths.get('TIMING')
 
     @Journal.logged
     def show(self) -> bool:
@@ -49,20 +59,26 @@ class MainWindow(QMainWindow):
             super().show()
             self.move(1, 1)
             funcs_test.switchRunningState(self, False)
+            # подготовка протокола после отображения окна
+            QTimer.singleShot(2000, lambda: self._getReport().warmUp())
             return True
         return False
 
     def closeEvent(self, a0: QCloseEvent) -> None:
         """ погдотовка к закрытию приложения """
         if self._is_ready:
-            self.adam_manager.dataReceived.disconnect()
+            self.adam_manager.dataChanged.disconnect()
+            self.adam_manager.digitalChanged.disconnect()
+            self.adam_manager.linkChanged.disconnect()
+            self.adam_manager.sampleReceived.disconnect()
             self.adam_manager.setPollingState(False)
         return super().closeEvent(a0)
 
     def _createGUI(self, path_to_ui):
-        """ загружает файл графического интерфейса """
+        """ загружает графический интерфейс (из модуля,
+            сгенерированного из файла .ui, или разбором файла) """
         try:
-            return uic.loadUi(path_to_ui, self) is not None
+            return ui_cache.loadUi(path_to_ui, self) is not None
         except IOError as error:
             Journal.log(__name__, "::\t", "ошибка:", str(error))
         return False
@@ -70,13 +86,15 @@ class MainWindow(QMainWindow):
     @Journal.logged
     def _prepare(self):
         """ инициализирует и подготавливает компоненты главного окна """
-        funcs_testlist.init(self)
-        funcs_testlist.refresh(self, self._data_manager)
-        funcs_testlist.filterSwitch(self)
-        funcs_combo.fillCombos(self, self._data_manager)
+        with StartupTracer.phase('test list'):
+            funcs_testlist.init(self)
+            funcs_testlist.refresh(self, self._data_manager)
+            funcs_testlist.filterSwitch(self)
+        with StartupTracer.phase('combos'):
+            funcs_combo.fillCombos(self, self._data_manager)
         self._registerEvents()
         # funcs_test.prepareSlidersRange(self)
-        # funcs_table.initTable_points(self)
+        funcs_table.initTable_points(self)
         # funcs_table.initTable_vibrations(self)
         # self._initMarkers()
         # self._initSlider(self.sliderFlow)
@@ -120,21 +138,46 @@ class MainWindow(QMainWindow):
         self.btnRemovePoint.clicked.connect(self._onClicked_removePoint)
         self.btnClearCurve.clicked.connect(self._onClicked_clearCurve)
         self.btnSaveCharts.clicked.connect(self._onClickedTestResult_save)
+        self.btnSequence.clicked.connect(self._onClicked_sequence)
+        self._sequencer.stepStarted.connect(self._onSequence_step)
+        self._sequencer.pointCaptured.connect(self._onSequence_point)
+        self._sequencer.finished.connect(self._onSequence_finished)
+        self._sequencer.valveMoved.connect(self._onSequence_valve)
         #
         self.chkConnection.clicked.connect(self._onAdam_connection)
+        self.chkConnection.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.chkConnection.customContextMenuRequested.connect(self._onMenuConnection)
         self.radioFlow0.toggled.connect(self._onChanged_flowmeter)
         self.radioFlow1.toggled.connect(self._onChanged_flowmeter)
         self.radioFlow2.toggled.connect(self._onChanged_flowmeter)
         self.spinPointLines.valueChanged.connect(self._onChanged_pointsNum)
+        self.sliderFlow.valueChanged.connect(self._onChanged_valve)
         self.btnEngine.clicked.connect(self._onClicked_engine)
         self.txtFlow.textChanged.connect(self._onChanged_sensors)
         self.txtLift.textChanged.connect(self._onChanged_sensors)
         self.txtPower.textChanged.connect(self._onChanged_sensors)
         self.radioPointsReal.toggled.connect(self._onChanged_pointsMode)
         #
-        self.adam_manager.dataReceived.connect(
-            self._onAdam_dataReceived, no_receiver_check = True
+        self.adam_manager.dataChanged.connect(
+            self._onAdam_dataChanged, no_receiver_check = True
+        )
+        self.adam_manager.digitalChanged.connect(
+            self._onAdam_digitalChanged, no_receiver_check = True
         )
+        self.adam_manager.linkChanged.connect(
+            self._onAdam_linkChanged, no_receiver_check = True
+        )
+        self.adam_manager.sampleReceived.connect(
+            self._onAdam_sampleReceived, no_receiver_check = True
+        )
+
+    def _getReport(self):
+        """ получение протокола, при первом обращении загружается
+            модуль протокола вместе с QtWebEngine """
+        if self._report is None:
+            from Classes.Data.report import Report
+            self._report = Report(self._path_to_template, self._testdata)
+        return self._report
 
     def _initMarkers(self):
         """ инициирует маркеры графика испытания """
@@ -194,7 +237,7 @@ class MainWindow(QMainWindow):
         action = menu.exec_(QCursor.pos())
         # печать протокола
         if action == action_print:
-            self._report.generate()
+            self._getReport().generate()
         # удаление записи
         elif action == action_remove:
             if funcs_aux.askPassword():
@@ -207,6 +250,24 @@ class MainWindow(QMainWindow):
                 self._data_manager.saveTestInfo()
                 Message.show("УСПЕХ", "Запись обновлена")
 
+    def _onMenuConnection(self):
+        """ контекстное меню подключения: статистика опроса """
+        menu = QMenu()
+        action_show = menu.addAction("Статистика опроса")
+        action_save = menu.addAction("Сохранить статистику")
+        action_save.setEnabled(bool(self._path_to_timing))
+        action = menu.exec_(QCursor.pos())
+        # просмотр частоты, отклонений периода и опозданий
+        if action == action_show:
+            Message.show("Статистика опроса", formatSummary(self.adam_manager.getTiming()))
+        # сохранение сводки и отметок времени в файл
+        elif action == action_save:
+            try:
+                self.adam_manager.dumpTiming(self._path_to_timing)
+                Message.show("УСПЕХ", f"Статистика сохранена в {self._path_to_timing}")
+            except OSError as error:
+                Message.show("ОШИБКА", str(error))
+
     def _onChangedCombo_producers(self, index):
         """ выбор производителя """
         item = self.cmbProducer.itemData(index, Qt.UserRole)
@@ -310,6 +371,8 @@ class MainWindow(QMainWindow):
         Journal.log_func(self._onClickedTestResult_save)
         # self._graph_manager.saveTestdata()
         result = self._testdata.test_.write()
+        if result:
+            self._data_manager.onTestChanged(self._testdata.test_['ID'])
         title = 'УСПЕХ' if result else 'ОШИБКА'
         message = 'Результаты сохранены' if result else 'Запись заблокирована'
         Message.show(title, message)
@@ -323,6 +386,7 @@ class MainWindow(QMainWindow):
         Journal.log('___' * 25)
         Journal.log_func(self._onClicked_goTest)
         self.stackedWidget.setCurrentIndex(1)
+        funcs_test.updatePollingProfile(self)
         # self._graph_manager.displayCharts(self.frameGraphTest)
         # self._graph_manager.markersReposition()
         # self._graph_manager.switchChartsVisibility(True)
@@ -332,6 +396,7 @@ class MainWindow(QMainWindow):
         Journal.log('___' * 25)
         Journal.log_func(self._onClicked_goBack)
         self.stackedWidget.setCurrentIndex(0)
+        funcs_test.updatePollingProfile(self)
         # self._graph_manager.displayCharts(self.frameGraphInfo)
         funcs_testlist.setCurrentTest(self, self._testdata.test_['ID'])
 
@@ -340,9 +405,13 @@ class MainWindow(QMainWindow):
         Journal.log('___' * 25)
         Journal.log_func(self._onClicked_engine)
         state = not funcs_test.states["is_running"]
+        self._sequencer.cancel("двигатель остановлен")
         # self._graph_manager.switchChartsVisibility(not state)
         funcs_test.switchControlsAccessible(self, state)
         funcs_test.switchRunningState(self, state)
+        self._steady.reset()
+        self._is_steady = False
+        funcs_display.displaySteadyState(self, False)
 
     def _onClicked_addPoint(self):
         """ нажата кнопка добавления точки """
@@ -352,16 +421,54 @@ class MainWindow(QMainWindow):
         if spin.value() == 0:
             Message.show("Внимание:", "Достигнуто максимальное кол-во точек.")
             return
-        current_vals = funcs_test.getCurrentVals(self)
+        self._addPoint(funcs_test.getCurrentVals(self))
+
+    def _onClicked_sequence(self):
+        """ нажата кнопка автоматического снятия точек (запуск/прерывание) """
+        Journal.log('___' * 25)
+        Journal.log_func(self._onClicked_sequence)
+        if self._sequencer.isRunning():
+            self._sequencer.cancel()
+            return
+        if not funcs_test.states["is_running"]:
+            Message.show("Внимание:", "Двигатель не запущен.")
+            return
+        if self.spinPointLines.value() == 0:
+            Message.show("Внимание:", "Достигнуто максимальное кол-во точек.")
+            return
+        if self._sequencer.start(int(self.spinPointLines.value())):
+            funcs_test.switchSequenceState(self, True)
+
+    def _onSequence_step(self, num: int, count: int):
+        """ переход к следующей линии точек """
+        self.btnSequence.setText(f"Прервать {num}/{count}")
+
+    def _onSequence_valve(self, value: int):
+        """ клапан перемещён при автоматическом снятии точек """
+        funcs_test.setSliderValue(self.sliderFlow, value)
+
+    def _onSequence_point(self, _index: int, point):
+        """ снята точка на линии """
+        Journal.log(f"MainWindow::\tавтоматическая точка {point}")
+        self._addPoint(funcs_test.getPointVals(point))
+
+    def _onSequence_finished(self, success: bool, reason: str):
+        """ снятие точек завершено или прервано """
+        funcs_test.switchSequenceState(self, False)
+        funcs_test.setSliderValue(self.sliderFlow, self._sequencer.getValve())
+        Message.show("УСПЕХ" if success else "Внимание:", reason)
+
+    def _addPoint(self, current_vals: list):
+        """ добавление точки (расход, напор, мощность, КПД) """
+        spin = self.spinPointLines
         # if spin.value() == spin.maximum():
         #     self._graph_manager.setPointLines_max(current_vals[0])
         # if not self._graph_manager.checkPointExists(current_vals[0]):
         #     self._graph_manager.markersAddKnots()
         #     self._graph_manager.addPointsToCharts(*current_vals)
-        #     self._graph_manager.displayCharts(self.frameGraphTest)
-        #     current_vals.append(self._testdata.seal_.Stages)
-        #     funcs_table.addToTable_points(self.tablePoints, current_vals)
-        #     spin.setValue(int(spin.value()) - 1)
+        current_vals.append(self._testdata.seal_.Stages or 1)
+        funcs_table.addToTable_points(self.tablePoints, current_vals)
+        spin.setValue(int(spin.value()) - 1)
 
     def _onClicked_removePoint(self):
         """ нажата кнопка удаления точки """
@@ -370,7 +477,6 @@ class MainWindow(QMainWindow):
         funcs_table.removeLastRow(self.tablePoints)
         # self._graph_manager.markersRemoveKnots()
         # self._graph_manager.removeLastPointsFromCharts()
-        # self._graph_manager.displayCharts(self.frameGraphTest)
         # self.spinPointLines.setValue(int(self.spinPointLines.value()) + 1)
 
     def _onChanged_pointsMode(self):
@@ -388,14 +494,15 @@ class MainWindow(QMainWindow):
         funcs_table.clear(self.tablePoints)
         # self._graph_manager.markersClearKnots()
         # self._graph_manager.clearPointsFromCharts()
-        # self._graph_manager.displayCharts(self.frameGraphTest)
 
     def _onAdam_connection(self):
         """ нажата кнопка подключения к ADAM5000TCP """
         Journal.log('___' * 25)
         Journal.log_func(self._onAdam_connection)
         state = self.chkConnection.isChecked()
-        state = self.adam_manager.setPollingState(state, 0.100)
+        self._sequencer.cancel("контроллер отключен")
+        funcs_test.updatePollingProfile(self)
+        state = self.adam_manager.setPollingState(state)
         funcs_test.switchControlsAccessible(self, False)
         self.chkConnection.setChecked(state)
         self.chkConnection.setStyleSheet(
@@ -411,10 +518,75 @@ class MainWindow(QMainWindow):
             funcs_test.setAdamDefaults(self.adam_manager)
 
     @pyqtSlot(dict)
-    def _onAdam_dataReceived(self, args: dict):
-        """ приход данных от ADAM5000TCP """
-        # Journal.log_func(self._on_adam_data_received)
-        funcs_display.displaySensors(self, args)
+    def _onAdam_dataChanged(self, args: dict):
+        """ изменение показаний ADAM5000TCP """
+        self._sensors.update(args)
+        funcs_display.displaySensors(self, self._sensors, args)
+
+    @pyqtSlot(str, bool)
+    def _onAdam_digitalChanged(self, name: str, state: bool):
+        """ смена состояния дискретного канала ADAM5000TCP """
+        Journal.log(f"MainWindow::\tканал {name} -> {state}")
+        if name == "engine_" and not state:
+            self._sequencer.cancel("двигатель остановлен")
+
+    @pyqtSlot(float, float, dict)
+    def _onAdam_sampleReceived(self, _sent: float, received: float, values: dict):
+        """ показания ADAM5000TCP с отметками времени:
+            обнаружение установившегося режима во время испытания """
+        if not funcs_test.states["is_running"] or not funcs_test.states["active_flowmeter"]:
+            return
+        flw, lft, pwr = funcs_test.getCalculatedVals(values)
+        # сравнение с отображённым состоянием: окно сбрасывается и при смене клапана
+        is_steady = self._steady.add(received, {'flw': flw, 'lft': lft, 'pwr': pwr})
+        if is_steady != self._is_steady:
+            self._is_steady = is_steady
+            self._onSteadyChanged(is_steady)
+
+    def _onSteadyChanged(self, state: bool):
+        """ режим установился / изменился: индикация и,
+            если включено, добавление усреднённой точки """
+        point = self._steady.getPoint()
+        funcs_display.displaySteadyState(self, state, point)
+        if state and self._sequencer.isRunning():
+            self._sequencer.onSteady(point)
+        elif state and self.chkAutoPoint.isChecked() and self.spinPointLines.value():
+            if self._steady.isCaptured(point):
+                return
+            Journal.log(f"MainWindow::\tточка по установившемуся режиму {point}")
+            self._steady.capture(point)
+            self._addPoint(funcs_test.getPointVals(point))
+
+    @pyqtSlot(bool)
+    def _onAdam_linkChanged(self, state: bool):
+        """ потеря / восстановление связи с ADAM5000TCP
+            (переподключение выполняется в потоке опроса) """
+        if not self.chkConnection.isChecked():
+            return
+        if not state:
+            self._sequencer.cancel("нет связи с контроллером")
+        health = self.adam_manager.getHealth()
+        self.chkConnection.setStyleSheet(
+            "QCheckBox { color: %s; }" % ("lime" if state else "orange")
+        )
+        self.chkConnection.setText(
+            "контроллер %s" % ("подключен" if state else "нет связи")
+        )
+        self.chkConnection.setToolTip(
+            f"отклик {health.get('rtt', 0) * 1000:.1f} мс, "
+            f"ошибок {health.get('error_rate', 0):.0%}, "
+            f"переподключений {health.get('reconnects', 0)}"
+        )
+        if not state:
+            funcs_group.groupClear(self.groupTestSensors)
+
+    def _onChanged_valve(self):
+        """ изменение положения клапана оператором: режим сменился,
+            окно установившегося режима сбрасывается """
+        self._steady.reset()
+        if self._is_steady:
+            self._is_steady = False
+            funcs_display.displaySteadyState(self, False)
 
     def _onChanged_flowmeter(self):
         """ изменение текущего расходомера """
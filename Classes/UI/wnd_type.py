@@ -1,11 +1,11 @@
 """
     Модуль описывает класс окна информации о типоразмере
 """
-from PyQt5 import uic
 from PyQt5.QtWidgets import QComboBox, QDialog, QLabel, QLineEdit
 from Classes.UI import funcs_combo
 from Classes.Data.alchemy_tables import Producer, Type
 from AesmaLib.journal import Journal
+from AesmaLib import ui_cache
 from AesmaLib.message import Message
 
 
@@ -49,9 +49,10 @@ class TypeWindow(QDialog):
         return False
 
     def _createGUI(self, path_to_ui):
-        """ загружает файл графического интерфейса """
+        """ загружает графический интерфейс (из модуля,
+            сгенерированного из файла .ui, или разбором файла) """
         try:
-            return uic.loadUi(path_to_ui, self) is not None
+            return ui_cache.loadUi(path_to_ui, self) is not None
         except IOError as error:
             Journal.log(__name__, "::\t", "ошибка:", str(error))
         return False
@@ -6,10 +6,25 @@
 """
 import os
 import sys
+import threading
+import traceback
 import faulthandler
+from datetime import datetime
+
+# режим замера времени импорта модулей: python main.py --profile-imports
+IMPORT_TIMER = None
+if '--profile-imports' in sys.argv:
+    from AesmaLib.import_timer import ImportTimer
+    IMPORT_TIMER = ImportTimer()
+    IMPORT_TIMER.install()
+
+from AesmaLib.startup_tracer import StartupTracer
+StartupTracer.begin('imports')
+from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QApplication
 from Classes.UI.wnd_main import MainWindow
 # from AesmaLib.Hardware.Adam5k import Adam5K
+StartupTracer.end('imports')
 
 
 # Добавляю текущую папку к путям, где питон ищет модули
@@ -23,19 +38,71 @@ PATHS = {
     'DB': os.path.join(ROOT, 'Files/seals.sqlite'),  # путь к файлу базы данных
     'WND': os.path.join(ROOT, 'Files/mainwindow_seal.ui'),  # путь к файлу GUI
     'TYPE': os.path.join(ROOT, 'Files/seal_window.ui'),  # путь к файлу GUI
-    'TEMPLATE': os.path.join(ROOT, 'Files/report')  # путь к шаблону протокола
+    'TEMPLATE': os.path.join(ROOT, 'Files/report'),  # путь к шаблону протокола
+    'CRASH': os.path.join(ROOT, 'Files/crash.log'),  # путь к журналу аварий
+    'RING': os.path.join(ROOT, 'Files/journal_last.log'),  # последние записи журнала
+    'IMPORTS': os.path.join(ROOT, 'Files/import_times.txt'),  # замер импорта
+    'STARTUP': os.path.join(ROOT, 'Files/startup_times.txt'),  # замер запуска
+    'TIMING': os.path.join(ROOT, 'Files/acquisition_timing.json')  # статистика опроса
 }
 
+
+def onFatalError(exc_type, exc_value, exc_traceback):
+    """ обработчик необработанных исключений: запись трассировки
+        и последних записей журнала в журнал аварий """
+    with open(PATHS['CRASH'], 'a', encoding='utf-8') as file_:
+        file_.write(f"\n*** АВАРИЯ {datetime.now()} ***\n")
+        traceback.print_exception(exc_type, exc_value, exc_traceback, file=file_)
+        Journal.dump(file_)
+    sys.__excepthook__(exc_type, exc_value, exc_traceback)
+
+
+def onThreadFatalError(args):
+    """ обработчик необработанных исключений в потоках (опрос Adam и т.д.) """
+    onFatalError(args.exc_type, args.exc_value, args.exc_traceback)
+
+
+def saveStartupTimes():
+    """ сохранение отчёта по этапам запуска """
+    with open(PATHS['STARTUP'], 'w', encoding='utf-8') as file_:
+        StartupTracer.report(file_)
+    Journal.log(__name__, '::\t',
+                f"запуск: {StartupTracer.getTotal() * 1000:.0f} мс")
+
+
+def saveImportTimes():
+    """ сохранение результатов замера времени импорта """
+    IMPORT_TIMER.uninstall()
+    with open(PATHS['IMPORTS'], 'w', encoding='utf-8') as file_:
+        IMPORT_TIMER.report(file_)
+    Journal.log(__name__, '::\t', f"замер импорта сохранён в {PATHS['IMPORTS']}")
+
+
 if __name__ == '__main__':
-    Journal.LOGGED = True
+    Journal.setLogged(True)
+    # при аварии интерпретатора (segfault в Qt/драйвере) excepthook
+    # не вызывается: трассировка пишется faulthandler в журнал аварий,
+    # последние записи журнала - периодически в отдельный файл
+    Journal.RING_PATH = PATHS['RING']
     Journal.log(__name__, '::\t', "*** Запуск приложения ***")
-    faulthandler.enable() # вкл. обработчика ошибок
+    crash_file = open(PATHS['CRASH'], 'a', encoding='utf-8')
+    faulthandler.enable(crash_file, all_threads=True) # вкл. обработчика ошибок
+    sys.excepthook = onFatalError
+    threading.excepthook = onThreadFatalError
 
+    # QtWebEngine (протокол) загружается при первом использовании,
+    # поэтому общий контекст OpenGL включается до создания приложения
+    QApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
     wnd = MainWindow(PATHS)
+    StartupTracer.watchFirstPaint(wnd, saveStartupTimes)
     if wnd.show():
+        if IMPORT_TIMER:
+            saveImportTimes()
         app.exec_()
 
     faulthandler.disable() # выкл. обработчика ошибок
+    crash_file.close()
     Journal.log(__name__, '::\t', "*** Завершение приложения ***")
+    Journal.stop()